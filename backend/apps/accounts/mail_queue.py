@@ -0,0 +1,166 @@
+# Outbound mail queue: messages are stored in the database and delivered in
+# batches by the send_queued_mail worker over one reused backend connection.
+import logging
+from datetime import timedelta
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.template.loader import get_template
+from django.utils import timezone
+
+from .models import OutboundEmail
+
+logger = logging.getLogger(__name__)
+
+# Claimed messages are pushed this far into the future so a crashed worker's
+# batch becomes due again instead of being stuck
+CLAIM_LEASE = timedelta(minutes=5)
+
+
+@lru_cache(maxsize=None)
+def _get_template(name):
+    return get_template(name)
+
+
+def render_email(template_name, context):
+    """Render the cached .txt/.html pair for an email template"""
+    text = _get_template(f'{template_name}.txt').render(context)
+    html = _get_template(f'{template_name}.html').render(context)
+    return text, html
+
+
+def enqueue_email(to_email, subject, body_text, body_html=''):
+    """Queue a message for delivery by the mail worker"""
+    return OutboundEmail.objects.create(
+        to_email=to_email,
+        subject=subject,
+        body_text=body_text,
+        body_html=body_html,
+    )
+
+
+def enqueue_template_email(to_email, subject, template_name, context):
+    text, html = render_email(template_name, context)
+    return enqueue_email(to_email, subject, text, html)
+
+
+def enqueue_emails(messages):
+    """Queue many (to_email, subject, body_text, body_html) messages with one INSERT per batch"""
+    return OutboundEmail.objects.bulk_create(
+        [
+            OutboundEmail(to_email=to_email, subject=subject, body_text=body_text, body_html=body_html)
+            for to_email, subject, body_text, body_html in messages
+        ],
+        batch_size=500,
+    )
+
+
+def _retry_delay(attempts):
+    base = getattr(settings, 'EMAIL_QUEUE_RETRY_BASE_SECONDS', 60)
+    max_delay = getattr(settings, 'EMAIL_QUEUE_RETRY_MAX_SECONDS', 3600)
+    return timedelta(seconds=min(base * (2 ** (attempts - 1)), max_delay))
+
+
+def _claim_batch(batch_size):
+    now = timezone.now()
+    with transaction.atomic():
+        batch = list(
+            OutboundEmail.objects.select_for_update(skip_locked=True)
+            .filter(status=OutboundEmail.Status.PENDING, next_attempt_at__lte=now)
+            .order_by('next_attempt_at')[:batch_size]
+        )
+        if batch:
+            OutboundEmail.objects.filter(pk__in=[email.pk for email in batch]).update(
+                next_attempt_at=now + CLAIM_LEASE
+            )
+    return batch
+
+
+def _build_message(email, connection):
+    message = EmailMultiAlternatives(
+        subject=email.subject,
+        body=email.body_text,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[email.to_email],
+        connection=connection,
+    )
+    if email.body_html:
+        message.attach_alternative(email.body_html, 'text/html')
+    return message
+
+
+def _record_failure(email, error, max_attempts):
+    """Count a failed attempt and reschedule the message with backoff, or give up on it"""
+    email.attempts += 1
+    email.last_error = error
+    if email.attempts >= max_attempts:
+        email.status = OutboundEmail.Status.FAILED
+        logger.error(f"Giving up on email to {email.to_email} after {email.attempts} attempts: {error}")
+    else:
+        email.next_attempt_at = timezone.now() + _retry_delay(email.attempts)
+        logger.warning(f"Failed to send email to {email.to_email}, will retry: {error}")
+
+
+def send_queued_emails(batch_size=None, max_attempts=None):
+    """
+    Deliver one batch of due messages over a single backend connection.
+
+    Returns a (sent, failed) tuple. Failed messages are rescheduled with
+    exponential backoff until they run out of attempts.
+    """
+    batch_size = batch_size or getattr(settings, 'EMAIL_QUEUE_BATCH_SIZE', 100)
+    max_attempts = max_attempts or getattr(settings, 'EMAIL_QUEUE_MAX_ATTEMPTS', 5)
+
+    batch = _claim_batch(batch_size)
+    if not batch:
+        return 0, 0
+
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as e:
+        # Counts as a failed attempt for every claimed message, so an unreachable
+        # server backs off and eventually fails them instead of retrying forever
+        logger.error(f"Cannot open mail connection for {len(batch)} queued emails: {str(e)}")
+        for email in batch:
+            _record_failure(email, str(e), max_attempts)
+        OutboundEmail.objects.bulk_update(batch, ['status', 'attempts', 'last_error', 'next_attempt_at'])
+        return 0, len(batch)
+
+    sent = 0
+    failed = 0
+    try:
+        for email in batch:
+            try:
+                connection.send_messages([_build_message(email, connection)])
+            except Exception as e:
+                failed += 1
+                _record_failure(email, str(e), max_attempts)
+            else:
+                sent += 1
+                email.attempts += 1
+                email.status = OutboundEmail.Status.SENT
+                email.sent_at = timezone.now()
+                email.last_error = None
+    finally:
+        connection.close()
+        OutboundEmail.objects.bulk_update(
+            batch, ['status', 'attempts', 'last_error', 'next_attempt_at', 'sent_at']
+        )
+
+    logger.info(f"Mail queue batch done: {sent} sent, {failed} failed")
+    return sent, failed
+
+
+def flush_queue(batch_size=None):
+    """Send batches until no due messages remain (or a batch makes no progress)"""
+    total_sent = 0
+    total_failed = 0
+    while True:
+        sent, failed = send_queued_emails(batch_size=batch_size)
+        total_sent += sent
+        total_failed += failed
+        if not sent:
+            return total_sent, total_failed
@@ -0,0 +1,87 @@
+import csv
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError
+from apps.accounts.models import User
+from apps.accounts.provisioning import default_hash_workers, parse_cohort, provision_accounts
+
+
+class Command(BaseCommand):
+    help = 'Bulk provision user accounts from a CSV or JSON cohort file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', type=str, help='Path to the cohort file')
+        parser.add_argument(
+            '--format',
+            type=str,
+            choices=['csv', 'json'],
+            help='Cohort file format (defaults to the file extension)'
+        )
+        parser.add_argument(
+            '--role',
+            type=str,
+            choices=User.Role.values,
+            default=User.Role.STUDENT,
+            help='Role for rows that do not specify one'
+        )
+        parser.add_argument(
+            '--default-password',
+            type=str,
+            help='Initial password for rows without a password column (random if omitted)'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            help='Number of password hashing processes (defaults to ACCOUNT_PROVISIONING_HASH_WORKERS or the CPU count)'
+        )
+        parser.add_argument(
+            '--credentials-out',
+            type=str,
+            help='Write generated passwords to this CSV file'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Validate the cohort without creating accounts'
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or ('json' if path.lower().endswith('.json') else 'csv')
+
+        try:
+            with open(path, 'rb') as cohort_file:
+                rows = parse_cohort(cohort_file.read(), file_format)
+        except (OSError, ValueError) as e:
+            raise CommandError(f'❌ Cannot read cohort: {e}')
+
+        started = time.perf_counter()
+        try:
+            result = provision_accounts(
+                rows,
+                default_password=options['default_password'],
+                default_role=options['role'],
+                workers=options['workers'] or default_hash_workers(),
+                dry_run=options['dry_run'],
+            )
+        except (ValueError, IntegrityError) as e:
+            raise CommandError(f'❌ Cannot provision cohort: {e}')
+        elapsed = time.perf_counter() - started
+
+        for error in result['errors']:
+            self.stdout.write(self.style.WARNING(f"Row {error['row']}: {error['error']}"))
+
+        if options['credentials_out'] and result['credentials']:
+            with open(options['credentials_out'], 'w', newline='', encoding='utf-8') as out:
+                writer = csv.DictWriter(out, fieldnames=['row', 'email', 'password'])
+                writer.writeheader()
+                writer.writerows(result['credentials'])
+            self.stdout.write(f"Credentials written to {options['credentials_out']}")
+
+        verb = 'Validated' if options['dry_run'] else 'Created'
+        count = result['accepted_count'] if options['dry_run'] else len(result['created'])
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {verb} {count}/{len(rows)} accounts "
+            f"({result['linked_count']} linked to students, {len(result['errors'])} errors) "
+            f"in {elapsed:.2f}s"
+        ))
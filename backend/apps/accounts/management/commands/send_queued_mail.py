@@ -0,0 +1,35 @@
+import time
+from django.core.management.base import BaseCommand
+from apps.accounts.mail_queue import flush_queue
+
+
+class Command(BaseCommand):
+    help = 'Deliver queued outbound emails in batches over a reused connection'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            help='Number of messages sent per connection (defaults to EMAIL_QUEUE_BATCH_SIZE)'
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep running and poll the queue'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5.0,
+            help='Seconds to sleep between polls in --loop mode'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = flush_queue(batch_size=options['batch_size'])
+            if sent or failed:
+                self.stdout.write(f'Sent {sent} emails, {failed} failed')
+
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -4,6 +4,7 @@ from django.utils.http import urlsafe_base64_encode
 from django.utils.encoding import force_bytes
 from apps.accounts.models import User
 from apps.accounts.email_utils import send_password_reset_email, send_password_reset_confirmation_email
+from apps.accounts.mail_queue import flush_queue
 
 
 class Command(BaseCommand):
@@ -38,7 +39,7 @@ class Command(BaseCommand):
                 uid = urlsafe_base64_encode(force_bytes(user.pk))
                 reset_url = f"http://localhost:5173/reset-password?uid={uid}&token={token}"
                 
-                success = send_password_reset_email(user, reset_url)
+                success = send_password_reset_email(user, reset_url) and self._deliver()
                 
                 if success:
                     self.stdout.write(
@@ -52,7 +53,7 @@ class Command(BaseCommand):
                     
             elif email_type == 'confirmation':
                 # Send confirmation email
-                success = send_password_reset_confirmation_email(user)
+                success = send_password_reset_confirmation_email(user) and self._deliver()
                 
                 if success:
                     self.stdout.write(
@@ -71,3 +72,8 @@ class Command(BaseCommand):
             self.stdout.write(
                 self.style.ERROR(f'❌ Error: {str(e)}')
             )
+
+    def _deliver(self):
+        # Flush the queue right away instead of waiting for the mail worker
+        sent, failed = flush_queue()
+        return sent > 0 and failed == 0
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.7 on 2026-10-19 17:41
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_alter_user_managers'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboundEmail',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('to_email', models.EmailField(max_length=254, verbose_name='Người nhận')),
+                ('subject', models.CharField(max_length=255, verbose_name='Tiêu đề')),
+                ('body_text', models.TextField(blank=True, verbose_name='Nội dung (text)')),
+                ('body_html', models.TextField(blank=True, verbose_name='Nội dung (HTML)')),
+                ('status', models.CharField(choices=[('pending', 'Chờ gửi'), ('sent', 'Đã gửi'), ('failed', 'Gửi thất bại')], default='pending', max_length=20, verbose_name='Trạng thái')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Số lần gửi')),
+                ('last_error', models.TextField(blank=True, null=True, verbose_name='Lỗi gần nhất')),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Lần gửi tiếp theo')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Ngày tạo')),
+                ('sent_at', models.DateTimeField(blank=True, null=True, verbose_name='Ngày gửi')),
+            ],
+            options={
+                'verbose_name': 'Email chờ gửi',
+                'verbose_name_plural': 'Email chờ gửi',
+                'db_table': 'outbound_emails',
+                'ordering': ['next_attempt_at'],
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='outbound_em_status_54195c_idx')],
+            },
+        ),
+    ]
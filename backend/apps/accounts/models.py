@@ -1,6 +1,8 @@
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 from django.db import models
 from django.core.validators import RegexValidator
+from django.utils import timezone
+from apps.core.images import normalize_avatar
 
 
 class UserManager(BaseUserManager):
@@ -154,5 +156,45 @@ class User(AbstractUser):
                 self.account_status = self.AccountStatus.PENDING
             else:
                 self.account_status = self.AccountStatus.ACTIVE
+        
+        # Store new avatar uploads as downscaled WebP with thumbnails
+        normalize_avatar(self.avatar)
                 
         super().save(*args, **kwargs)
+
+
+class OutboundEmail(models.Model):
+    """Queued outbound email, delivered in batches by the send_queued_mail worker"""
+    
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Chờ gửi'
+        SENT = 'sent', 'Đã gửi'
+        FAILED = 'failed', 'Gửi thất bại'
+    
+    to_email = models.EmailField(verbose_name='Người nhận')
+    subject = models.CharField(max_length=255, verbose_name='Tiêu đề')
+    body_text = models.TextField(blank=True, verbose_name='Nội dung (text)')
+    body_html = models.TextField(blank=True, verbose_name='Nội dung (HTML)')
+    status = models.CharField(
+        max_length=20,
+        choices=Status.choices,
+        default=Status.PENDING,
+        verbose_name='Trạng thái'
+    )
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name='Số lần gửi')
+    last_error = models.TextField(blank=True, null=True, verbose_name='Lỗi gần nhất')
+    next_attempt_at = models.DateTimeField(default=timezone.now, verbose_name='Lần gửi tiếp theo')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Ngày tạo')
+    sent_at = models.DateTimeField(blank=True, null=True, verbose_name='Ngày gửi')
+    
+    class Meta:
+        db_table = 'outbound_emails'
+        verbose_name = 'Email chờ gửi'
+        verbose_name_plural = 'Email chờ gửi'
+        ordering = ['next_attempt_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.to_email} - {self.subject} ({self.get_status_display()})"
@@ -0,0 +1,299 @@
+# Bulk account provisioning for student/teacher cohorts
+import csv
+import io
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.password_validation import validate_password
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+from django.utils.crypto import get_random_string
+
+from apps.students.models import Student
+from .models import User
+
+COHORT_FIELDS = [
+    'email', 'first_name', 'last_name', 'role', 'student_id',
+    'department', 'phone', 'password'
+]
+
+# Below this many hashes the process pool start-up costs more than it saves
+PARALLEL_HASH_THRESHOLD = 16
+CREATE_BATCH_SIZE = 1000
+
+
+def parse_cohort(content, file_format):
+    """Parse a CSV or JSON cohort into a list of row dicts"""
+    if isinstance(content, bytes):
+        content = content.decode('utf-8-sig')
+
+    if file_format == 'json':
+        data = json.loads(content)
+        if isinstance(data, dict):
+            data = data.get('users', [])
+        return validate_rows(data)
+
+    if file_format == 'csv':
+        reader = csv.DictReader(io.StringIO(content))
+        rows = []
+        for row in reader:
+            rows.append({
+                (key or '').strip().lower().replace(' ', '_'): (value or '').strip()
+                for key, value in row.items()
+            })
+        return rows
+
+    raise ValueError(f'Unsupported cohort format: {file_format}')
+
+
+def validate_rows(rows):
+    """A cohort must be a list of objects; raises ValueError otherwise"""
+    if not isinstance(rows, list):
+        raise ValueError('Cohort must be a list or an object with a "users" list')
+    for index, row in enumerate(rows, start=1):
+        if not isinstance(row, dict):
+            raise ValueError(f'Row {index} must be an object')
+    return [dict(row) for row in rows]
+
+
+def _init_hash_worker():
+    # Spawned workers (non-fork platforms) start without configured apps
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'student_management.settings')
+    django.setup()
+
+
+def default_hash_workers():
+    return getattr(settings, 'ACCOUNT_PROVISIONING_HASH_WORKERS', 0) or os.cpu_count() or 1
+
+
+class CohortTooLarge(ValueError):
+    """More passwords to hash than the caller allows"""
+
+
+def hash_passwords(passwords, workers=None):
+    """
+    Hash a list of raw passwords, serially unless workers > 1.
+
+    Only the management command asks for a process pool: forking workers
+    from a request thread of a gunicorn worker is not safe. The API caps
+    how many passwords a request may hash instead (max_hashes).
+    """
+    if not workers or workers <= 1 or len(passwords) < PARALLEL_HASH_THRESHOLD:
+        return [make_password(password) for password in passwords]
+
+    chunksize = max(1, len(passwords) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_hash_worker) as pool:
+        return list(pool.map(make_password, passwords, chunksize=chunksize))
+
+
+def _clean(value):
+    if value is None:
+        return ''
+    return str(value).strip()
+
+
+def _assign_usernames(emails):
+    """Derive unique usernames from email local parts, checking the database set-wise"""
+    bases = [email.split('@')[0][:140] for email in emails]
+    taken = set()
+    while True:
+        assigned = []
+        used = set()
+        for base in bases:
+            username = base
+            suffix = 1
+            while username in taken or username in used:
+                suffix += 1
+                username = f"{base}{suffix}"
+            used.add(username)
+            assigned.append(username)
+
+        clashes = set(User.objects.filter(username__in=used).values_list('username', flat=True))
+        if not clashes:
+            return assigned
+        taken |= clashes
+
+
+def provision_accounts(rows, default_password=None, default_role=User.Role.STUDENT,
+                       workers=None, max_hashes=None, dry_run=False):
+    """
+    Create user accounts for a whole cohort.
+
+    Uniqueness is checked with one query per unique column, student accounts are
+    linked to existing Student rows by student_id, passwords are hashed (in a
+    process pool of the given number of workers) and the users are inserted
+    with bulk_create. Raises ValueError for a malformed cohort or a weak
+    default password, CohortTooLarge when more than max_hashes individual
+    passwords would be hashed (also on a dry run), IntegrityError when a
+    concurrent insert took an email, username or student_id.
+    """
+    rows = validate_rows(rows)
+    if default_password:
+        try:
+            validate_password(default_password)
+        except ValidationError as e:
+            raise ValueError('; '.join(e.messages))
+
+    errors = []
+    candidates = []
+
+    for index, raw in enumerate(rows, start=1):
+        row = {field: _clean(raw.get(field)) for field in COHORT_FIELDS}
+        row['email'] = row['email'].lower()
+        row['role'] = (row['role'] or default_role).lower()
+        if row['student_id']:
+            row['student_id'] = row['student_id'].upper()
+        candidates.append((index, row))
+
+    # Link to existing Student rows in one query
+    student_ids = {row['student_id'] for _, row in candidates if row['student_id']}
+    students = {
+        student['student_id']: student
+        for student in Student.objects.filter(student_id__in=student_ids).values(
+            'student_id', 'first_name', 'last_name', 'email', 'phone'
+        )
+    }
+
+    valid = []
+    seen_emails = set()
+    seen_student_ids = set()
+    for index, row in candidates:
+        student = students.get(row['student_id'])
+        if student:
+            for field in ('first_name', 'last_name', 'email', 'phone'):
+                if not row[field] and student[field]:
+                    row[field] = student[field].lower() if field == 'email' else student[field]
+
+        error = _validate_row(row)
+        if not error and row['email'] in seen_emails:
+            error = f'Email {row["email"]} bị trùng trong tệp'
+        if not error and row['student_id'] and row['student_id'] in seen_student_ids:
+            error = f'Mã sinh viên {row["student_id"]} bị trùng trong tệp'
+
+        if error:
+            errors.append({'row': index, 'error': error, 'data': _public_row(row)})
+            continue
+
+        seen_emails.add(row['email'])
+        if row['student_id']:
+            seen_student_ids.add(row['student_id'])
+        valid.append((index, row, student is not None))
+
+    # Set-based uniqueness checks against existing accounts
+    existing_emails = set(
+        email.lower() for email in
+        User.objects.filter(email__in=seen_emails).values_list('email', flat=True)
+    )
+    existing_student_ids = set(
+        User.objects.filter(student_id__in=seen_student_ids).values_list('student_id', flat=True)
+    )
+
+    accepted = []
+    for index, row, linked in valid:
+        if row['email'] in existing_emails:
+            errors.append({'row': index, 'error': 'Email này đã được sử dụng.', 'data': _public_row(row)})
+        elif row['student_id'] and row['student_id'] in existing_student_ids:
+            errors.append({'row': index, 'error': 'Mã sinh viên này đã tồn tại.', 'data': _public_row(row)})
+        else:
+            accepted.append((index, row, linked))
+
+    usernames = _assign_usernames([row['email'] for _, row, _ in accepted])
+
+    # Resolve passwords; a shared default password only needs hashing once
+    credentials = []
+    raw_passwords = []
+    for index, row, _ in accepted:
+        if row['password']:
+            raw_passwords.append(row['password'])
+        elif default_password:
+            raw_passwords.append(None)
+        else:
+            password = get_random_string(12)
+            raw_passwords.append(password)
+            if not dry_run:
+                credentials.append({'row': index, 'email': row['email'], 'password': password})
+
+    to_hash = [password for password in raw_passwords if password is not None]
+    if max_hashes is not None and len(to_hash) > max_hashes:
+        raise CohortTooLarge(
+            f'{len(to_hash)} tài khoản cần mật khẩu riêng, vượt quá giới hạn {max_hashes} của API. '
+            'Hãy dùng mật khẩu mặc định hoặc lệnh provision_accounts cho khóa lớn'
+        )
+
+    users = []
+    if accepted and not dry_run:
+        hashed = iter(hash_passwords(to_hash, workers=workers))
+        default_hash = make_password(default_password) if default_password else None
+
+        for (index, row, _), raw_password, username in zip(accepted, raw_passwords, usernames):
+            role = row['role']
+            users.append(User(
+                email=row['email'],
+                username=username,
+                first_name=row['first_name'],
+                last_name=row['last_name'],
+                role=role,
+                # Mirror User.save(): teachers wait for approval
+                account_status=(
+                    User.AccountStatus.PENDING if role == User.Role.TEACHER
+                    else User.AccountStatus.ACTIVE
+                ),
+                student_id=row['student_id'] or None,
+                department=row['department'] or None,
+                phone=row['phone'] or None,
+                password=next(hashed) if raw_password is not None else default_hash,
+            ))
+
+        with transaction.atomic():
+            User.objects.bulk_create(users, batch_size=CREATE_BATCH_SIZE)
+
+    return {
+        'created': users,
+        'accepted_count': len(accepted),
+        'linked_count': sum(1 for _, _, linked in accepted if linked),
+        'errors': errors,
+        'credentials': credentials,
+    }
+
+
+def _validate_row(row):
+    """Validate a single normalized row in memory, returning an error message or None"""
+    if not row['email']:
+        return 'Email là bắt buộc'
+    try:
+        validate_email(row['email'])
+    except ValidationError:
+        return f'Email không hợp lệ: {row["email"]}'
+
+    if not row['first_name'] or not row['last_name']:
+        return 'Họ và tên là bắt buộc'
+
+    if row['role'] not in User.Role.values:
+        return f'Vai trò không hợp lệ: {row["role"]}'
+    if row['role'] == User.Role.STUDENT and not row['student_id']:
+        return 'Mã sinh viên là bắt buộc.'
+    if row['role'] == User.Role.TEACHER and not row['department']:
+        return 'Khoa/Phòng ban là bắt buộc cho giảng viên.'
+
+    if row['phone']:
+        try:
+            User._meta.get_field('phone').run_validators(row['phone'])
+        except ValidationError as e:
+            return '; '.join(e.messages)
+
+    if row['password']:
+        try:
+            validate_password(row['password'])
+        except ValidationError as e:
+            return '; '.join(e.messages)
+
+    return None
+
+
+def _public_row(row):
+    return {key: value for key, value in row.items() if key != 'password'}
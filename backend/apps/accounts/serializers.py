@@ -2,17 +2,19 @@
 from django.contrib.auth import authenticate
 from django.contrib.auth.password_validation import validate_password
 from django.core.validators import validate_email
+from apps.core.serializers import DynamicFieldsMixin, ThumbnailField
 from .models import User
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     full_name = serializers.ReadOnlyField()
+    avatar_thumbnail = ThumbnailField(source='avatar')
     
     class Meta:
         model = User
         fields = [
             'id', 'email', 'first_name', 'last_name', 'full_name',
-            'role', 'account_status', 'phone', 'avatar', 
+            'role', 'account_status', 'phone', 'avatar', 'avatar_thumbnail',
             'student_id', 'department', 'is_active', 
             'created_at', 'updated_at', 'last_login_at'
         ]
@@ -21,12 +23,13 @@ class UserSerializer(serializers.ModelSerializer):
 
 class UserProfileSerializer(serializers.ModelSerializer):
     full_name = serializers.ReadOnlyField()
+    avatar_thumbnail = ThumbnailField(source='avatar')
     
     class Meta:
         model = User
         fields = [
             'id', 'email', 'first_name', 'last_name', 'full_name',
-            'phone', 'avatar', 'student_id', 'department'
+            'phone', 'avatar', 'avatar_thumbnail', 'student_id', 'department'
         ]
         read_only_fields = ['id', 'email']
 
@@ -0,0 +1,114 @@
+from datetime import timedelta
+
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from apps.accounts.mail_queue import CLAIM_LEASE, _claim_batch, enqueue_email, enqueue_emails, send_queued_emails
+from apps.accounts.models import OutboundEmail
+
+
+class FlakyBackend(EmailBackend):
+    """locmem backend that refuses connections or rejects listed recipients on demand"""
+    refuse_connections = False
+    rejected = set()
+
+    def open(self):
+        if self.refuse_connections:
+            raise ConnectionRefusedError('Connection refused')
+        return super().open()
+
+    def send_messages(self, messages):
+        for message in messages:
+            if set(message.to) & self.rejected:
+                raise OSError(f'Recipient rejected: {message.to[0]}')
+        return super().send_messages(messages)
+
+
+@override_settings(
+    EMAIL_BACKEND='apps.accounts.tests.test_mail_queue.FlakyBackend',
+    EMAIL_QUEUE_RETRY_BASE_SECONDS=60,
+    EMAIL_QUEUE_RETRY_MAX_SECONDS=3600,
+)
+class MailQueueTests(TestCase):
+    """Queued emails are delivered in batches and retried with backoff"""
+
+    def setUp(self):
+        FlakyBackend.refuse_connections = False
+        FlakyBackend.rejected = set()
+
+    def make_due(self):
+        OutboundEmail.objects.update(next_attempt_at=timezone.now())
+
+    def test_enqueue_then_deliver(self):
+        enqueue_email('a@test.edu.vn', 'Xin chào', 'Nội dung', '<p>Nội dung</p>')
+        enqueue_emails([('b@test.edu.vn', 'Thông báo', 'Văn bản', '')])
+
+        self.assertEqual(send_queued_emails(), (2, 0))
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox), ['a@test.edu.vn', 'b@test.edu.vn'])
+        html = next(message for message in mail.outbox if message.to == ['a@test.edu.vn'])
+        self.assertEqual(html.alternatives, [('<p>Nội dung</p>', 'text/html')])
+        self.assertEqual(
+            set(OutboundEmail.objects.values_list('status', 'attempts')), {(OutboundEmail.Status.SENT, 1)}
+        )
+        self.assertEqual(send_queued_emails(), (0, 0))
+
+    def test_rejected_message_is_retried_with_backoff(self):
+        with self.assertLogs('apps.accounts.mail_queue', 'WARNING'):
+            enqueue_emails([
+                ('ok@test.edu.vn', 'Thông báo', 'Văn bản', ''),
+                ('bad@test.edu.vn', 'Thông báo', 'Văn bản', ''),
+            ])
+            FlakyBackend.rejected = {'bad@test.edu.vn'}
+            self.assertEqual(send_queued_emails(), (1, 1))
+
+            bad = OutboundEmail.objects.get(to_email='bad@test.edu.vn')
+            self.assertEqual((bad.status, bad.attempts), (OutboundEmail.Status.PENDING, 1))
+            self.assertIn('Recipient rejected', bad.last_error)
+            self.assertAlmostEqual(bad.next_attempt_at, timezone.now() + timedelta(seconds=60), delta=timedelta(seconds=5))
+            # Not due until the backoff has passed
+            self.assertEqual(send_queued_emails(), (0, 0))
+
+            self.make_due()
+            send_queued_emails()
+            bad.refresh_from_db()
+            self.assertEqual(bad.attempts, 2)
+            self.assertAlmostEqual(bad.next_attempt_at, timezone.now() + timedelta(seconds=120), delta=timedelta(seconds=5))
+
+            FlakyBackend.rejected = set()
+            self.make_due()
+            self.assertEqual(send_queued_emails(), (1, 0))
+            bad.refresh_from_db()
+            self.assertEqual((bad.status, bad.attempts, bad.last_error), (OutboundEmail.Status.SENT, 3, None))
+            self.assertEqual(len(mail.outbox), 2)
+
+    def test_failed_connect_counts_as_an_attempt(self):
+        with self.assertLogs('apps.accounts.mail_queue', 'WARNING'):
+            enqueue_emails([(f'sv{index}@test.edu.vn', 'Thông báo', 'Văn bản', '') for index in range(3)])
+            FlakyBackend.refuse_connections = True
+
+            self.assertEqual(send_queued_emails(max_attempts=2), (0, 3))
+            self.assertEqual(
+                set(OutboundEmail.objects.values_list('status', 'attempts')), {(OutboundEmail.Status.PENDING, 1)}
+            )
+            self.make_due()
+            self.assertEqual(send_queued_emails(max_attempts=2), (0, 3))
+            self.assertEqual(
+                set(OutboundEmail.objects.values_list('status', 'attempts')), {(OutboundEmail.Status.FAILED, 2)}
+            )
+            self.make_due()
+            self.assertEqual(send_queued_emails(max_attempts=2), (0, 0))
+            self.assertEqual(mail.outbox, [])
+
+    def test_claimed_batch_is_leased(self):
+        enqueue_emails([(f'sv{index}@test.edu.vn', 'Thông báo', 'Văn bản', '') for index in range(3)])
+        claimed = _claim_batch(2)
+        self.assertEqual(len(claimed), 2)
+
+        # A second worker only gets the unclaimed message
+        self.assertEqual(send_queued_emails(), (1, 0))
+        leased = OutboundEmail.objects.filter(pk__in=[email.pk for email in claimed])
+        for email in leased:
+            self.assertEqual(email.status, OutboundEmail.Status.PENDING)
+            self.assertGreater(email.next_attempt_at, timezone.now() + CLAIM_LEASE - timedelta(seconds=5))
@@ -0,0 +1,60 @@
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from apps.accounts.models import User
+
+
+def cohort(size, **extra):
+    return [
+        {
+            'email': f'sv{index}@test.edu.vn', 'first_name': 'Lê', 'last_name': f'Văn {index}',
+            'student_id': f'SV{index:03d}', **extra,
+        }
+        for index in range(size)
+    ]
+
+
+@override_settings(
+    ACCOUNT_PROVISIONING_API_MAX_HASHES=3,
+    PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+)
+class BulkProvisionApiTests(TestCase):
+    """The API hashes at most ACCOUNT_PROVISIONING_API_MAX_HASHES passwords per request"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(
+            email='admin@test.edu.vn', username='admin', password='Admin@12345', role='admin'
+        )
+
+    def setUp(self):
+        self.client = APIClient(HTTP_HOST='localhost')
+        self.client.force_authenticate(self.admin)
+        self.url = '/api/auth/provision/'
+
+    def test_generated_passwords_within_the_limit(self):
+        response = self.client.post(self.url, {'users': cohort(3)}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['created_count'], 3)
+        self.assertEqual(len(response.data['credentials']), 3)
+        credential = response.data['credentials'][0]
+        self.assertTrue(User.objects.get(email=credential['email']).check_password(credential['password']))
+
+    def test_large_cohort_is_sent_to_the_command(self):
+        for users in (cohort(4), cohort(4, password='Rieng@12345')):
+            response = self.client.post(self.url, {'users': users}, format='json')
+            self.assertEqual(response.status_code, 400)
+            self.assertIn('provision_accounts', response.data['message'])
+
+        response = self.client.post(self.url, {'users': cohort(4), 'dry_run': True}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(User.objects.filter(email__startswith='sv').exists())
+
+    def test_shared_default_password_is_hashed_once(self):
+        response = self.client.post(
+            self.url, {'users': cohort(10), 'default_password': 'MacDinh@12345'}, format='json'
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['created_count'], 10)
+        self.assertEqual(response.data['credentials'], [])
+        self.assertTrue(User.objects.get(email='sv9@test.edu.vn').check_password('MacDinh@12345'))
@@ -15,6 +15,9 @@ urlpatterns = [
     path('profile/', views.ProfileView.as_view(), name='profile'),
     path('change-password/', views.ChangePasswordView.as_view(), name='change_password'),
     
+    # Bulk provisioning
+    path('provision/', views.BulkProvisionView.as_view(), name='bulk_provision'),
+    
     # Password Reset - Temporarily commented out
     # path('forgot-password/', views.ForgotPasswordView.as_view(), name='forgot_password'),
     # path('reset-password/', views.ResetPasswordView.as_view(), name='reset_password'),
@@ -1,11 +1,17 @@
+from django.conf import settings
+from django.db import connection, DatabaseError, IntegrityError
 from django.utils import timezone
 from rest_framework import status, generics, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import authenticate
+from apps.core.metrics import track_import
+from apps.core.parsers import ORJSONParser, MessagePackParser
 from .models import User
+from .provisioning import parse_cohort, provision_accounts
 from .serializers import (
     UserSerializer, 
     UserProfileSerializer,
@@ -138,13 +144,91 @@ class ChangePasswordView(APIView):
         }, status=status.HTTP_200_OK)
 
 
+class BulkProvisionView(APIView):
+    """Bulk account provisioning API for whole cohorts (CSV or JSON)"""
+    permission_classes = [permissions.IsAuthenticated]
+    parser_classes = [ORJSONParser, MessagePackParser, MultiPartParser, FormParser]
+    
+    @track_import('accounts')
+    def post(self, request):
+        if request.user.role != 'admin':
+            return Response(
+                {'error': 'Bạn không có quyền tạo tài khoản hàng loạt'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        try:
+            if 'file' in request.FILES:
+                cohort_file = request.FILES['file']
+                name = cohort_file.name.lower()
+                if not name.endswith(('.csv', '.json')):
+                    return Response({
+                        'success': False,
+                        'message': 'Only CSV (.csv) and JSON (.json) files are supported'
+                    }, status=status.HTTP_400_BAD_REQUEST)
+                rows = parse_cohort(cohort_file.read(), 'json' if name.endswith('.json') else 'csv')
+            else:
+                rows = request.data.get('users', [])
+            
+            if not rows:
+                return Response({
+                    'success': False,
+                    'message': 'No users data provided'
+                }, status=status.HTTP_400_BAD_REQUEST)
+            
+            dry_run = str(request.data.get('dry_run', '')).lower() in ('1', 'true', 'yes')
+            result = provision_accounts(
+                rows,
+                default_password=request.data.get('default_password') or None,
+                default_role=request.data.get('role') or User.Role.STUDENT,
+                # Hashed serially in the request; large cohorts go through provision_accounts
+                max_hashes=settings.ACCOUNT_PROVISIONING_API_MAX_HASHES,
+                dry_run=dry_run,
+            )
+        except ValueError as e:
+            return Response({
+                'success': False,
+                'message': str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
+        except IntegrityError:
+            # Another request created one of these accounts after the uniqueness checks
+            return Response({
+                'success': False,
+                'message': 'Một số tài khoản vừa được tạo bởi yêu cầu khác, vui lòng thử lại'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        created_count = len(result['created'])
+        return Response({
+            'success': True,
+            'message': f'Successfully provisioned {created_count} accounts',
+            'dry_run': dry_run,
+            'created_count': created_count,
+            'errors': result['errors'],
+            'credentials': result['credentials'],
+            'details': {
+                'total_rows': len(rows),
+                'valid_rows': result['accepted_count'],
+                'linked_students': result['linked_count'],
+                'failed_rows': len(result['errors'])
+            }
+        }, status=status.HTTP_200_OK if dry_run else status.HTTP_201_CREATED)
+
+
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
 def health_check(request):
     """API Health Check"""
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        database = 'ok'
+    except DatabaseError:
+        database = 'unavailable'
+    
     return Response({
-        'status': 'healthy',
+        'status': 'healthy' if database == 'ok' else 'degraded',
         'message': 'Student Management API is running!',
+        'database': database,
         'timestamp': timezone.now()
     }, status=status.HTTP_200_OK)
 
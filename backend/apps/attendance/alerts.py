@@ -0,0 +1,85 @@
+# Low-attendance digest notifications for students and their class teachers
+from collections import defaultdict
+from apps.accounts.mail_queue import render_email
+from apps.classes.models import Class
+from apps.students.models import Student
+from .summaries import compute_attendance_stats
+
+STUDENT_SUBJECT = "Cảnh báo chuyên cần - EduAttend"
+ADVISOR_SUBJECT = "Danh sách sinh viên chuyên cần thấp - EduAttend"
+
+
+def find_low_attendance(threshold, min_sessions=1, stats=None):
+    """Return [(student_id, class_id, stats)] for enrollments below the threshold"""
+    if stats is None:
+        stats = compute_attendance_stats()
+    return [
+        (student_id, class_id, values)
+        for (student_id, class_id), values in stats.items()
+        if values['total_sessions'] >= min_sessions and values['attendance_rate'] < threshold
+    ]
+
+
+def build_digests(low_attendance, threshold):
+    """
+    Group low-attendance entries per recipient.
+
+    Students get one message listing their classes, class teachers get one
+    message listing their students. Names are loaded with one query per table.
+    """
+    if not low_attendance:
+        return []
+
+    student_ids = {student_id for student_id, _, _ in low_attendance}
+    class_ids = {class_id for _, class_id, _ in low_attendance}
+    students = {
+        student['id']: student
+        for student in Student.objects.filter(id__in=student_ids).values(
+            'id', 'student_id', 'first_name', 'last_name', 'email'
+        )
+    }
+    classes = {
+        class_obj['id']: class_obj
+        for class_obj in Class.objects.filter(id__in=class_ids).values(
+            'id', 'class_id', 'class_name',
+            'teacher__email', 'teacher__first_name', 'teacher__last_name'
+        )
+    }
+
+    per_student = defaultdict(list)
+    per_advisor = defaultdict(list)
+    advisor_names = {}
+    for student_id, class_id, values in low_attendance:
+        student = students[student_id]
+        class_obj = classes[class_id]
+        item = {
+            'class_id': class_obj['class_id'],
+            'class_name': class_obj['class_name'],
+            'student_code': student['student_id'],
+            'student_name': f"{student['first_name']} {student['last_name']}".strip(),
+            **values,
+        }
+        if student['email']:
+            per_student[student['email']].append(item)
+        if class_obj['teacher__email']:
+            per_advisor[class_obj['teacher__email']].append(item)
+            advisor_names[class_obj['teacher__email']] = (
+                f"{class_obj['teacher__first_name']} {class_obj['teacher__last_name']}".strip()
+            )
+
+    messages = []
+    for email, items in per_student.items():
+        items.sort(key=lambda item: item['class_id'])
+        text, html = render_email('attendance/emails/absence_digest_student', {
+            'name': items[0]['student_name'], 'items': items, 'threshold': threshold
+        })
+        messages.append((email, STUDENT_SUBJECT, text, html))
+
+    for email, items in per_advisor.items():
+        items.sort(key=lambda item: (item['class_id'], item['attendance_rate']))
+        text, html = render_email('attendance/emails/absence_digest_advisor', {
+            'name': advisor_names[email], 'items': items, 'threshold': threshold
+        })
+        messages.append((email, ADVISOR_SUBJECT, text, html))
+
+    return messages
@@ -0,0 +1,108 @@
+# Session close-out: deactivate ended sessions and record the students who never checked in
+from datetime import datetime
+
+from django.db import connections, router, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.classes.models import ClassStudent
+from .models import Attendance, AttendanceSession
+from .summaries import refresh_attendance_summaries
+
+
+def session_end(session):
+    return timezone.make_aware(datetime.combine(session.session_date, session.end_time))
+
+
+def ended_sessions(now=None, class_ids=None):
+    """Sessions of all (or the given) classes whose end time has passed and that are not closed yet"""
+    local = timezone.localtime(now or timezone.now())
+    sessions = AttendanceSession.objects.filter(closed_at__isnull=True).filter(
+        Q(session_date__lt=local.date()) | Q(session_date=local.date(), end_time__lte=local.time())
+    )
+    if class_ids is not None:
+        sessions = sessions.filter(class_obj_id__in=class_ids)
+    return sessions
+
+
+def _insert_absences(connection, session, now):
+    """
+    INSERT ... SELECT an absent row for every active enrollment made by the
+    end of the session and without a row yet; returns the row count
+    """
+    attendance = Attendance._meta
+    enrollment = ClassStudent._meta
+    qn = connection.ops.quote_name
+
+    def column(meta, name):
+        return qn(meta.get_field(name).column)
+
+    stamp = connection.ops.adapt_datetimefield_value(now)
+    ended = connection.ops.adapt_datetimefield_value(session_end(session))
+    sql = (
+        f'INSERT INTO {qn(attendance.db_table)} '
+        f'({column(attendance, "session")}, {column(attendance, "student")}, {column(attendance, "status")}, '
+        f'{column(attendance, "created_at")}, {column(attendance, "updated_at")}) '
+        f'SELECT %s, e.{column(enrollment, "student")}, %s, %s, %s '
+        f'FROM {qn(enrollment.db_table)} e '
+        f'WHERE e.{column(enrollment, "class_obj")} = %s AND e.{column(enrollment, "is_active")} = %s '
+        f'AND e.{column(enrollment, "enrolled_at")} <= %s '
+        f'AND NOT EXISTS (SELECT 1 FROM {qn(attendance.db_table)} a '
+        f'WHERE a.{column(attendance, "session")} = %s AND a.{column(attendance, "student")} = e.{column(enrollment, "student")})'
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [session.pk, 'absent', stamp, stamp, session.class_obj_id, True, ended, session.pk])
+        return cursor.rowcount
+
+
+def close_session(session, now=None, refresh_summaries=True):
+    """
+    Close one session: deactivate it, check out the students still checked
+    in at its end time and insert absent rows for the students enrolled by
+    then who never checked in, in one INSERT ... SELECT.
+
+    Marking the session closed is the first statement and only succeeds
+    once, so concurrent close-outs do not double-insert. Returns None when
+    the session was already closed.
+    """
+    now = now or timezone.now()
+    alias = router.db_for_write(Attendance)
+    with transaction.atomic(using=alias):
+        claimed = AttendanceSession.objects.using(alias).filter(pk=session.pk, closed_at__isnull=True).update(
+            is_active=False, closed_at=now, updated_at=now
+        )
+        if not claimed:
+            return None
+        checked_out = Attendance.objects.using(alias).filter(
+            session_id=session.pk, check_in_time__isnull=False, check_out_time__isnull=True
+        ).update(check_out_time=session_end(session), updated_at=now)
+        absent = _insert_absences(connections[alias], session, now)
+        if refresh_summaries:
+            refresh_attendance_summaries(class_ids=[session.class_obj_id])
+
+    session.is_active = False
+    session.closed_at = now
+    return {'absent': absent, 'checked_out': checked_out}
+
+
+def close_if_ended(session, now=None):
+    """Lazy close-out for views that read a session after its end time"""
+    now = now or timezone.now()
+    if session.closed_at is None and session_end(session) <= now:
+        return close_session(session, now)
+    return None
+
+
+def close_ended_sessions(now=None, class_ids=None):
+    """Close every ended session, then refresh the summaries of their classes once"""
+    now = now or timezone.now()
+    closed = []
+    absent = 0
+    for session in ended_sessions(now, class_ids).order_by('session_date', 'end_time'):
+        result = close_session(session, now, refresh_summaries=False)
+        if result is not None:
+            closed.append(session)
+            absent += result['absent']
+    if closed:
+        refresh_attendance_summaries(class_ids={session.class_obj_id for session in closed})
+    return {'sessions': len(closed), 'absent': absent}
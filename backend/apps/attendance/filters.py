@@ -0,0 +1,32 @@
+import django_filters
+
+from .models import Attendance, AttendanceSession
+
+
+class AttendanceFilter(django_filters.FilterSet):
+    """
+    ?session_id=, ?student_id=, ?class_id=, ?status=,
+    ?created_at_after=/?created_at_before= (YYYY-MM-DD)
+    """
+    session_id = django_filters.NumberFilter(field_name='session_id')
+    student_id = django_filters.NumberFilter(field_name='student_id')
+    class_id = django_filters.NumberFilter(field_name='session__class_obj_id')
+    created_at = django_filters.DateFromToRangeFilter()
+
+    class Meta:
+        model = Attendance
+        fields = ['session_id', 'student_id', 'class_id', 'status', 'created_at']
+
+
+class AttendanceSessionFilter(django_filters.FilterSet):
+    """
+    ?class_id=, ?teacher_id=, ?is_active=,
+    ?session_date_after=/?session_date_before= (YYYY-MM-DD)
+    """
+    class_id = django_filters.NumberFilter(field_name='class_obj_id')
+    teacher_id = django_filters.NumberFilter(field_name='class_obj__teacher_id')
+    session_date = django_filters.DateFromToRangeFilter()
+
+    class Meta:
+        model = AttendanceSession
+        fields = ['class_id', 'teacher_id', 'session_date', 'is_active']
@@ -0,0 +1,167 @@
+# Attendance import pipeline: resolve a chunk of rows in bulk, validate in memory, write in batches
+from datetime import datetime
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime, parse_time
+
+from apps.classes.models import ClassStudent
+from apps.core.bulk_import import INSERT, UPSERT, existing_keys, row_key, split_existing, write_rows
+from apps.students.models import Student
+from .models import Attendance, AttendanceSession
+
+COLUMN_ALIASES = {
+    'student_id': ['student_id', 'mssv', 'ma_sinh_vien', 'id'],
+    'session_id': ['session_id', 'buoi_diem_danh', 'session'],
+    'status': ['status', 'trang_thai', 'attendance_status'],
+    'check_in_time': ['check_in_time', 'gio_vao', 'time_in'],
+    'check_out_time': ['check_out_time', 'gio_ra', 'time_out'],
+    'notes': ['notes', 'ghi_chu', 'note'],
+}
+
+# Codes and their Vietnamese labels ('Có mặt', 'Vắng mặt', ...) are both accepted
+STATUSES = {
+    **{code: code for code, _ in Attendance.STATUS_CHOICES},
+    **{label.lower(): code for code, label in Attendance.STATUS_CHOICES},
+}
+DEFAULT_STATUS = 'present'
+
+# Natural key (Attendance.Meta.unique_together) and what an upsert overwrites
+KEY_FIELDS = ['session_id', 'student_id']
+UNIQUE_FIELDS = ['session', 'student']
+UPDATE_FIELDS = ['status', 'check_in_time', 'check_out_time', 'notes', 'updated_at']
+
+CHUNK_SIZE = 2000
+
+
+def _resolve(rows):
+    """Students, sessions and active enrollments referenced by a chunk, in three queries"""
+    student_codes = {row['student_id'] for _, row in rows if row['student_id']}
+    session_pks = {int(row['session_id']) for _, row in rows if row['session_id'].isdigit()}
+
+    students = dict(
+        Student.objects.filter(student_id__in=student_codes).values_list('student_id', 'pk')
+    )
+    sessions = {
+        session.pk: session
+        for session in AttendanceSession.objects.filter(pk__in=session_pks).select_related('class_obj')
+    }
+    enrolled = set(
+        ClassStudent.objects.filter(
+            class_obj_id__in={session.class_obj_id for session in sessions.values()},
+            student_id__in=students.values(),
+            is_active=True,
+        ).values_list('class_obj_id', 'student_id')
+    )
+    return students, sessions, enrolled
+
+
+def _datetime(value, session):
+    """Full timestamps, or a bare time (07:35) on the session's date"""
+    parsed = parse_datetime(value)
+    if parsed is None:
+        clock = parse_time(value)
+        if clock is None:
+            raise ValueError(value)
+        parsed = datetime.combine(session.session_date, clock)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def _validate(row, students, sessions, enrolled, user):
+    """Build an unsaved Attendance from a normalized row, or return an error message"""
+    if not row['student_id'] or not row['session_id']:
+        return None, 'Thiếu thông tin bắt buộc: mã sinh viên và buổi điểm danh'
+
+    session = sessions.get(int(row['session_id'])) if row['session_id'].isdigit() else None
+    if session is None:
+        return None, f'Không tìm thấy buổi điểm danh {row["session_id"]}'
+    if user.role != 'admin' and session.class_obj.teacher_id != user.pk:
+        return None, f'Bạn không có quyền nhập điểm danh cho buổi {row["session_id"]}'
+
+    student_pk = students.get(row['student_id'])
+    if student_pk is None:
+        return None, f'Không tìm thấy sinh viên {row["student_id"]}'
+    if (session.class_obj_id, student_pk) not in enrolled:
+        return None, f'Sinh viên {row["student_id"]} không thuộc lớp của buổi điểm danh này'
+
+    status = STATUSES.get((row['status'] or DEFAULT_STATUS).lower())
+    if status is None:
+        return None, f'Trạng thái không hợp lệ: {row["status"]}'
+
+    try:
+        check_in_time = _datetime(row['check_in_time'], session) if row['check_in_time'] else None
+        check_out_time = _datetime(row['check_out_time'], session) if row['check_out_time'] else None
+    except ValueError as e:
+        return None, f'Thời gian không hợp lệ: {e}'
+    # Historical sheets rarely carry times: attending students arrived at the start
+    if check_in_time is None and status in ('present', 'late'):
+        check_in_time = timezone.make_aware(datetime.combine(session.session_date, session.start_time))
+
+    return Attendance(
+        session_id=session.pk,
+        student_id=student_pk,
+        status=status,
+        check_in_time=check_in_time,
+        check_out_time=check_out_time,
+        notes=row['notes'] or None,
+    ), None
+
+
+def ingest_attendance(rows, user, mode=INSERT, dry_run=False, chunk_size=CHUNK_SIZE):
+    """
+    Import attendance rows given as (row number, dict) pairs.
+
+    Each chunk costs three lookup queries (students, sessions, enrollments)
+    plus one query for records that already exist; rows are then validated
+    in memory and written with bulk_create, all in one transaction. Records
+    that already exist are reported as errors (insert), overwritten (upsert)
+    or left alone (skip-existing).
+    """
+    errors = []
+    created = []
+    updated = []
+    skipped = []
+    seen = set()
+
+    with transaction.atomic():
+        for start in range(0, len(rows), chunk_size):
+            chunk = [
+                (number, {field: (raw.get(field) or '').strip() for field in COLUMN_ALIASES})
+                for number, raw in rows[start:start + chunk_size]
+            ]
+            students, sessions, enrolled = _resolve(chunk)
+
+            candidates = []
+            row_numbers = {}
+            for number, row in chunk:
+                attendance, error = _validate(row, students, sessions, enrolled, user)
+                if not error and row_key(attendance, KEY_FIELDS) in seen:
+                    error = 'Điểm danh bị trùng trong tệp'
+                if error:
+                    errors.append({'row': number, 'error': error, 'data': row})
+                    continue
+                seen.add(row_key(attendance, KEY_FIELDS))
+                candidates.append(attendance)
+                row_numbers[id(attendance)] = (number, row)
+
+            existing = existing_keys(Attendance, KEY_FIELDS, candidates)
+            to_write, found = split_existing(candidates, existing, KEY_FIELDS, mode)
+            if mode == INSERT:
+                for attendance in found:
+                    number, row = row_numbers[id(attendance)]
+                    errors.append({'row': number, 'error': 'Sinh viên đã được điểm danh trong buổi này', 'data': row})
+            elif mode == UPSERT:
+                updated.extend(found)
+            else:
+                skipped.extend(found)
+
+            if not dry_run:
+                write_rows(Attendance, to_write, mode, UNIQUE_FIELDS, UPDATE_FIELDS)
+            created.extend(
+                attendance for attendance in to_write if row_key(attendance, KEY_FIELDS) not in existing
+            )
+
+    errors.sort(key=lambda error: error['row'])
+    return {'created': created, 'updated': updated, 'skipped': skipped, 'errors': errors}
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from apps.attendance.closeout import close_ended_sessions, ended_sessions
+
+
+class Command(BaseCommand):
+    help = 'Close attendance sessions whose end time has passed and record absences (run from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report how many sessions are due'
+        )
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            self.stdout.write(f'{ended_sessions().count()} sessions due for close-out')
+            return
+
+        result = close_ended_sessions()
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Closed {result["sessions"]} sessions, recorded {result["absent"]} absences'
+        ))
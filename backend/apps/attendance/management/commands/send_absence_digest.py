@@ -0,0 +1,59 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from apps.accounts.mail_queue import enqueue_emails, flush_queue
+from apps.attendance.alerts import build_digests, find_low_attendance
+from apps.attendance.summaries import compute_attendance_stats, refresh_attendance_summaries
+
+
+class Command(BaseCommand):
+    help = 'Nightly digest of students whose attendance rate is below the alert threshold'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            default=getattr(settings, 'ABSENCE_ALERT_THRESHOLD', 80),
+            help='Attendance rate (%%) below which students are reported'
+        )
+        parser.add_argument(
+            '--min-sessions',
+            type=int,
+            default=getattr(settings, 'ABSENCE_ALERT_MIN_SESSIONS', 3),
+            help='Only report classes that have held at least this many sessions'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report recipients without queueing any email'
+        )
+        parser.add_argument(
+            '--queue-only',
+            action='store_true',
+            help='Queue the digests and leave delivery to the send_queued_mail worker'
+        )
+
+    def handle(self, *args, **options):
+        threshold = options['threshold']
+
+        # One set-based pass feeds both the summaries and the digest
+        stats = compute_attendance_stats()
+        if not options['dry_run']:
+            refreshed = refresh_attendance_summaries(stats=stats)
+            self.stdout.write(f'Refreshed {refreshed} attendance summaries')
+
+        low_attendance = find_low_attendance(threshold, options['min_sessions'], stats)
+        messages = build_digests(low_attendance, threshold)
+        self.stdout.write(
+            f'{len(low_attendance)} enrollments below {threshold}% -> {len(messages)} recipients'
+        )
+
+        if options['dry_run'] or not messages:
+            return
+
+        enqueue_emails(messages)
+        if options['queue_only']:
+            self.stdout.write(self.style.SUCCESS(f'✅ Queued {len(messages)} digest emails'))
+            return
+
+        sent, failed = flush_queue()
+        self.stdout.write(self.style.SUCCESS(f'✅ Sent {sent} digest emails, {failed} failed'))
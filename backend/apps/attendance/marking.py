@@ -0,0 +1,74 @@
+# Roll call: mark the attendance of a whole session in one statement
+from django.utils import timezone
+
+from apps.classes.models import ClassStudent
+from apps.core.bulk_import import UPSERT, write_rows
+from .ingest import UNIQUE_FIELDS
+from .models import Attendance
+
+# A manual roll call keeps the check-in times recorded by QR check-in
+UPDATE_FIELDS = ['status', 'check_in_time', 'notes', 'updated_at']
+ATTENDING = ('present', 'late')
+
+
+def mark_session(session, attendances, default_status=None):
+    """
+    Upsert the statuses of a session's students.
+
+    attendances is a list of {student_id, status[, notes]} dicts keyed by
+    student code. All codes are checked against the active roster in one
+    query and the session's current records are read in another; the
+    marks are then written with a single INSERT ... ON CONFLICT DO UPDATE.
+    Returns the unknown codes, or the number of marked students and the
+    per-status counts of the whole session.
+    """
+    roster = dict(
+        ClassStudent.objects.filter(class_obj_id=session.class_obj_id, is_active=True)
+        .values_list('student__student_id', 'student_id')
+    )
+    marks = {str(item['student_id']).strip(): item for item in attendances}
+    unknown = [code for code in marks if code not in roster]
+    if unknown:
+        return {'unknown': unknown}
+
+    current = {
+        student_pk: (status, check_in_time, notes)
+        for student_pk, status, check_in_time, notes in Attendance.objects.filter(session=session)
+        .values_list('student_id', 'status', 'check_in_time', 'notes')
+    }
+    if default_status:
+        for code, student_pk in roster.items():
+            if student_pk not in current:
+                marks.setdefault(code, {'status': default_status})
+
+    now = timezone.now()
+    records = []
+    for code, item in marks.items():
+        student_pk = roster[code]
+        _, check_in_time, notes = current.get(student_pk, (None, None, None))
+        status = item['status']
+        if status in ATTENDING:
+            check_in_time = check_in_time or now
+        else:
+            check_in_time = None
+        records.append(Attendance(
+            session_id=session.pk,
+            student_id=student_pk,
+            status=status,
+            check_in_time=check_in_time,
+            notes=item.get('notes', notes) or None,
+        ))
+        current[student_pk] = (status, check_in_time, notes)
+
+    write_rows(Attendance, records, UPSERT, UNIQUE_FIELDS, UPDATE_FIELDS)
+
+    counts = {code: 0 for code, _ in Attendance.STATUS_CHOICES}
+    for status, _, _ in current.values():
+        counts[status] += 1
+    return {
+        'unknown': [],
+        'marked': len(records),
+        'total_students': len(roster),
+        'unmarked': len(roster) - len(current.keys() & set(roster.values())),
+        'counts': counts,
+    }
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.7 on 2026-10-19 17:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['session', 'status'], name='attendances_session_8a4b2e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['student', '-created_at'], name='attendances_student_9129e5_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['-created_at'], name='attendances_created_337792_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['updated_at'], name='attendances_updated_4eba27_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='attendancesession',
+            index=models.Index(fields=['class_obj', 'session_date'], name='attendance__class_o_e1a868_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='attendancesession',
+            index=models.Index(fields=['-session_date', '-start_time'], name='attendance__session_cb6001_idx'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.7 on 2026-10-19 18:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0002_attendance_attendances_session_8a4b2e_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attendancesession',
+            name='closed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='attendancesession',
+            index=models.Index(fields=['closed_at', 'session_date'], name='attendance__closed__27a8cc_idx'),
+        ),
+    ]
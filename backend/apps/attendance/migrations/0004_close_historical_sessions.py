@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-19 20:05
+
+from django.db import migrations
+from django.db.models import Q
+from django.utils import timezone
+
+
+def close_historical_sessions(apps, schema_editor):
+    # Sessions that ended before close-out existed keep their attendance as
+    # recorded; without closed_at the first close-out run would mark students
+    # absent from sessions held before they enrolled
+    AttendanceSession = apps.get_model('attendance', 'AttendanceSession')
+    now = timezone.now()
+    local = timezone.localtime(now)
+    AttendanceSession.objects.filter(closed_at__isnull=True).filter(
+        Q(session_date__lt=local.date()) | Q(session_date=local.date(), end_time__lte=local.time())
+    ).update(closed_at=now, updated_at=now)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0003_attendancesession_closed_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(close_historical_sessions, migrations.RunPython.noop),
+    ]
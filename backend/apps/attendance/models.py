@@ -16,6 +16,7 @@ class AttendanceSession(models.Model):
     location = models.CharField(max_length=200, blank=True, null=True)
     qr_code = models.CharField(max_length=100, unique=True, blank=True, null=True)
     is_active = models.BooleanField(default=True)
+    closed_at = models.DateTimeField(null=True, blank=True)
     created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='created_sessions', null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -25,6 +26,11 @@ class AttendanceSession(models.Model):
         verbose_name = 'Buổi điểm danh'
         verbose_name_plural = 'Buổi điểm danh'
         ordering = ['-session_date', '-start_time']
+        indexes = [
+            models.Index(fields=['class_obj', 'session_date']),
+            models.Index(fields=['-session_date', '-start_time']),
+            models.Index(fields=['closed_at', 'session_date']),
+        ]
     
     def __str__(self):
         return f"{self.class_obj.class_id} - {self.session_name} ({self.session_date})"
@@ -54,6 +60,12 @@ class Attendance(models.Model):
         verbose_name_plural = 'Điểm danh'
         unique_together = ['session', 'student']
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['session', 'status']),
+            models.Index(fields=['student', '-created_at']),
+            models.Index(fields=['-created_at']),
+            models.Index(fields=['updated_at']),
+        ]
     
     def __str__(self):
         return f"{self.student.student_id} - {self.session.session_name}: {self.get_status_display()}"
@@ -2,10 +2,11 @@ from rest_framework import serializers
 from apps.accounts.serializers import UserSerializer
 from apps.students.serializers import StudentSerializer
 from apps.classes.serializers import ClassSerializer
+from apps.core.serializers import DynamicFieldsMixin
 from .models import AttendanceSession, Attendance, AttendanceSummary
 
 
-class AttendanceSessionSerializer(serializers.ModelSerializer):
+class AttendanceSessionSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer for AttendanceSession model"""
     class_obj = ClassSerializer(read_only=True)
     created_by = UserSerializer(read_only=True)
@@ -15,9 +16,9 @@ class AttendanceSessionSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'class_obj', 'session_name', 'description',
             'session_date', 'start_time', 'end_time', 'location',
-            'qr_code', 'is_active', 'created_by', 'created_at', 'updated_at'
+            'qr_code', 'is_active', 'closed_at', 'created_by', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'closed_at', 'created_at', 'updated_at']
 
 
 class AttendanceSessionCreateSerializer(serializers.ModelSerializer):
@@ -42,7 +43,7 @@ class AttendanceSessionCreateSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
-class AttendanceSerializer(serializers.ModelSerializer):
+class AttendanceSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer for Attendance model"""
     student = StudentSerializer(read_only=True)
     session = AttendanceSessionSerializer(read_only=True)
@@ -85,23 +86,38 @@ class AttendanceCreateSerializer(serializers.ModelSerializer):
 
 
 class AttendanceBulkCreateSerializer(serializers.Serializer):
-    """Serializer for bulk creating attendance records"""
+    """
+    Serializer for bulk marking attendance of a session.
+
+    default_status, when given, is applied to every enrolled student that
+    is neither in attendances nor already recorded (e.g. 'absent' after
+    calling the roll).
+    """
     session_id = serializers.IntegerField()
     attendances = serializers.ListField(
         child=serializers.DictField()
     )
+    default_status = serializers.ChoiceField(choices=Attendance.STATUS_CHOICES, required=False)
     
     def validate_attendances(self, value):
         """Validate attendance data"""
+        statuses = dict(Attendance.STATUS_CHOICES)
+        seen = set()
         for attendance_data in value:
             if 'student_id' not in attendance_data:
                 raise serializers.ValidationError("Thiếu student_id trong dữ liệu điểm danh")
             if 'status' not in attendance_data:
                 raise serializers.ValidationError("Thiếu status trong dữ liệu điểm danh")
+            if attendance_data['status'] not in statuses:
+                raise serializers.ValidationError(f"Trạng thái không hợp lệ: {attendance_data['status']}")
+            student_id = str(attendance_data['student_id']).strip()
+            if student_id in seen:
+                raise serializers.ValidationError(f"Sinh viên {student_id} bị trùng trong dữ liệu điểm danh")
+            seen.add(student_id)
         return value
 
 
-class AttendanceSummarySerializer(serializers.ModelSerializer):
+class AttendanceSummarySerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer for AttendanceSummary model"""
     student = StudentSerializer(read_only=True)
     class_obj = ClassSerializer(read_only=True)
@@ -0,0 +1,92 @@
+# Set-based attendance statistics shared by summaries, digests and reports
+from decimal import Decimal
+from django.db.models import Count, Q
+from django.utils import timezone
+from apps.classes.models import ClassStudent
+from .models import Attendance, AttendanceSession, AttendanceSummary
+
+ATTENDANCE_STATUSES = ['present', 'absent', 'late', 'excused']
+
+
+def compute_attendance_stats(class_ids=None, as_of=None, student_ids=None):
+    """
+    Compute per-enrollment attendance counts for all (or the given) classes
+    and students.
+
+    Runs three grouped queries (sessions per class, status counts per
+    student/class, active enrollments) and combines them in memory, so the
+    cost in Python is proportional to the number of enrollments rather than
+    the number of attendance rows. Enrolled students without an attendance
+    row for a held session are counted as absent.
+
+    Returns a dict keyed by (student_id, class_id).
+    """
+    as_of = as_of or timezone.localdate()
+
+    sessions = AttendanceSession.objects.filter(session_date__lte=as_of)
+    attendances = Attendance.objects.filter(session__session_date__lte=as_of)
+    enrollments = ClassStudent.objects.filter(is_active=True, class_obj__is_active=True)
+    if class_ids is not None:
+        sessions = sessions.filter(class_obj_id__in=class_ids)
+        attendances = attendances.filter(session__class_obj_id__in=class_ids)
+        enrollments = enrollments.filter(class_obj_id__in=class_ids)
+    if student_ids is not None:
+        attendances = attendances.filter(student_id__in=student_ids)
+        enrollments = enrollments.filter(student_id__in=student_ids)
+        sessions = sessions.filter(class_obj_id__in=enrollments.values('class_obj_id'))
+
+    sessions_per_class = dict(
+        sessions.values('class_obj_id').annotate(total=Count('id')).values_list('class_obj_id', 'total')
+    )
+
+    counts = {}
+    rows = attendances.values('student_id', 'session__class_obj_id').annotate(
+        **{status: Count('id', filter=Q(status=status)) for status in ATTENDANCE_STATUSES}
+    )
+    for row in rows:
+        counts[(row['student_id'], row['session__class_obj_id'])] = row
+
+    stats = {}
+    for student_id, class_id in enrollments.values_list('student_id', 'class_obj_id'):
+        total = sessions_per_class.get(class_id, 0)
+        row = counts.get((student_id, class_id), {})
+        present = row.get('present', 0)
+        late = row.get('late', 0)
+        excused = row.get('excused', 0)
+        # Missing rows for held sessions are absences
+        absent = max(total - present - late - excused, row.get('absent', 0))
+        if total > 0:
+            rate = round(Decimal(present + excused) / total * 100, 2)
+        else:
+            rate = Decimal('0.00')
+        stats[(student_id, class_id)] = {
+            'total_sessions': total,
+            'present_count': present,
+            'absent_count': absent,
+            'late_count': late,
+            'excused_count': excused,
+            'attendance_rate': rate,
+        }
+    return stats
+
+
+def refresh_attendance_summaries(class_ids=None, stats=None):
+    """Upsert AttendanceSummary rows from set-based stats in one statement per batch"""
+    if stats is None:
+        stats = compute_attendance_stats(class_ids)
+
+    summaries = [
+        AttendanceSummary(student_id=student_id, class_obj_id=class_id, **values)
+        for (student_id, class_id), values in stats.items()
+    ]
+    AttendanceSummary.objects.bulk_create(
+        summaries,
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=['student', 'class_obj'],
+        update_fields=[
+            'total_sessions', 'present_count', 'absent_count', 'late_count',
+            'excused_count', 'attendance_rate', 'updated_at'
+        ],
+    )
+    return len(summaries)
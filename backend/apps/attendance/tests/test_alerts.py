@@ -0,0 +1,82 @@
+from datetime import date, time, timedelta
+from io import StringIO
+
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.accounts.models import User
+from apps.attendance.models import Attendance, AttendanceSession
+from apps.classes.models import Class, ClassStudent
+from apps.students.models import Student
+
+
+class AbsenceDigestTests(TestCase):
+    """The nightly digest sends one email per student and per class teacher"""
+
+    @classmethod
+    def setUpTestData(cls):
+        teachers = [
+            User.objects.create_user(
+                email=f'gv{index}@test.edu.vn', username=f'gv{index}', password='Teacher@12345',
+                first_name='Giảng', last_name=f'Viên {index}', role='teacher',
+            )
+            for index in range(2)
+        ]
+        classes = [
+            Class.objects.create(class_id=f'LOP0{index}', class_name=f'Lớp {index}', teacher=teacher)
+            for index, teacher in enumerate([teachers[0], teachers[0], teachers[1]])
+        ]
+        students = Student.objects.bulk_create([
+            Student(
+                student_id=f'SV{index:03d}', first_name='Vũ', last_name=f'Hải {index}',
+                email=f'sv{index}@test.edu.vn', gender='male', date_of_birth=date(2003, 1, 1),
+            )
+            for index in range(4)
+        ])
+        # SV000 misses everything in LOP00 and LOP01, SV001 in LOP00 and LOP02; SV002 and SV003 always attend
+        rosters = {classes[0]: students[:3], classes[1]: students[:1], classes[2]: [students[1], students[3]]}
+        attending = {students[2], students[3]}
+        for class_obj, roster in rosters.items():
+            ClassStudent.objects.bulk_create([ClassStudent(class_obj=class_obj, student=student) for student in roster])
+            for week in range(3):
+                session = AttendanceSession.objects.create(
+                    class_obj=class_obj, session_name=f'Buổi {week + 1}',
+                    session_date=timezone.localdate() - timedelta(weeks=week + 1),
+                    start_time=time(7, 0), end_time=time(9, 0), created_by=class_obj.teacher,
+                )
+                Attendance.objects.bulk_create([
+                    Attendance(session=session, student=student, status='present')
+                    for student in roster if student in attending
+                ])
+
+    def test_one_digest_per_recipient(self):
+        out = StringIO()
+        call_command('send_absence_digest', threshold=80, min_sessions=3, stdout=out)
+        self.assertIn('4 enrollments below 80% -> 4 recipients', out.getvalue())
+
+        digests = {message.to[0]: message.body for message in mail.outbox}
+        self.assertEqual(len(mail.outbox), 4)
+        self.assertEqual(set(digests), {'sv0@test.edu.vn', 'sv1@test.edu.vn', 'gv0@test.edu.vn', 'gv1@test.edu.vn'})
+
+        # Students get their classes, teachers their students; attending students are left out
+        self.assertIn('LOP00', digests['sv0@test.edu.vn'])
+        self.assertIn('LOP01', digests['sv0@test.edu.vn'])
+        self.assertNotIn('LOP02', digests['sv0@test.edu.vn'])
+        self.assertIn('[LOP00] SV000', digests['gv0@test.edu.vn'])
+        self.assertIn('[LOP01] SV000', digests['gv0@test.edu.vn'])
+        self.assertIn('[LOP00] SV001', digests['gv0@test.edu.vn'])
+        self.assertNotIn('LOP02', digests['gv0@test.edu.vn'])
+        self.assertIn('[LOP02] SV001', digests['gv1@test.edu.vn'])
+        for body in digests.values():
+            self.assertNotIn('SV002', body)
+            self.assertNotIn('SV003', body)
+
+    def test_min_sessions_and_dry_run(self):
+        out = StringIO()
+        call_command('send_absence_digest', threshold=80, min_sessions=4, stdout=out)
+        self.assertIn('0 enrollments', out.getvalue())
+
+        call_command('send_absence_digest', threshold=80, min_sessions=3, dry_run=True, stdout=StringIO())
+        self.assertEqual(mail.outbox, [])
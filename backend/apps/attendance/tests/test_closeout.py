@@ -0,0 +1,121 @@
+import threading
+import unittest
+from datetime import date, time, timedelta
+
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.accounts.models import User
+from apps.attendance.closeout import close_ended_sessions, close_session
+from apps.attendance.models import Attendance, AttendanceSession
+from apps.classes.models import Class, ClassStudent
+from apps.students.models import Student
+
+
+def seed_class():
+    """A class of four active students, one of them enrolled only today, and one who left"""
+    teacher = User.objects.create_user(
+        email='gv@test.edu.vn', username='gv', password='Teacher@12345', role='teacher'
+    )
+    class_obj = Class.objects.create(class_id='LOP01', class_name='Mạng máy tính', teacher=teacher)
+    students = Student.objects.bulk_create([
+        Student(
+            student_id=f'SV{index:03d}', first_name='Trần', last_name=f'Thị {index}',
+            email=f'sv{index}@test.edu.vn', gender='female', date_of_birth=date(2003, 1, 1),
+        )
+        for index in range(5)
+    ])
+    ClassStudent.objects.bulk_create([
+        ClassStudent(class_obj=class_obj, student=student, is_active=index != 4)
+        for index, student in enumerate(students)
+    ])
+    # enrolled_at is auto_now_add, so backdate all but the newcomer afterwards
+    ClassStudent.objects.exclude(student=students[3]).update(enrolled_at=timezone.now() - timedelta(days=60))
+    session = AttendanceSession.objects.create(
+        class_obj=class_obj, session_name='Buổi 1', session_date=timezone.localdate() - timedelta(days=30),
+        start_time=time(7, 0), end_time=time(9, 0), created_by=teacher,
+    )
+    Attendance.objects.create(
+        session=session, student=students[0], status='present', check_in_time=timezone.now() - timedelta(days=30)
+    )
+    return teacher, class_obj, students, session
+
+
+class CloseOutTests(TestCase):
+    """Closing a session records absences for the students enrolled by its end"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.teacher, cls.class_obj, cls.students, cls.session = seed_class()
+
+    def statuses(self, session=None):
+        return dict(
+            Attendance.objects.filter(session=session or self.session).values_list('student__student_id', 'status')
+        )
+
+    def test_close_session(self):
+        result = close_session(self.session)
+        self.assertEqual(result, {'absent': 2, 'checked_out': 1})
+        # The newcomer and the student who left are not marked absent
+        self.assertEqual(self.statuses(), {'SV000': 'present', 'SV001': 'absent', 'SV002': 'absent'})
+
+        session = AttendanceSession.objects.get(pk=self.session.pk)
+        self.assertIsNotNone(session.closed_at)
+        self.assertFalse(session.is_active)
+        checked_in = Attendance.objects.get(session=session, student=self.students[0])
+        self.assertEqual(timezone.localtime(checked_in.check_out_time).time(), time(9, 0))
+
+    def test_a_session_is_claimed_once(self):
+        stale = AttendanceSession.objects.get(pk=self.session.pk)
+        self.assertIsNotNone(close_session(self.session))
+        self.assertIsNone(close_session(stale))
+        self.assertEqual(close_ended_sessions(), {'sessions': 0, 'absent': 0})
+        self.assertEqual(Attendance.objects.filter(session=self.session).count(), 3)
+
+    def test_sessions_still_running_stay_open(self):
+        running = AttendanceSession.objects.create(
+            class_obj=self.class_obj, session_name='Buổi 2', session_date=timezone.localdate(),
+            start_time=time(0, 0), end_time=time(23, 59, 59), created_by=self.teacher,
+        )
+        self.assertEqual(close_ended_sessions(), {'sessions': 1, 'absent': 2})
+        running.refresh_from_db()
+        self.assertIsNone(running.closed_at)
+        self.assertEqual(self.statuses(running), {})
+
+    def test_analytics_closes_an_ended_session(self):
+        client = APIClient(HTTP_HOST='localhost')
+        client.force_authenticate(self.teacher)
+        response = client.get(f'/api/attendance/sessions/{self.session.pk}/analytics/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNotNone(response.data['session_info']['closed_at'])
+        self.assertEqual(response.data['statistics']['present_count'], 1)
+        self.assertEqual(response.data['statistics']['absent_count'], 2)
+        self.assertEqual(self.statuses(), {'SV000': 'present', 'SV001': 'absent', 'SV002': 'absent'})
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', 'SQLite serializes writers on the whole database')
+class ConcurrentCloseOutTests(TransactionTestCase):
+    """Concurrent close-outs of one session insert its absences once"""
+
+    def test_concurrent_claims(self):
+        session = seed_class()[3]
+        barrier = threading.Barrier(2)
+        results = []
+
+        def close():
+            try:
+                barrier.wait()
+                results.append(close_session(AttendanceSession.objects.get(pk=session.pk)))
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=close) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sorted(results, key=bool), [None, {'absent': 2, 'checked_out': 1}])
+        self.assertEqual(Attendance.objects.filter(session=session, status='absent').count(), 2)
@@ -0,0 +1,100 @@
+from datetime import date, time, timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.accounts.models import User
+from apps.attendance.models import Attendance, AttendanceSession
+from apps.classes.models import Class, ClassStudent
+from apps.students.models import Student
+
+
+class BulkMarkTests(TestCase):
+    """Calling the roll upserts the session's statuses in one go"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.teacher = User.objects.create_user(
+            email='gv@test.edu.vn', username='gv', password='Teacher@12345', role='teacher'
+        )
+        cls.class_obj = Class.objects.create(class_id='LOP01', class_name='Hệ điều hành', teacher=cls.teacher)
+        students = Student.objects.bulk_create([
+            Student(
+                student_id=f'SV{index:03d}', first_name='Đỗ', last_name=f'Thu {index}',
+                email=f'sv{index}@test.edu.vn', gender='female', date_of_birth=date(2003, 1, 1),
+            )
+            for index in range(5)
+        ])
+        # SV004 is not enrolled
+        ClassStudent.objects.bulk_create([ClassStudent(class_obj=cls.class_obj, student=student) for student in students[:4]])
+        cls.session = AttendanceSession.objects.create(
+            class_obj=cls.class_obj, session_name='Buổi 1', session_date=timezone.localdate(),
+            start_time=time(0, 0), end_time=time(23, 59, 59), created_by=cls.teacher,
+        )
+        cls.scanned_at = timezone.now() - timedelta(minutes=30)
+        Attendance.objects.create(
+            session=cls.session, student=students[0], status='present', check_in_time=cls.scanned_at, notes='QR'
+        )
+
+    def setUp(self):
+        self.client = APIClient(HTTP_HOST='localhost')
+        self.client.force_authenticate(self.teacher)
+
+    def mark(self, attendances, **extra):
+        return self.client.post('/api/attendance/bulk-mark/', {
+            'session_id': self.session.pk, 'attendances': attendances, **extra,
+        }, format='json')
+
+    def records(self):
+        return {
+            record.student.student_id: record
+            for record in Attendance.objects.filter(session=self.session).select_related('student')
+        }
+
+    def test_re_mark_keeps_the_qr_check_in_time(self):
+        response = self.mark([
+            {'student_id': 'SV000', 'status': 'late'},
+            {'student_id': 'SV001', 'status': 'present'},
+            {'student_id': 'SV002', 'status': 'absent', 'notes': 'Ốm'},
+        ])
+        self.assertEqual(response.status_code, 200)
+        records = self.records()
+        self.assertEqual(records['SV000'].status, 'late')
+        self.assertEqual(records['SV000'].check_in_time, self.scanned_at)
+        self.assertEqual(records['SV000'].notes, 'QR')
+        self.assertIsNotNone(records['SV001'].check_in_time)
+        self.assertIsNone(records['SV002'].check_in_time)
+        self.assertEqual(records['SV002'].notes, 'Ốm')
+
+        self.mark([{'student_id': 'SV000', 'status': 'absent'}])
+        self.assertIsNone(self.records()['SV000'].check_in_time)
+
+    def test_counts(self):
+        response = self.mark([{'student_id': 'SV001', 'status': 'excused'}])
+        self.assertEqual(response.data['marked_count'], 1)
+        self.assertEqual(response.data['total_students'], 4)
+        self.assertEqual(response.data['unmarked_count'], 2)
+        self.assertEqual(response.data['status_counts'], {'present': 1, 'absent': 0, 'late': 0, 'excused': 1})
+
+    def test_default_status_fills_unrecorded_students(self):
+        response = self.mark([{'student_id': 'SV001', 'status': 'present'}], default_status='absent')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['marked_count'], 3)
+        self.assertEqual(response.data['unmarked_count'], 0)
+        self.assertEqual(response.data['status_counts'], {'present': 2, 'absent': 2, 'late': 0, 'excused': 0})
+        # Already recorded students keep their status
+        self.assertEqual(
+            {code: record.status for code, record in self.records().items()},
+            {'SV000': 'present', 'SV001': 'present', 'SV002': 'absent', 'SV003': 'absent'},
+        )
+
+    def test_unknown_codes_mark_nobody(self):
+        response = self.mark([
+            {'student_id': 'SV001', 'status': 'present'},
+            {'student_id': 'SV004', 'status': 'present'},
+            {'student_id': 'SV999', 'status': 'present'},
+        ], default_status='absent')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(sorted(response.data['student_ids']), ['SV004', 'SV999'])
+        self.assertEqual(list(self.records()), ['SV000'])
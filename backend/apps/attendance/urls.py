@@ -14,6 +14,7 @@ urlpatterns = [
     # Attendance records
     path('', views.AttendanceListCreateView.as_view(), name='attendance_list_create'),
     path('<int:pk>/', views.AttendanceDetailView.as_view(), name='attendance_detail'),
+    path('bulk-mark/', views.bulk_mark_attendance, name='bulk_mark_attendance'),
     
     # Statistics and export
     path('statistics/', views.attendance_statistics, name='attendance_statistics'),
@@ -1,7 +1,7 @@
 from rest_framework import generics, status, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
-from django.db.models import Q, Count
+from django.db.models import Q, Count, Prefetch
 from django.http import HttpResponse, JsonResponse
 from django.utils import timezone
 import uuid
@@ -9,66 +9,104 @@ import qrcode
 import io
 import base64
 from datetime import datetime, timedelta
+from apps.accounts.models import User
+from apps.classes.models import Class, ClassStudent
+from apps.core.bulk_import import parse_import_mode
+from apps.core.conditional import ConditionalGetMixin, conditional_get
+from apps.core.serializers import rendered_relations, select_rendered
+from apps.core.db.routers import read_only
+from apps.core.metrics import track_checkin, track_import
+from apps.core.spreadsheets import read_sheet
+from apps.students.models import Student
+from .closeout import close_if_ended
+from .filters import AttendanceFilter, AttendanceSessionFilter
+from .ingest import COLUMN_ALIASES, ingest_attendance
+from .marking import mark_session
 from .models import Attendance, AttendanceSession
-from .serializers import AttendanceSerializer, AttendanceSessionSerializer
+from .serializers import AttendanceSerializer, AttendanceSessionSerializer, AttendanceBulkCreateSerializer
 
 
-class AttendanceListCreateView(generics.ListCreateAPIView):
+class AttendanceListCreateView(ConditionalGetMixin, generics.ListCreateAPIView):
     """List and create attendance records"""
     queryset = Attendance.objects.all()
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = AttendanceSerializer
+    etag_relations = (
+        'student', 'session', 'session__class_obj', 'session__class_obj__teacher', 'session__created_by'
+    )
+    filterset_class = AttendanceFilter
+    ordering_fields = ['created_at', 'updated_at']
     
     def get_queryset(self):
-        queryset = Attendance.objects.all()
-        session_id = self.request.query_params.get('session_id', None)
-        student_id = self.request.query_params.get('student_id', None)
-        
-        if session_id is not None:
-            queryset = queryset.filter(session_id=session_id)
-        if student_id is not None:
-            queryset = queryset.filter(student_id=student_id)
-            
+        # Sessions are prefetched by primary key rather than joined: a join lets
+        # the planner hash the whole sessions table for a handful of rows.
+        # Only the relations rendered for ?fields= / ?expand= are loaded.
+        queryset = select_rendered(Attendance.objects.all(), self.request, ['student'])
+        if rendered_relations(self.request, ['session']):
+            sessions = select_rendered(AttendanceSession.objects.all(), self.request, ['created_by'], 'session__')
+            if rendered_relations(self.request, ['session__class_obj']):
+                sessions = sessions.prefetch_related(Prefetch(
+                    'class_obj',
+                    queryset=select_rendered(Class.objects.all(), self.request, ['teacher'], 'session__class_obj__'),
+                ))
+            queryset = queryset.prefetch_related(Prefetch('session', queryset=sessions))
         return queryset.order_by('-created_at')
 
 
-class AttendanceDetailView(generics.RetrieveUpdateDestroyAPIView):
+class AttendanceDetailView(ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update or delete an attendance record"""
-    queryset = Attendance.objects.all()
     serializer_class = AttendanceSerializer
     permission_classes = [permissions.IsAuthenticated]
+    etag_relations = (
+        'student', 'session', 'session__class_obj', 'session__class_obj__teacher', 'session__created_by'
+    )
+    
+    def get_queryset(self):
+        return select_rendered(Attendance.objects.all(), self.request, [
+            'student', 'session', 'session__created_by', 'session__class_obj', 'session__class_obj__teacher'
+        ])
 
 
-class AttendanceSessionListCreateView(generics.ListCreateAPIView):
+class AttendanceSessionListCreateView(ConditionalGetMixin, generics.ListCreateAPIView):
     """List and create attendance sessions"""
     queryset = AttendanceSession.objects.all()
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = AttendanceSessionSerializer
+    etag_relations = ('class_obj', 'class_obj__teacher', 'created_by')
+    filterset_class = AttendanceSessionFilter
+    ordering_fields = ['session_date', 'closed_at']
     
     def get_queryset(self):
-        queryset = AttendanceSession.objects.all()
-        class_id = self.request.query_params.get('class_id', None)
-        
-        if class_id is not None:
-            queryset = queryset.filter(class_instance_id=class_id)
-            
+        queryset = select_rendered(AttendanceSession.objects.all(), self.request, ['created_by'])
+        if rendered_relations(self.request, ['class_obj']):
+            queryset = queryset.prefetch_related(Prefetch(
+                'class_obj', queryset=select_rendered(Class.objects.all(), self.request, ['teacher'], 'class_obj__')
+            ))
         return queryset.order_by('-session_date', '-start_time')
 
 
-class AttendanceSessionDetailView(generics.RetrieveUpdateDestroyAPIView):
+class AttendanceSessionDetailView(ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update or delete an attendance session"""
-    queryset = AttendanceSession.objects.all()
     serializer_class = AttendanceSessionSerializer
     permission_classes = [permissions.IsAuthenticated]
+    etag_relations = ('class_obj', 'class_obj__teacher', 'created_by')
+    
+    def get_queryset(self):
+        return select_rendered(
+            AttendanceSession.objects.all(), self.request, ['created_by', 'class_obj', 'class_obj__teacher']
+        )
 
 
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
+@read_only
+@conditional_get(Attendance, AttendanceSession)
 def attendance_statistics(request):
     """Get attendance statistics"""
     total_sessions = AttendanceSession.objects.count()
-    total_attendances = Attendance.objects.count()
-    present_count = Attendance.objects.filter(status='present').count()
+    counts = Attendance.objects.aggregate(total=Count('id'), present=Count('id', filter=Q(status='present')))
+    total_attendances = counts['total']
+    present_count = counts['present']
     
     return Response({
         'total_sessions': total_sessions,
@@ -137,6 +175,7 @@ def generate_qr_code(request, session_id):
 
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
+@track_checkin
 def check_in_with_qr(request):
     """Check in using QR code"""
     try:
@@ -220,28 +259,84 @@ def check_in_with_qr(request):
         return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def bulk_mark_attendance(request):
+    """Mark the attendance of a whole session at once"""
+    try:
+        serializer = AttendanceBulkCreateSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        session = AttendanceSession.objects.select_related('class_obj').get(
+            id=serializer.validated_data['session_id']
+        )
+        
+        # Check permission
+        if request.user.role != 'admin' and session.class_obj.teacher_id != request.user.id:
+            return Response(
+                {'error': 'Bạn không có quyền điểm danh buổi học này'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        result = mark_session(
+            session,
+            serializer.validated_data['attendances'],
+            serializer.validated_data.get('default_status')
+        )
+        if result['unknown']:
+            return Response({
+                'error': 'Có sinh viên không thuộc lớp này',
+                'student_ids': result['unknown']
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response({
+            'message': f'Đã điểm danh {result["marked"]} sinh viên',
+            'session_id': session.id,
+            'marked_count': result['marked'],
+            'total_students': result['total_students'],
+            'unmarked_count': result['unmarked'],
+            'status_counts': result['counts']
+        })
+        
+    except AttendanceSession.DoesNotExist:
+        return Response({'error': 'Không tìm thấy buổi điểm danh'}, status=status.HTTP_404_NOT_FOUND)
+    except Exception as e:
+        return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def attendance_analytics(request, session_id):
     """Get attendance analytics for a session"""
     try:
-        session = AttendanceSession.objects.get(id=session_id)
+        session = AttendanceSession.objects.select_related('class_obj').get(id=session_id)
         
         # Check permission
-        if request.user.role != 'admin' and session.class_obj.teacher != request.user:
+        if request.user.role != 'admin' and session.class_obj.teacher_id != request.user.id:
             return Response(
                 {'error': 'Bạn không có quyền xem thống kê buổi điểm danh này'},
                 status=status.HTTP_403_FORBIDDEN
             )
         
+        # Sessions read after their end time are closed on the spot
+        close_if_ended(session)
+        
         # Get attendance data
         total_students = session.class_obj.current_students_count
-        present_count = Attendance.objects.filter(session=session, status='present').count()
-        absent_count = total_students - present_count
+        status_counts = dict(
+            Attendance.objects.filter(session=session).values_list('status').annotate(total=Count('id')).order_by()
+        )
+        present_count = status_counts.get('present', 0)
+        if session.closed_at:
+            # Absences are materialized by the close-out
+            absent_count = status_counts.get('absent', 0)
+        else:
+            absent_count = total_students - present_count
         attendance_rate = (present_count / total_students * 100) if total_students > 0 else 0
         
         # Get attendance by time
-        attendances = Attendance.objects.filter(session=session, status='present')
+        attendances = Attendance.objects.filter(session=session, status='present').select_related('student')
         attendance_times = []
         for att in attendances:
             attendance_times.append({
@@ -258,12 +353,15 @@ def attendance_analytics(request, session_id):
                 'class_name': session.class_obj.class_name,
                 'session_date': session.session_date,
                 'start_time': session.start_time,
-                'end_time': session.end_time
+                'end_time': session.end_time,
+                'closed_at': session.closed_at
             },
             'statistics': {
                 'total_students': total_students,
                 'present_count': present_count,
                 'absent_count': absent_count,
+                'late_count': status_counts.get('late', 0),
+                'excused_count': status_counts.get('excused', 0),
                 'attendance_rate': round(attendance_rate, 2)
             },
             'attendance_details': attendance_times
@@ -277,6 +375,7 @@ def attendance_analytics(request, session_id):
 
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
+@track_import('attendance')
 def import_excel(request):
     """Import attendance records from Excel file"""
     try:
@@ -288,120 +387,53 @@ def import_excel(request):
         
         excel_file = request.FILES['file']
         
-        # Check file extension
-        if not excel_file.name.lower().endswith(('.xlsx', '.xls')):
+        # Check file extension (read-only streaming needs the .xlsx format)
+        if not excel_file.name.lower().endswith('.xlsx'):
+            return Response({
+                'success': False,
+                'message': 'Only Excel files (.xlsx) are supported'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            mode = parse_import_mode(request.data.get('mode'))
+        except ValueError as e:
             return Response({
                 'success': False,
-                'message': 'Only Excel files (.xlsx, .xls) are supported'
+                'message': str(e)
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        # Parse Excel file with openpyxl
-        from openpyxl import load_workbook
-        import io
-        
-        # Load workbook from uploaded file
-        workbook = load_workbook(io.BytesIO(excel_file.read()))
-        worksheet = workbook.active
-        
-        # Get headers from first row
-        headers = []
-        for cell in worksheet[1]:
-            headers.append(cell.value.lower().replace(' ', '_') if cell.value else '')
-        
-        # Expected columns mapping
-        column_mapping = {
-            'student_id': ['student_id', 'mssv', 'id'],
-            'session_id': ['session_id', 'buoi_diem_danh', 'session'],
-            'status': ['status', 'trang_thai', 'attendance_status'],
-            'check_in_time': ['check_in_time', 'gio_vao', 'time_in'],
-            'check_out_time': ['check_out_time', 'gio_ra', 'time_out'],
-            'notes': ['notes', 'ghi_chu', 'note']
-        }
-        
-        # Map headers to expected fields
-        field_mapping = {}
-        for field, possible_names in column_mapping.items():
-            for header in headers:
-                if header in possible_names:
-                    field_mapping[field] = headers.index(header)
-                    break
-        
-        created_attendance = []
-        errors = []
-        
-        # Process each row
-        for row_num in range(2, worksheet.max_row + 1):
-            try:
-                row_data = {}
-                for field, col_index in field_mapping.items():
-                    cell_value = worksheet.cell(row=row_num, column=col_index + 1).value
-                    row_data[field] = str(cell_value).strip() if cell_value else ''
-                
-                # Set defaults for missing fields
-                if not row_data.get('status'):
-                    row_data['status'] = 'present'
-                if not row_data.get('check_in_time'):
-                    row_data['check_in_time'] = timezone.now().isoformat()
-                
-                # Validate required fields
-                if not row_data.get('student_id') or not row_data.get('session_id'):
-                    errors.append({
-                        'row': row_num,
-                        'error': 'Missing required fields: student_id and session_id',
-                        'data': row_data
-                    })
-                    continue
-                
-                # Convert session_id to int
-                try:
-                    row_data['session_id'] = int(row_data['session_id'])
-                except ValueError:
-                    errors.append({
-                        'row': row_num,
-                        'error': f'Invalid session_id format: {row_data["session_id"]}',
-                        'data': row_data
-                    })
-                    continue
-                
-                # Validate status
-                valid_statuses = ['present', 'absent', 'late', 'excused']
-                if row_data['status'] not in valid_statuses:
-                    errors.append({
-                        'row': row_num,
-                        'error': f'Invalid status: {row_data["status"]}. Must be one of: {valid_statuses}',
-                        'data': row_data
-                    })
-                    continue
-                
-                # Create attendance record
-                serializer = AttendanceSerializer(data=row_data)
-                if serializer.is_valid():
-                    attendance = serializer.save()
-                    created_attendance.append(AttendanceSerializer(attendance).data)
-                else:
-                    errors.append({
-                        'row': row_num,
-                        'errors': serializer.errors,
-                        'data': row_data
-                    })
-                    
-            except Exception as e:
-                errors.append({
-                    'row': row_num,
-                    'error': str(e),
-                    'data': f'Row {row_num} processing failed'
-                })
+        rows = read_sheet(excel_file.read(), COLUMN_ALIASES)
+        dry_run = str(request.data.get('dry_run', '')).lower() in ('1', 'true', 'yes')
+        result = ingest_attendance(rows, request.user, mode=mode, dry_run=dry_run)
+        created = result['created']
         
         return Response({
             'success': True,
-            'message': f'Successfully imported {len(created_attendance)} attendance records from Excel file',
-            'created_count': len(created_attendance),
-            'created_attendance': created_attendance,
-            'errors': errors,
+            'message': f'Successfully imported {len(created)} attendance records from Excel file',
+            'dry_run': dry_run,
+            'mode': mode,
+            'created_count': len(created),
+            'updated_count': len(result['updated']),
+            'skipped_count': len(result['skipped']),
+            # Flat rows; id is null for rows written by an upsert or skip-existing import
+            'created_attendance': [
+                {
+                    'id': attendance.pk,
+                    'session_id': attendance.session_id,
+                    'student_id': attendance.student_id,
+                    'status': attendance.status,
+                    'check_in_time': attendance.check_in_time,
+                    'check_out_time': attendance.check_out_time,
+                }
+                for attendance in created
+            ],
+            'errors': result['errors'],
             'details': {
-                'total_rows_processed': worksheet.max_row - 1,
-                'successful_imports': len(created_attendance),
-                'failed_imports': len(errors)
+                'total_rows_processed': len(rows),
+                'successful_imports': len(created),
+                'updated_records': len(result['updated']),
+                'skipped_records': len(result['skipped']),
+                'failed_imports': len(result['errors'])
             }
         })
         
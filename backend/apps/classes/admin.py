@@ -29,6 +29,11 @@ class ClassAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
     )
+    
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        # The enrollment inline bypasses the enroll/unenroll paths
+        Class.objects.filter(pk=form.instance.pk).reconcile_enrolled_counts()
 
 
 @admin.register(ClassStudent)
@@ -37,3 +42,16 @@ class ClassStudentAdmin(admin.ModelAdmin):
     list_filter = ('is_active', 'enrolled_at', 'class_obj')
     search_fields = ('class_obj__class_name', 'student__student_id', 'student__first_name', 'student__last_name')
     ordering = ('-enrolled_at',)
+    
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        Class.objects.filter(pk=obj.class_obj_id).reconcile_enrolled_counts()
+    
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        Class.objects.filter(pk=obj.class_obj_id).reconcile_enrolled_counts()
+    
+    def delete_queryset(self, request, queryset):
+        class_ids = list(queryset.values_list('class_obj_id', flat=True).distinct())
+        super().delete_queryset(request, queryset)
+        Class.objects.filter(pk__in=class_ids).reconcile_enrolled_counts()
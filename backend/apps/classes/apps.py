@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class ClassesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.classes'
+
+    def ready(self):
+        # Connects the enrollment counter receivers
+        from . import signals  # noqa: F401
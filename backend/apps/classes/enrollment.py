@@ -0,0 +1,96 @@
+# Bulk enrollment: add many students to a class without overshooting max_students
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.students.models import Student
+from .models import Class, ClassStudent
+
+
+def resolve_students(student_ids=None, filters=None):
+    """
+    (pk, student code) of the active students to enroll, in one query.
+
+    Either an explicit list of student codes or filters: search (same
+    fields as the student list), student_id_prefix, gender, or
+    source_class_id to copy the active roster of another class.
+    """
+    queryset = Student.objects.filter(is_active=True)
+    if student_ids is not None:
+        queryset = queryset.filter(student_id__in=student_ids)
+    else:
+        if filters.get('search'):
+            search = filters['search']
+            queryset = queryset.filter(
+                Q(first_name__icontains=search) |
+                Q(last_name__icontains=search) |
+                Q(student_id__icontains=search) |
+                Q(email__icontains=search)
+            )
+        if filters.get('student_id_prefix'):
+            queryset = queryset.filter(student_id__startswith=filters['student_id_prefix'])
+        if filters.get('gender'):
+            queryset = queryset.filter(gender=filters['gender'])
+        if filters.get('source_class_id'):
+            queryset = queryset.filter(
+                class_students__class_obj_id=filters['source_class_id'], class_students__is_active=True
+            )
+    return list(queryset.order_by().values_list('pk', 'student_id'))
+
+
+def enroll_students(class_pk, student_pks):
+    """
+    Enroll students in a class, all or nothing.
+
+    The class row is locked (SELECT ... FOR UPDATE) for the whole
+    transaction, so the capacity check reads an enrolled_count that no
+    concurrent enrollment can change before this one commits. Previously
+    removed enrollments are reactivated with one UPDATE and the rest
+    inserted with one bulk_create(ignore_conflicts=True). Rows skipped by
+    either are not counted: the counter is recounted while the lock is
+    still held.
+    """
+    with transaction.atomic():
+        class_obj = Class.objects.select_for_update().get(pk=class_pk)
+        student_pks = set(student_pks)
+        rows = dict(
+            ClassStudent.objects.filter(class_obj_id=class_pk, student_id__in=student_pks)
+            .values_list('student_id', 'is_active')
+        )
+        already = [pk for pk in student_pks if rows.get(pk)]
+        reactivate = [pk for pk in student_pks if rows.get(pk) is False]
+        new = [pk for pk in student_pks if pk not in rows]
+
+        available = max(class_obj.max_students - class_obj.enrolled_count, 0)
+        requested = len(reactivate) + len(new)
+        if requested > available:
+            return {
+                'error': f'Lớp không đủ chỗ: còn {available} chỗ, cần {requested} chỗ',
+                'available': available,
+                'requested': requested,
+            }
+
+        now = timezone.now()
+        reactivated = 0
+        if reactivate:
+            reactivated = ClassStudent.objects.filter(
+                class_obj_id=class_pk, student_id__in=reactivate, is_active=False
+            ).update(is_active=True, enrolled_at=now, updated_at=now)
+        ClassStudent.objects.bulk_create(
+            [ClassStudent(class_obj_id=class_pk, student_id=pk) for pk in new],
+            batch_size=1000,
+            ignore_conflicts=True,
+        )
+        enrolled_count = class_obj.enrolled_count
+        if requested:
+            enrolled_count = ClassStudent.objects.filter(class_obj_id=class_pk, is_active=True).count()
+            Class.objects.filter(pk=class_pk).update(enrolled_count=enrolled_count, updated_at=now)
+
+    return {
+        'error': None,
+        'enrolled': len(new),
+        'reactivated': reactivated,
+        'already_enrolled': len(already),
+        'current_students_count': enrolled_count,
+        'max_students': class_obj.max_students,
+    }
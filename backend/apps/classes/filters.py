@@ -0,0 +1,13 @@
+import django_filters
+
+from .models import Class
+
+
+class ClassFilter(django_filters.FilterSet):
+    """?teacher_id=, ?is_active=, ?created_at_after=/?created_at_before= (YYYY-MM-DD)"""
+    teacher_id = django_filters.NumberFilter(field_name='teacher_id')
+    created_at = django_filters.DateFromToRangeFilter()
+
+    class Meta:
+        model = Class
+        fields = ['teacher_id', 'is_active', 'created_at']
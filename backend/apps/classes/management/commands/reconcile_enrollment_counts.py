@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F, Q
+from apps.classes.models import Class
+
+
+class Command(BaseCommand):
+    help = 'Recount active enrollments and repair drifted Class.enrolled_count values in bulk'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='List drifted classes without repairing them'
+        )
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            drifted = (
+                Class.objects
+                .annotate(actual_count=Count('class_students', filter=Q(class_students__is_active=True)))
+                .exclude(enrolled_count=F('actual_count'))
+                .values_list('class_id', 'enrolled_count', 'actual_count')
+            )
+            for class_id, stored, actual in drifted:
+                self.stdout.write(f'{class_id}: {stored} -> {actual}')
+            self.stdout.write(f'{len(drifted)} classes drifted')
+            return
+
+        fixed = Class.objects.reconcile_enrolled_counts()
+        self.stdout.write(self.style.SUCCESS(f'✅ Repaired enrolled_count of {fixed} classes'))
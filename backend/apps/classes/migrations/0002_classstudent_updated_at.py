@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 17:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('classes', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='classstudent',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-19 17:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('classes', '0002_classstudent_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='class',
+            index=models.Index(fields=['teacher', 'class_id'], name='classes_teacher_606846_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='classstudent',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['class_obj', 'student'], name='class_students_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='classstudent',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['student', 'class_obj'], name='class_students_student_idx'),
+        ),
+    ]
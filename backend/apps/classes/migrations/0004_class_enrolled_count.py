@@ -0,0 +1,30 @@
+# Generated by Django 4.2.7 on 2026-10-19 18:28
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def backfill_enrolled_count(apps, schema_editor):
+    Class = apps.get_model('classes', 'Class')
+    ClassStudent = apps.get_model('classes', 'ClassStudent')
+    active = ClassStudent.objects.filter(class_obj=models.OuterRef('pk'), is_active=True)
+    Class.objects.update(enrolled_count=Coalesce(
+        models.Subquery(active.order_by().values('class_obj').annotate(count=models.Count('pk')).values('count')),
+        0,
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('classes', '0003_class_classes_teacher_606846_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='class',
+            name='enrolled_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_enrolled_count, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,37 @@
 from django.db import models
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
 from apps.accounts.models import User
 from apps.students.models import Student
 
 
+class ClassQuerySet(models.QuerySet):
+    def with_students_count(self):
+        """Teacher in the same query, for ClassSerializer (the count is the enrolled_count column)"""
+        return self.select_related('teacher')
+    
+    def adjust_enrolled_count(self, delta):
+        """Add delta to enrolled_count with an F-expression; call inside the enrollment's transaction"""
+        return self.update(
+            enrolled_count=Greatest(models.F('enrolled_count') + delta, 0),
+            updated_at=timezone.now(),
+        )
+    
+    def reconcile_enrolled_counts(self):
+        """Recount active enrollments and repair drifted counters in one UPDATE; returns the rows fixed"""
+        actual = Coalesce(
+            models.Subquery(
+                ClassStudent.objects.filter(class_obj=models.OuterRef('pk'), is_active=True)
+                .order_by().values('class_obj').annotate(count=models.Count('pk')).values('count')
+            ),
+            0,
+        )
+        drifted = self.annotate(actual_count=actual).exclude(enrolled_count=models.F('actual_count'))
+        return self.model.objects.filter(pk__in=drifted.values('pk')).update(
+            enrolled_count=actual, updated_at=timezone.now()
+        )
+
+
 class Class(models.Model):
     """Class model"""
     class_id = models.CharField(max_length=20, unique=True)
@@ -10,22 +39,30 @@ class Class(models.Model):
     description = models.TextField(blank=True, null=True)
     teacher = models.ForeignKey(User, on_delete=models.CASCADE, related_name='classes')
     max_students = models.PositiveIntegerField(default=50)
+    # Active enrollments, maintained with F-expressions by every enroll/unenroll path
+    enrolled_count = models.PositiveIntegerField(default=0)
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = ClassQuerySet.as_manager()
+    
     class Meta:
         db_table = 'classes'
         verbose_name = 'Lớp học'
         verbose_name_plural = 'Lớp học'
         ordering = ['class_id']
+        indexes = [
+            # Teachers only see their own classes, ordered by code
+            models.Index(fields=['teacher', 'class_id']),
+        ]
     
     def __str__(self):
         return f"{self.class_id} - {self.class_name}"
     
     @property
     def current_students_count(self):
-        return self.students.count()
+        return self.enrolled_count
     
     @property
     def is_full(self):
@@ -38,12 +75,26 @@ class ClassStudent(models.Model):
     student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='class_students')
     enrolled_at = models.DateTimeField(auto_now_add=True)
     is_active = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         db_table = 'class_students'
         verbose_name = 'Sinh viên trong lớp'
         verbose_name_plural = 'Sinh viên trong lớp'
         unique_together = ['class_obj', 'student']
+        indexes = [
+            # Rosters and enrollment counts only read active enrollments
+            models.Index(
+                fields=['class_obj', 'student'],
+                condition=models.Q(is_active=True),
+                name='class_students_active_idx',
+            ),
+            models.Index(
+                fields=['student', 'class_obj'],
+                condition=models.Q(is_active=True),
+                name='class_students_student_idx',
+            ),
+        ]
     
     def __str__(self):
         return f"{self.class_obj.class_id} - {self.student.student_id}"
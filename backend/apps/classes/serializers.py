@@ -1,10 +1,13 @@
+from django.db.models import Count
 from rest_framework import serializers
 from apps.accounts.serializers import UserSerializer
+from apps.students.models import Student
 from apps.students.serializers import StudentSerializer
+from apps.core.serializers import DynamicFieldsMixin
 from .models import Class, ClassStudent
 
 
-class ClassSerializer(serializers.ModelSerializer):
+class ClassSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer for Class model"""
     teacher = UserSerializer(read_only=True)
     current_students_count = serializers.ReadOnlyField()
@@ -33,7 +36,7 @@ class ClassCreateSerializer(serializers.ModelSerializer):
         return value
 
 
-class ClassStudentSerializer(serializers.ModelSerializer):
+class ClassStudentSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer for ClassStudent model"""
     student = StudentSerializer(read_only=True)
     student_id = serializers.CharField(write_only=True)
@@ -42,21 +45,40 @@ class ClassStudentSerializer(serializers.ModelSerializer):
         model = ClassStudent
         fields = ['id', 'student', 'student_id', 'enrolled_at', 'is_active']
         read_only_fields = ['id', 'enrolled_at']
+
+
+class EnrollmentFilterSerializer(serializers.Serializer):
+    """Which active students to enroll when no explicit list is given"""
+    search = serializers.CharField(required=False)
+    student_id_prefix = serializers.CharField(required=False)
+    gender = serializers.ChoiceField(choices=Student.GENDER_CHOICES, required=False)
+    source_class_id = serializers.IntegerField(required=False)
+
+
+class ClassBulkEnrollSerializer(serializers.Serializer):
+    """Serializer for enrolling many students in a class at once"""
+    student_ids = serializers.ListField(child=serializers.CharField(), required=False, allow_empty=False)
+    filters = EnrollmentFilterSerializer(required=False)
     
-    def create(self, validated_data):
-        student_id = validated_data.pop('student_id')
-        try:
-            student = Student.objects.get(student_id=student_id)
-            validated_data['student'] = student
-            return super().create(validated_data)
-        except Student.DoesNotExist:
-            raise serializers.ValidationError("Không tìm thấy sinh viên với mã này")
+    def validate(self, attrs):
+        if ('student_ids' in attrs) == ('filters' in attrs):
+            raise serializers.ValidationError("Cần student_ids hoặc filters (chỉ một trong hai)")
+        if 'filters' in attrs and not attrs['filters']:
+            raise serializers.ValidationError("filters phải có ít nhất một điều kiện")
+        return attrs
 
 
-class ClassDetailSerializer(serializers.ModelSerializer):
-    """Serializer for detailed class view with students"""
+class ClassDetailSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    """
+    Serializer for detailed class view: metadata and a roster summary.
+
+    The roster itself is served paginated by the class students endpoint;
+    students is only included with include_roster in the context, from the
+    active_enrollments prefetch.
+    """
     teacher = UserSerializer(read_only=True)
-    students = StudentSerializer(many=True, read_only=True)
+    roster_summary = serializers.SerializerMethodField()
+    students = serializers.SerializerMethodField()
     current_students_count = serializers.ReadOnlyField()
     is_full = serializers.ReadOnlyField()
     
@@ -65,6 +87,33 @@ class ClassDetailSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'class_id', 'class_name', 'description', 'teacher',
             'max_students', 'current_students_count', 'is_full',
-            'students', 'is_active', 'created_at', 'updated_at'
+            'roster_summary', 'students', 'is_active', 'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
+    
+    def get_fields(self):
+        fields = super().get_fields()
+        if not self.context.get('include_roster'):
+            fields.pop('students', None)
+        return fields
+    
+    def get_roster_summary(self, obj):
+        if hasattr(obj, 'active_enrollments'):
+            genders = {}
+            for enrollment in obj.active_enrollments:
+                genders[enrollment.student.gender] = genders.get(enrollment.student.gender, 0) + 1
+        else:
+            genders = dict(
+                obj.class_students.filter(is_active=True).order_by()
+                .values_list('student__gender').annotate(total=Count('pk'))
+            )
+        return {
+            'total_students': obj.enrolled_count,
+            'available_seats': max(obj.max_students - obj.enrolled_count, 0),
+            'by_gender': {code: genders.get(code, 0) for code, _ in Student.GENDER_CHOICES},
+        }
+    
+    def get_students(self, obj):
+        return self.embed(
+            'students', StudentSerializer, [enrollment.student for enrollment in obj.active_enrollments], many=True
+        )
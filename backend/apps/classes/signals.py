@@ -0,0 +1,18 @@
+# Keeps Class.enrolled_count in step when enrollments disappear through cascades
+from django.db.models.signals import pre_delete
+from django.dispatch import receiver
+
+from apps.students.models import Student
+from .models import Class, ClassStudent
+
+
+@receiver(pre_delete, sender=Student)
+def release_seats(sender, instance, **kwargs):
+    """
+    Deleting a student (API, admin or queryset) cascades its enrollments.
+    Runs inside the deletion's transaction, before the cascade, so the
+    active enrollments can still be found.
+    """
+    Class.objects.filter(
+        pk__in=ClassStudent.objects.filter(student=instance, is_active=True).values('class_obj')
+    ).adjust_enrolled_count(-1)
@@ -0,0 +1,53 @@
+from datetime import date
+from unittest import mock
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.accounts.models import User
+from apps.classes.enrollment import enroll_students
+from apps.classes.models import Class
+from apps.classes.views import CLASS_INDEX
+from apps.students.models import Student
+
+
+class ClassAutocompleteTests(TestCase):
+    """The in-memory class index is rebuilt for renames, not for roster changes"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(
+            email='admin@test.edu.vn', username='admin', password='Admin@12345', role='admin'
+        )
+        cls.class_obj = Class.objects.create(class_id='LOP01', class_name='Lập trình Python', teacher=cls.admin)
+        cls.student = Student.objects.create(
+            student_id='SV001', first_name='Nguyễn', last_name='Văn An', email='sv1@test.edu.vn',
+            gender='male', date_of_birth=date(2003, 1, 1),
+        )
+
+    def setUp(self):
+        self.client = APIClient(HTTP_HOST='localhost')
+        self.client.force_authenticate(self.admin)
+
+    def search(self, term):
+        response = self.client.get('/api/classes/autocomplete/', {'q': term})
+        self.assertEqual(response.status_code, 200)
+        return [code for _, code, _ in response.data['results']]
+
+    def test_enrollment_keeps_the_index(self):
+        self.assertEqual(self.search('lập'), ['LOP01'])
+        with mock.patch.object(CLASS_INDEX, '_build', wraps=CLASS_INDEX._build) as build:
+            enroll_students(self.class_obj.pk, [self.student.pk])
+            self.assertEqual(self.search('lập'), ['LOP01'])
+        build.assert_not_called()
+
+    def test_rename_and_deactivation_rebuild_the_index(self):
+        self.assertEqual(self.search('lập'), ['LOP01'])
+        self.class_obj.class_name = 'Cơ sở dữ liệu'
+        self.class_obj.save()
+        self.assertEqual(self.search('lập'), [])
+        self.assertEqual(self.search('dữ'), ['LOP01'])
+
+        self.class_obj.is_active = False
+        self.class_obj.save(update_fields=['is_active'])
+        self.assertEqual(self.search('dữ'), [])
@@ -0,0 +1,39 @@
+from datetime import date
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.accounts.models import User
+from apps.classes.enrollment import enroll_students
+from apps.classes.models import Class
+from apps.students.models import Student
+
+
+class ClassDetailRosterTests(TestCase):
+    """?include=roster embeds students rendered like the rest of the response"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.teacher = User.objects.create_user(
+            email='gv@test.edu.vn', username='gv', password='Teacher@12345', role='teacher'
+        )
+        cls.class_obj = Class.objects.create(class_id='LOP01', class_name='Lập trình Python', teacher=cls.teacher)
+        student = Student.objects.create(
+            student_id='SV001', first_name='Nguyễn', last_name='Văn An', email='sv1@test.edu.vn',
+            gender='male', date_of_birth=date(2003, 1, 1), avatar='student_avatars/an.webp',
+        )
+        enroll_students(cls.class_obj.pk, [student.pk])
+
+    def setUp(self):
+        self.client = APIClient(HTTP_HOST='localhost')
+        self.client.force_authenticate(self.teacher)
+        self.url = f'/api/classes/{self.class_obj.pk}/?include=roster'
+
+    def test_roster_avatars_are_absolute(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['students'][0]['avatar'], 'http://localhost/media/student_avatars/an.webp')
+
+    def test_roster_follows_sparse_fieldsets(self):
+        response = self.client.get(self.url + '&fields=id,students.student_id')
+        self.assertEqual(response.data, {'id': self.class_obj.pk, 'students': [{'student_id': 'SV001'}]})
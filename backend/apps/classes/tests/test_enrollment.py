@@ -0,0 +1,89 @@
+from datetime import date
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.accounts.models import User
+from apps.classes.enrollment import enroll_students
+from apps.classes.models import Class, ClassStudent
+from apps.students.models import Student
+
+
+class EnrollmentTests(TestCase):
+    """Adding students keeps enrolled_count equal to the active roster"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.teacher = User.objects.create_user(
+            email='gv@test.edu.vn', username='gv', password='Teacher@12345', role='teacher'
+        )
+        cls.other_teacher = User.objects.create_user(
+            email='gv2@test.edu.vn', username='gv2', password='Teacher@12345', role='teacher'
+        )
+        cls.class_obj = Class.objects.create(
+            class_id='LOP01', class_name='Lập trình Python', teacher=cls.teacher, max_students=2
+        )
+        cls.students = Student.objects.bulk_create([
+            Student(
+                student_id=f'SV{index:03d}', first_name='Nguyễn', last_name=f'Văn {index}',
+                email=f'sv{index}@test.edu.vn', gender='male', date_of_birth=date(2003, 1, 1),
+            )
+            for index in range(3)
+        ])
+
+    def setUp(self):
+        self.client = APIClient(HTTP_HOST='localhost')
+        self.client.force_authenticate(self.teacher)
+        self.url = f'/api/classes/{self.class_obj.pk}/students/'
+
+    def enrolled_count(self):
+        return Class.objects.get(pk=self.class_obj.pk).enrolled_count
+
+    def test_add_then_re_add_a_removed_student(self):
+        response = self.client.post(self.url, {'student_id': 'SV000'})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.enrolled_count(), 1)
+
+        self.client.delete(f'{self.url}SV000/remove/')
+        self.assertEqual(self.enrolled_count(), 0)
+
+        response = self.client.post(self.url, {'student_id': 'SV000'})
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(response.data['is_active'])
+        self.assertEqual(self.enrolled_count(), 1)
+        self.assertEqual(ClassStudent.objects.filter(class_obj=self.class_obj).count(), 1)
+
+    def test_add_errors_are_client_errors(self):
+        self.assertEqual(self.client.post(self.url, {'student_id': 'SV999'}).status_code, 400)
+
+        self.client.post(self.url, {'student_id': 'SV000'})
+        self.assertEqual(self.client.post(self.url, {'student_id': 'SV000'}).status_code, 400)
+
+        self.client.post(self.url, {'student_id': 'SV001'})
+        response = self.client.post(self.url, {'student_id': 'SV002'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.enrolled_count(), 2)
+
+        self.client.force_authenticate(self.other_teacher)
+        self.assertEqual(self.client.post(self.url, {'student_id': 'SV002'}).status_code, 403)
+
+    def test_counter_is_recounted_under_the_lock(self):
+        # A drifted counter is repaired rather than moved by the requested amount
+        ClassStudent.objects.create(class_obj=self.class_obj, student=self.students[0])
+        result = enroll_students(self.class_obj.pk, [self.students[0].pk, self.students[1].pk])
+        self.assertEqual(result['already_enrolled'], 1)
+        self.assertEqual(result['current_students_count'], 2)
+        self.assertEqual(self.enrolled_count(), 2)
+
+    def test_deleting_a_student_releases_its_seat(self):
+        self.client.post(self.url, {'student_id': 'SV000'})
+        self.client.post(self.url, {'student_id': 'SV001'})
+
+        self.client.force_authenticate(User.objects.create_user(
+            email='admin@test.edu.vn', username='admin', password='Admin@12345', role='admin'
+        ))
+        self.assertEqual(self.client.delete(f'/api/students/{self.students[0].pk}/').status_code, 204)
+        self.assertEqual(self.enrolled_count(), 1)
+
+        Student.objects.filter(pk=self.students[1].pk).delete()
+        self.assertEqual(self.enrolled_count(), 0)
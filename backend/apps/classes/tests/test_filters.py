@@ -0,0 +1,26 @@
+from datetime import datetime
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.accounts.models import User
+from apps.classes.models import Class
+
+
+class ClassFilterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(
+            email='admin@test.edu.vn', username='admin', password='Admin@12345', role='admin'
+        )
+        for code, created_at in [('LOP01', datetime(2026, 1, 10)), ('LOP02', datetime(2026, 3, 10))]:
+            class_obj = Class.objects.create(class_id=code, class_name=code, teacher=cls.admin)
+            Class.objects.filter(pk=class_obj.pk).update(created_at=timezone.make_aware(created_at))
+
+    def test_created_at_range(self):
+        client = APIClient(HTTP_HOST='localhost')
+        client.force_authenticate(self.admin)
+        response = client.get('/api/classes/', {'created_at_after': '2026-02-01', 'created_at_before': '2026-12-31'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['class_id'] for row in response.data['results']], ['LOP02'])
@@ -5,7 +5,9 @@ urlpatterns = [
     path('', views.ClassListCreateView.as_view(), name='class_list_create'),
     path('<int:id>/', views.ClassDetailView.as_view(), name='class_detail'),
     path('<int:class_id>/students/', views.ClassStudentListCreateView.as_view(), name='class_students'),
+    path('<int:class_id>/students/bulk-enroll/', views.bulk_enroll_students, name='bulk_enroll_students'),
     path('<int:class_id>/students/<str:student_id>/remove/', views.remove_student_from_class, name='remove_student_from_class'),
     path('<int:class_id>/available-students/', views.available_students, name='available_students'),
     path('statistics/', views.class_statistics, name='class_statistics'),
+    path('autocomplete/', views.autocomplete_classes, name='autocomplete_classes'),
 ]
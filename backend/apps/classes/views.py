@@ -1,18 +1,35 @@
 from rest_framework import generics, status, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
-from django.db.models import Q
-from apps.accounts.models import User
+from django.db import transaction
+from django.db.models import Prefetch
+from apps.students.serializers import StudentSerializer
+from apps.core.autocomplete import PrefixIndex, parse_limit
+from apps.core.conditional import ConditionalGetMixin, conditional_get
+from apps.core.db.routers import read_only
+from apps.core.serializers import select_rendered
 from apps.students.models import Student
+from .enrollment import enroll_students, resolve_students
+from .filters import ClassFilter
 from .models import Class, ClassStudent
 from .serializers import (
-    ClassSerializer, ClassCreateSerializer, ClassDetailSerializer, ClassStudentSerializer
+    ClassSerializer, ClassCreateSerializer, ClassDetailSerializer, ClassStudentSerializer,
+    ClassBulkEnrollSerializer
+)
+
+# Small table: class pickers are served from memory
+CLASS_INDEX = PrefixIndex(
+    Class.objects.filter(is_active=True), 'class_id', 'class_name', ['teacher_id'], depends_on=['is_active']
 )
 
 
-class ClassListCreateView(generics.ListCreateAPIView):
+class ClassListCreateView(ConditionalGetMixin, generics.ListCreateAPIView):
     """List and create classes"""
     permission_classes = [permissions.IsAuthenticated]
+    etag_relations = ('teacher',)
+    filterset_class = ClassFilter
+    search_fields = ['class_id', 'class_name', 'description']
+    ordering_fields = ['class_id', 'created_at']
     
     def get_serializer_class(self):
         if self.request.method == 'POST':
@@ -20,75 +37,154 @@ class ClassListCreateView(generics.ListCreateAPIView):
         return ClassSerializer
     
     def get_queryset(self):
-        queryset = Class.objects.all()
+        queryset = select_rendered(Class.objects.all(), self.request, ['teacher'])
         
         # Filter by teacher if not admin
         if self.request.user.role != 'admin':
             queryset = queryset.filter(teacher=self.request.user)
         
-        # Apply search filter
-        search = self.request.query_params.get('search', None)
-        if search:
-            queryset = queryset.filter(
-                Q(class_id__icontains=search) |
-                Q(class_name__icontains=search) |
-                Q(description__icontains=search)
-            )
-        
-        # Apply active filter
-        is_active = self.request.query_params.get('is_active', None)
-        if is_active is not None:
-            queryset = queryset.filter(is_active=is_active.lower() == 'true')
-        
         return queryset.order_by('class_id')
     
     def perform_create(self, serializer):
         serializer.save(teacher=self.request.user)
 
 
-class ClassDetailView(generics.RetrieveUpdateDestroyAPIView):
+class ClassDetailView(ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update or delete a class"""
     permission_classes = [permissions.IsAuthenticated]
+    etag_relations = ('teacher', 'class_students', 'class_students__student')
+    lookup_url_kwarg = 'id'
     
     def get_serializer_class(self):
         if self.request.method == 'GET':
             return ClassDetailSerializer
         return ClassSerializer
     
+    def include_roster(self):
+        return 'roster' in self.request.query_params.get('include', '').split(',')
+    
     def get_queryset(self):
-        queryset = Class.objects.all()
+        queryset = select_rendered(Class.objects.all(), self.request, ['teacher'])
         
         # Filter by teacher if not admin
         if self.request.user.role != 'admin':
             queryset = queryset.filter(teacher=self.request.user)
         
+        # ?include=roster embeds the active roster with a single prefetch query
+        if self.request.method == 'GET' and self.include_roster():
+            queryset = queryset.prefetch_related(Prefetch(
+                'class_students',
+                queryset=ClassStudent.objects.filter(is_active=True).select_related('student')
+                .order_by('student__student_id'),
+                to_attr='active_enrollments',
+            ))
+        
         return queryset
+    
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['include_roster'] = self.include_roster()
+        return context
 
 
-class ClassStudentListCreateView(generics.ListCreateAPIView):
-    """List and add students to a class"""
+class ClassStudentListCreateView(ConditionalGetMixin, generics.ListCreateAPIView):
+    """Paginated, searchable class roster; add students to a class"""
     serializer_class = ClassStudentSerializer
     permission_classes = [permissions.IsAuthenticated]
+    etag_relations = ('student',)
+    search_fields = ['student__student_id', 'student__first_name', 'student__last_name', 'student__email']
+    ordering_fields = ['student__student_id', 'enrolled_at']
     
     def get_queryset(self):
         class_id = self.kwargs['class_id']
-        return ClassStudent.objects.filter(class_obj_id=class_id, is_active=True)
+        queryset = select_rendered(
+            ClassStudent.objects.filter(class_obj_id=class_id, is_active=True), self.request, ['student']
+        )
+        return queryset.order_by('student__student_id')
     
-    def perform_create(self, serializer):
-        class_id = self.kwargs['class_id']
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
         try:
-            class_obj = Class.objects.get(id=class_id)
-            # Check if user has permission to add students to this class
-            if self.request.user.role != 'admin' and class_obj.teacher != self.request.user:
-                raise PermissionError("Bạn không có quyền thêm sinh viên vào lớp này")
+            class_obj = Class.objects.get(id=self.kwargs['class_id'])
             
-            # Check if class is full
-            if class_obj.is_full:
-                raise ValueError("Lớp đã đầy")
+            # Check if user has permission to add students to this class
+            if request.user.role != 'admin' and class_obj.teacher_id != request.user.id:
+                return Response(
+                    {'error': 'Bạn không có quyền thêm sinh viên vào lớp này'},
+                    status=status.HTTP_403_FORBIDDEN
+                )
             
-            serializer.save(class_obj=class_obj)
+            student = Student.objects.get(student_id=serializer.validated_data['student_id'])
         except Class.DoesNotExist:
-            raise ValueError("Không tìm thấy lớp học")
+            return Response({'error': 'Không tìm thấy lớp học'}, status=status.HTTP_404_NOT_FOUND)
+        except Student.DoesNotExist:
+            return Response({'error': 'Không tìm thấy sinh viên với mã này'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Same locked path as bulk enrollment: reactivates a removed enrollment
+        # and cannot overshoot max_students
+        result = enroll_students(class_obj.pk, [student.pk])
+        if result['error']:
+            return Response({'error': 'Lớp đã đầy'}, status=status.HTTP_400_BAD_REQUEST)
+        if result['already_enrolled']:
+            return Response({'error': 'Sinh viên đã có trong lớp'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        enrollment = ClassStudent.objects.select_related('student').get(class_obj=class_obj, student=student)
+        return Response(self.get_serializer(enrollment).data, status=status.HTTP_201_CREATED)
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def bulk_enroll_students(request, class_id):
+    """Enroll a list of students, or all active students matching filters, in a class"""
+    try:
+        serializer = ClassBulkEnrollSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        class_obj = Class.objects.get(id=class_id)
+        
+        # Check permission
+        if request.user.role != 'admin' and class_obj.teacher_id != request.user.id:
+            return Response(
+                {'error': 'Bạn không có quyền thêm sinh viên vào lớp này'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        student_ids = serializer.validated_data.get('student_ids')
+        students = resolve_students(student_ids, serializer.validated_data.get('filters'))
+        not_found = []
+        if student_ids is not None:
+            found = {code for _, code in students}
+            not_found = [code for code in dict.fromkeys(student_ids) if code not in found]
+        if not students:
+            return Response({
+                'error': 'Không tìm thấy sinh viên phù hợp',
+                'not_found': not_found
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        result = enroll_students(class_obj.pk, [pk for pk, _ in students])
+        if result['error']:
+            return Response({
+                'error': result['error'],
+                'available': result['available'],
+                'requested': result['requested']
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response({
+            'message': f'Đã thêm {result["enrolled"] + result["reactivated"]} sinh viên vào lớp',
+            'enrolled_count': result['enrolled'],
+            'reactivated_count': result['reactivated'],
+            'already_enrolled_count': result['already_enrolled'],
+            'not_found': not_found,
+            'current_students_count': result['current_students_count'],
+            'max_students': result['max_students']
+        })
+        
+    except Class.DoesNotExist:
+        return Response({'error': 'Không tìm thấy lớp học'}, status=status.HTTP_404_NOT_FOUND)
+    except Exception as e:
+        return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
 @api_view(['DELETE'])
@@ -105,13 +201,15 @@ def remove_student_from_class(request, class_id, student_id):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        class_student = ClassStudent.objects.get(
-            class_obj=class_obj,
-            student__student_id=student_id,
-            is_active=True
-        )
-        class_student.is_active = False
-        class_student.save()
+        with transaction.atomic():
+            class_student = ClassStudent.objects.get(
+                class_obj=class_obj,
+                student__student_id=student_id,
+                is_active=True
+            )
+            class_student.is_active = False
+            class_student.save()
+            Class.objects.filter(pk=class_obj.pk).adjust_enrolled_count(-1)
         
         return Response({'message': 'Đã xóa sinh viên khỏi lớp thành công'})
         
@@ -123,6 +221,8 @@ def remove_student_from_class(request, class_id, student_id):
 
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
+@read_only
+@conditional_get(Class)
 def class_statistics(request):
     """Get comprehensive class statistics"""
     try:
@@ -140,8 +240,8 @@ def class_statistics(request):
         active_classes = queryset.filter(is_active=True).count()
         inactive_classes = queryset.filter(is_active=False).count()
         
-        # Student enrollment statistics
-        classes_with_students = queryset.filter(class_students__is_active=True).distinct()
+        # Student enrollment statistics (maintained enrolled_count column)
+        classes_with_students = list(queryset.filter(enrolled_count__gt=0))
         total_students_in_classes = sum(
             class_obj.current_students_count for class_obj in classes_with_students
         )
@@ -221,3 +321,24 @@ def available_students(request, class_id):
         
     except Class.DoesNotExist:
         return Response({'error': 'Không tìm thấy lớp học'}, status=status.HTTP_404_NOT_FOUND)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def autocomplete_classes(request):
+    """(id, class code, class name) of the active classes matching ?q= by prefix"""
+    try:
+        limit = parse_limit(request.query_params.get('limit'))
+    except ValueError:
+        return Response({'error': 'limit phải là số nguyên'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    predicate = None
+    if request.user.role != 'admin':
+        teacher_id = request.user.pk
+        predicate = lambda entry: entry[3] == teacher_id
+    
+    try:
+        results = CLASS_INDEX.search(request.query_params.get('q', ''), limit, predicate)
+        return Response({'results': results})
+    except Exception as e:
+        return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
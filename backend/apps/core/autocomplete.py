@@ -0,0 +1,110 @@
+# Typeahead: (id, code, display name) prefix matches for the pickers
+import bisect
+import threading
+import uuid
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+
+
+def parse_limit(value):
+    """?limit= clamped to 1..MAX_LIMIT; raises ValueError when not a number"""
+    if value in (None, ''):
+        return DEFAULT_LIMIT
+    return min(max(int(value), 1), MAX_LIMIT)
+
+
+def normalize(term):
+    return ' '.join(term.split()).casefold()
+
+
+def _version_key(model):
+    return f'prefix_index:{model._meta.label_lower}'
+
+
+def invalidate(model):
+    """Rebuild the prefix indexes of model; for writes that send no signals (bulk_create, update)"""
+    def replace_token():
+        # A fresh token rather than a counter: an evicted key can never come back to an old value
+        cache.set(_version_key(model), uuid.uuid4().hex, None)
+
+    replace_token()
+    # Again once committed, in case another process rebuilt from the uncommitted state
+    transaction.on_commit(replace_token)
+
+
+class PrefixIndex:
+    """
+    Sorted-array prefix index over a small table, held in process memory.
+
+    The keys are the code and every word-aligned suffix of the display name
+    ("nguyen van an", "van an", "an"), so typing any word of the name
+    matches. A lookup is a binary search for the first key >= the prefix
+    followed by a scan while the keys still start with it.
+
+    The arrays are rebuilt when a version token in the shared cache changes.
+    post_save and post_delete replace the token, except for saves whose
+    update_fields miss every indexed column and depends_on (the columns the
+    queryset filters on). Counter updates such as enrolled_count go through
+    QuerySet.update() and send no signal, so they never trigger a rebuild.
+    """
+
+    def __init__(self, queryset, code_field, name_field, extra_fields=(), depends_on=()):
+        self.queryset = queryset
+        self.fields = ['pk', code_field, name_field, *extra_fields]
+        opts = queryset.model._meta
+        self.columns = {opts.get_field(name).name for name in [code_field, name_field, *extra_fields, *depends_on]}
+        self.version_key = _version_key(queryset.model)
+        self._lock = threading.Lock()
+        self._state = (None, [], [], [])
+        post_save.connect(self._changed, sender=queryset.model, weak=False)
+        post_delete.connect(self._changed, sender=queryset.model, weak=False)
+
+    def _changed(self, sender, update_fields=None, **kwargs):
+        if update_fields is not None and not {sender._meta.get_field(name).name for name in update_fields} & self.columns:
+            return
+        invalidate(sender)
+
+    def _build(self, validator):
+        entries = list(self.queryset.all().values_list(*self.fields))
+        pairs = []
+        for position, (_, code, name, *_) in enumerate(entries):
+            pairs.append((normalize(code), position))
+            words = normalize(name).split(' ')
+            for start in range(len(words)):
+                pairs.append((' '.join(words[start:]), position))
+        pairs.sort()
+        return (validator, [key for key, _ in pairs], [position for _, position in pairs], entries)
+
+    def _current(self):
+        cache.add(self.version_key, uuid.uuid4().hex, None)
+        validator = cache.get(self.version_key)
+        state = self._state
+        if state[0] != validator:
+            with self._lock:
+                state = self._state
+                if state[0] != validator:
+                    state = self._state = self._build(validator)
+        return state
+
+    def search(self, term, limit=DEFAULT_LIMIT, predicate=None):
+        """(pk, code, name) of up to limit entries, in key order; predicate filters the full rows"""
+        _, keys, positions, entries = self._current()
+        prefix = normalize(term)
+        seen = set()
+        results = []
+        index = bisect.bisect_left(keys, prefix)
+        while index < len(keys) and keys[index].startswith(prefix) and len(results) < limit:
+            position = positions[index]
+            index += 1
+            if position in seen:
+                continue
+            seen.add(position)
+            entry = entries[position]
+            if predicate is None or predicate(entry):
+                results.append(entry[:3])
+        return results
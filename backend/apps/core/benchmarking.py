@@ -0,0 +1,65 @@
+# Small helpers shared by the benchmark management commands
+import io
+import math
+import statistics
+
+from openpyxl import Workbook
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(timings):
+    """Latency summary in milliseconds for a list of durations in seconds"""
+    millis = [value * 1000 for value in timings]
+    total = sum(timings)
+    return {
+        'count': len(millis),
+        'mean_ms': round(statistics.fmean(millis), 3) if millis else 0.0,
+        'p50_ms': round(percentile(millis, 50), 3),
+        'p95_ms': round(percentile(millis, 95), 3),
+        'p99_ms': round(percentile(millis, 99), 3),
+        'throughput_rps': round(len(timings) / total, 1) if total else 0.0,
+    }
+
+
+def wsgi_environ(path, method='GET', query_string='', headers=None):
+    """Minimal WSGI environ for driving the real request handler in-process"""
+    environ = {
+        'REQUEST_METHOD': method,
+        'PATH_INFO': path,
+        'QUERY_STRING': query_string,
+        'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'HTTP_HOST': 'localhost',
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': io.BytesIO(),
+        'wsgi.errors': io.StringIO(),
+        'wsgi.multithread': False,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    for name, value in (headers or {}).items():
+        environ['HTTP_' + name.upper().replace('-', '_')] = value
+    return environ
+
+
+def xlsx(rows):
+    """In-memory .xlsx upload built from a list of rows"""
+    workbook = Workbook()
+    worksheet = workbook.active
+    for row in rows:
+        worksheet.append(row)
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    buffer.seek(0)
+    buffer.name = 'benchmark.xlsx'
+    return buffer
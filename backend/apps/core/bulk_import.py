@@ -0,0 +1,66 @@
+# Write modes shared by the import pipelines (grades, attendance)
+from django.db.models import Q
+
+INSERT = 'insert'
+UPSERT = 'upsert'
+SKIP_EXISTING = 'skip-existing'
+IMPORT_MODES = [INSERT, UPSERT, SKIP_EXISTING]
+
+CREATE_BATCH_SIZE = 1000
+
+
+def parse_import_mode(value):
+    """Validate the 'mode' request parameter (insert by default)"""
+    mode = (value or INSERT).strip().lower().replace('_', '-')
+    if mode not in IMPORT_MODES:
+        raise ValueError(f'Chế độ nhập không hợp lệ: {value} (chọn một trong {", ".join(IMPORT_MODES)})')
+    return mode
+
+
+def row_key(obj, key_fields):
+    return tuple(getattr(obj, field) for field in key_fields)
+
+
+def existing_keys(model, key_fields, objs):
+    """
+    Natural keys of objs that are already stored, in one query.
+
+    key_fields are attribute names (student_id, session_id, ...). Each column
+    is narrowed with IN and the exact tuples are matched in Python, which
+    keeps the query simple on every backend.
+    """
+    if not objs:
+        return set()
+    condition = Q()
+    for field in key_fields:
+        condition &= Q(**{f'{field}__in': {getattr(obj, field) for obj in objs}})
+    return set(model.objects.filter(condition).values_list(*key_fields))
+
+
+def split_existing(objs, existing, key_fields, mode):
+    """(objects to write, objects that already exist) for the given mode"""
+    new = [obj for obj in objs if row_key(obj, key_fields) not in existing]
+    found = [obj for obj in objs if row_key(obj, key_fields) in existing]
+    return (new + found if mode == UPSERT else new), found
+
+
+def write_rows(model, objs, mode, unique_fields, update_fields):
+    """
+    bulk_create in the given mode.
+
+    upsert is a single INSERT ... ON CONFLICT DO UPDATE per batch and
+    skip-existing an INSERT ... ON CONFLICT DO NOTHING, which also covers
+    rows inserted concurrently since existing_keys() ran. Django does not
+    return primary keys on either conflict path, so those objects keep
+    pk=None.
+    """
+    if not objs:
+        return objs
+    if mode == UPSERT:
+        return model.objects.bulk_create(
+            objs, batch_size=CREATE_BATCH_SIZE, update_conflicts=True,
+            unique_fields=unique_fields, update_fields=update_fields,
+        )
+    if mode == SKIP_EXISTING:
+        return model.objects.bulk_create(objs, batch_size=CREATE_BATCH_SIZE, ignore_conflicts=True)
+    return model.objects.bulk_create(objs, batch_size=CREATE_BATCH_SIZE)
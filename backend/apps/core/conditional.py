@@ -0,0 +1,197 @@
+"""
+Conditional GET support (ETag / If-None-Match).
+
+ETags are built from cheap validators instead of the response body: the
+latest updated_at plus the row count of the rows the payload is built
+from. Inserts and saves move updated_at forward and deletes change the count,
+so a matching If-None-Match can be answered with 304 before anything is
+serialized. Bulk .update() calls must set updated_at themselves.
+"""
+import hashlib
+from functools import wraps
+
+from django.db import connections, router
+from django.db.models import Count, Max
+from django.utils import timezone
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+from .metrics import record_cache
+
+
+def _is_many(model, relation):
+    for name in relation.split('__'):
+        field = model._meta.get_field(name)
+        if field.one_to_many or field.many_to_many:
+            return True
+        model = field.related_model
+    return False
+
+
+def queryset_validator(queryset, relations=()):
+    """
+    '<latest updated_at>:<count>' for a queryset, followed by the latest
+    updated_at of the rows it reaches through each relation path (e.g.
+    'student', 'session__class_obj'). Single aggregate query.
+    """
+    # Relations to many rows repeat each row once per related row
+    many = any(_is_many(queryset.model, relation) for relation in relations)
+    aggregates = {'last_modified': Max('updated_at'), 'count': Count('pk', distinct=many)}
+    for index, relation in enumerate(relations):
+        aggregates[f'relation_{index}'] = Max(f'{relation}__updated_at')
+    values = queryset.order_by().aggregate(**aggregates)
+    return ':'.join([
+        values['last_modified'].isoformat() if values['last_modified'] else '',
+        str(values['count']),
+        *(
+            values[f'relation_{index}'].isoformat() if values[f'relation_{index}'] else ''
+            for index in range(len(relations))
+        ),
+    ])
+
+
+def table_validators(models):
+    """One validator per whole table, all fetched in a single query"""
+    if not models:
+        return []
+    connection = connections[router.db_for_read(models[0])]
+    quote = connection.ops.quote_name
+    columns = ', '.join(
+        f"(SELECT MAX({quote('updated_at')}) FROM {quote(model._meta.db_table)}), "
+        f"(SELECT COUNT(*) FROM {quote(model._meta.db_table)})"
+        for model in models
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT {columns}')
+        row = cursor.fetchone()
+    return [f'{row[index]}:{row[index + 1]}' for index in range(0, len(row), 2)]
+
+
+def row_validators(lookups):
+    """
+    Like table_validators, restricted to the rows where a column equals a
+    value: lookups is a list of (model, field name, value), e.g. the grades
+    and attendances of one student. Single query.
+    """
+    if not lookups:
+        return []
+    connection = connections[router.db_for_read(lookups[0][0])]
+    quote = connection.ops.quote_name
+    columns = []
+    params = []
+    for model, field, value in lookups:
+        table = quote(model._meta.db_table)
+        where = f'{quote(model._meta.get_field(field).column)} = %s'
+        columns.append(
+            f"(SELECT MAX({quote('updated_at')}) FROM {table} WHERE {where}), "
+            f"(SELECT COUNT(*) FROM {table} WHERE {where})"
+        )
+        params += [value, value]
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT {', '.join(columns)}", params)
+        row = cursor.fetchone()
+    return [f'{row[index]}:{row[index + 1]}' for index in range(0, len(row), 2)]
+
+
+def make_etag(request, validators):
+    # Same data renders differently per user, URL (filters, page) and format
+    parts = [
+        request.get_full_path(),
+        str(getattr(request.user, 'pk', '')),
+        request.META.get('HTTP_ACCEPT', ''),
+        *validators,
+    ]
+    return quote_etag(hashlib.md5('|'.join(parts).encode()).hexdigest())
+
+
+def is_not_modified(request, etag):
+    if request.method not in ('GET', 'HEAD'):
+        return False
+    header = request.META.get('HTTP_IF_NONE_MATCH')
+    hit = False
+    if header:
+        etags = parse_etags(header)
+        # Weak comparison, as required for If-None-Match
+        hit = '*' in etags or etag.removeprefix('W/') in [tag.removeprefix('W/') for tag in etags]
+    record_cache('etag', hit)
+    return hit
+
+
+def finalize_response(response, etag):
+    if response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+        response['ETag'] = etag
+        # Browsers keep the copy but revalidate it on every request
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ['Authorization', 'Accept'])
+    return response
+
+
+def not_modified_response(etag):
+    return finalize_response(Response(status=status.HTTP_304_NOT_MODIFIED), etag)
+
+
+class ConditionalGetMixin:
+    """
+    ETag support for generic list and retrieve views.
+
+    The validator only covers the rows the response is built from: the
+    filtered queryset, plus the related rows reached through etag_relations
+    (the student of a grade, the class of a session, ...). A write to a
+    related row moves its updated_at past every earlier value, so it shows
+    up in the MAX, while writes to unrelated rows leave the ETag alone.
+
+    Embedded users (teachers, created_by) are listed too: logins save only
+    their login columns (update_fields), which leaves User.updated_at alone,
+    so a profile or avatar change invalidates the ETag and a login does not.
+    """
+    etag_relations = ()
+
+    def get_etag(self, request, queryset):
+        return make_etag(request, [queryset_validator(queryset, self.etag_relations)])
+
+    def list(self, request, *args, **kwargs):
+        etag = self.get_etag(request, self.filter_queryset(self.get_queryset()))
+        if is_not_modified(request, etag):
+            return not_modified_response(etag)
+        return finalize_response(super().list(request, *args, **kwargs), etag)
+
+    def retrieve(self, request, *args, **kwargs):
+        if self.etag_relations:
+            # Validated before the object is fetched, so a 304 costs one query
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            queryset = self.filter_queryset(self.get_queryset()).filter(
+                **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+            )
+            etag = self.get_etag(request, queryset)
+            if is_not_modified(request, etag):
+                return not_modified_response(etag)
+            instance = self.get_object()
+        else:
+            instance = self.get_object()
+            etag = make_etag(request, [instance.updated_at.isoformat()])
+            if is_not_modified(request, etag):
+                return not_modified_response(etag)
+        serializer = self.get_serializer(instance)
+        return finalize_response(Response(serializer.data), etag)
+
+
+def conditional_get(*models):
+    """
+    ETag support for function views computed from whole tables.
+
+    The current date is part of the validator because statistics such as
+    ages and recent registrations depend on it.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view_func(request, *args, **kwargs)
+            etag = make_etag(request, table_validators(models) + [timezone.localdate().isoformat()])
+            if is_not_modified(request, etag):
+                return not_modified_response(etag)
+            return finalize_response(view_func(request, *args, **kwargs), etag)
+        return wrapper
+    return decorator
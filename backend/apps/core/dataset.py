@@ -0,0 +1,225 @@
+"""
+Synthetic dataset generation for benchmarks and query-plan checks.
+
+Everything is inserted with bulk_create from a seeded Random, so the same
+arguments always produce the same rows. Generated rows are identified by the
+email domain of the prefix (@<prefix>.dataset.edu.vn) and by the exact code
+patterns below, never by a bare code prefix: 'DS' also starts real codes such
+as DSA101.
+"""
+import random
+import re
+from datetime import date, time, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from apps.accounts.models import User
+from apps.attendance.models import Attendance, AttendanceSession
+from apps.classes.models import Class, ClassStudent
+from apps.core.autocomplete import invalidate
+from apps.grades.models import Grade, Subject
+from apps.students.models import Student
+
+FAMILY_NAMES = [
+    'Nguyễn', 'Trần', 'Lê', 'Phạm', 'Hoàng', 'Huỳnh', 'Phan', 'Vũ',
+    'Võ', 'Đặng', 'Bùi', 'Đỗ', 'Hồ', 'Ngô', 'Dương', 'Lý',
+]
+MIDDLE_NAMES = ['Văn', 'Thị', 'Hữu', 'Minh', 'Ngọc', 'Thanh', 'Đức', 'Quốc', 'Gia', 'Bảo', 'Thu', 'Anh']
+GIVEN_NAMES = [
+    'An', 'Bình', 'Châu', 'Dũng', 'Giang', 'Hà', 'Hải', 'Hạnh', 'Hiếu', 'Hoa',
+    'Hùng', 'Huy', 'Khánh', 'Lan', 'Linh', 'Long', 'Mai', 'Minh', 'Nam', 'Nga',
+    'Ngọc', 'Phong', 'Phúc', 'Quân', 'Quang', 'Sơn', 'Tâm', 'Thảo', 'Trang', 'Trí',
+    'Trung', 'Tuấn', 'Tú', 'Vân', 'Việt', 'Vy', 'Yến',
+]
+SUBJECT_NAMES = [
+    'Lập trình Python', 'Cơ sở dữ liệu', 'Cấu trúc dữ liệu và giải thuật', 'Mạng máy tính',
+    'Hệ điều hành', 'Công nghệ phần mềm', 'Trí tuệ nhân tạo', 'Phát triển ứng dụng web',
+    'Toán rời rạc', 'Xác suất thống kê', 'An toàn thông tin', 'Học máy',
+]
+# Weighted like a real semester: mostly present, a few late or absent
+ATTENDANCE_WEIGHTS = [('present', 80), ('late', 8), ('absent', 9), ('excused', 3)]
+GRADE_TYPES = ['midterm', 'final']
+BATCH_SIZE = 2000
+DEFAULT_PASSWORD = 'Dataset@123'
+
+
+def _name(rng):
+    return rng.choice(FAMILY_NAMES), f'{rng.choice(MIDDLE_NAMES)} {rng.choice(GIVEN_NAMES)}'
+
+
+def _domain(prefix):
+    return f'@{prefix.lower()}.dataset.edu.vn'
+
+
+def dataset_classes(prefix='DS'):
+    """Generated classes: a generated code taught by a generated teacher"""
+    return Class.objects.filter(
+        class_id__regex=rf'^{re.escape(prefix)}L[0-9]{{4,}}$', teacher__email__endswith=_domain(prefix)
+    )
+
+
+def dataset_students(prefix='DS'):
+    return Student.objects.filter(email__endswith=_domain(prefix))
+
+
+def dataset_exists(prefix='DS'):
+    return User.objects.filter(email__endswith=_domain(prefix)).exists()
+
+
+def delete_dataset(prefix='DS'):
+    """Delete rows created by generate_dataset with the given prefix"""
+    domain = _domain(prefix)
+    with transaction.atomic():
+        dataset_classes(prefix).delete()
+        # Only subjects left without grades: a real subject can match the code pattern
+        Subject.objects.filter(
+            subject_id__regex=rf'^{re.escape(prefix)}M[0-9]{{3,}}$', grades__isnull=True
+        ).delete()
+        dataset_students(prefix).delete()
+        User.objects.filter(email__endswith=domain).delete()
+
+
+@transaction.atomic
+def generate_dataset(
+    students=5000, teachers=20, classes=100, class_size=40, subjects=12,
+    sessions_per_class=15, seed=42, prefix='DS', today=None
+):
+    """
+    Insert a coherent dataset and return the number of rows per table.
+
+    Every class gets class_size enrolled students, sessions_per_class weekly
+    sessions up to today with one attendance row per enrolled student, and a
+    midterm/final grade per enrollment.
+    """
+    rng = random.Random(seed)
+    today = today or date.today()
+    domain = _domain(prefix)
+    password = make_password(DEFAULT_PASSWORD)
+
+    teacher_objs = []
+    for index in range(teachers):
+        first_name, last_name = _name(rng)
+        teacher_objs.append(User(
+            email=f'{prefix.lower()}gv{index:04d}{domain}',
+            username=f'{prefix.lower()}gv{index:04d}',
+            first_name=first_name,
+            last_name=last_name,
+            role=User.Role.TEACHER,
+            account_status=User.AccountStatus.ACTIVE,
+            password=password,
+        ))
+    teacher_objs = User.objects.bulk_create(teacher_objs, batch_size=BATCH_SIZE)
+
+    student_objs = []
+    for index in range(students):
+        first_name, last_name = _name(rng)
+        code = f'{prefix}{index:07d}'
+        student_objs.append(Student(
+            student_id=code,
+            first_name=first_name,
+            last_name=last_name,
+            email=f'{code.lower()}{domain}',
+            phone=f'09{rng.randrange(10 ** 8):08d}',
+            gender=rng.choice(['male', 'female']),
+            date_of_birth=date(2000, 1, 1) + timedelta(days=rng.randrange(6 * 365)),
+            # A small share of students has left
+            is_active=rng.random() > 0.05,
+        ))
+    for student in student_objs:
+        student.set_name_keys()
+    student_objs = Student.objects.bulk_create(student_objs, batch_size=BATCH_SIZE)
+
+    subject_objs = Subject.objects.bulk_create([
+        Subject(
+            subject_id=f'{prefix}M{index:03d}',
+            subject_name=SUBJECT_NAMES[index % len(SUBJECT_NAMES)],
+            credits=rng.choice([2, 3, 4]),
+        )
+        for index in range(subjects)
+    ])
+
+    active_students = [student for student in student_objs if student.is_active]
+    class_objs = Class.objects.bulk_create([
+        Class(
+            class_id=f'{prefix}L{index:04d}',
+            class_name=f'{SUBJECT_NAMES[index % len(SUBJECT_NAMES)]} - Nhóm {index // len(SUBJECT_NAMES) + 1}',
+            teacher=rng.choice(teacher_objs),
+            max_students=max(class_size, 50),
+            enrolled_count=min(class_size, len(active_students)),
+        )
+        for index in range(classes)
+    ], batch_size=BATCH_SIZE)
+
+    rosters = {}
+    enrollments = []
+    for class_obj in class_objs:
+        roster = rng.sample(active_students, min(class_size, len(active_students)))
+        rosters[class_obj.pk] = roster
+        enrollments.extend(ClassStudent(class_obj=class_obj, student=student) for student in roster)
+    ClassStudent.objects.bulk_create(enrollments, batch_size=BATCH_SIZE)
+
+    session_objs = []
+    for class_obj in class_objs:
+        weekday_offset = rng.randrange(7)
+        start = time(rng.choice([7, 9, 13, 15]), 0)
+        for week in range(sessions_per_class):
+            session_objs.append(AttendanceSession(
+                class_obj=class_obj,
+                session_name=f'Buổi {week + 1}',
+                session_date=today - timedelta(weeks=sessions_per_class - 1 - week, days=weekday_offset),
+                start_time=start,
+                end_time=time(start.hour + 2, 0),
+                location=f'Phòng {rng.choice("ABCDE")}{rng.randrange(101, 510)}',
+                created_by=class_obj.teacher,
+                is_active=False,
+            ))
+    session_objs = AttendanceSession.objects.bulk_create(session_objs, batch_size=BATCH_SIZE)
+
+    statuses = [status for status, _ in ATTENDANCE_WEIGHTS]
+    weights = [weight for _, weight in ATTENDANCE_WEIGHTS]
+    attendance_count = 0
+    batch = []
+    for session in session_objs:
+        for student in rosters[session.class_obj_id]:
+            batch.append(Attendance(
+                session=session,
+                student=student,
+                status=rng.choices(statuses, weights)[0],
+            ))
+        if len(batch) >= BATCH_SIZE:
+            Attendance.objects.bulk_create(batch, batch_size=BATCH_SIZE)
+            attendance_count += len(batch)
+            batch = []
+    Attendance.objects.bulk_create(batch, batch_size=BATCH_SIZE)
+    attendance_count += len(batch)
+
+    grades = []
+    for class_obj in class_objs:
+        subject = subject_objs[class_obj.pk % len(subject_objs)]
+        for student in rosters[class_obj.pk]:
+            for grade_type in GRADE_TYPES:
+                grades.append(Grade(
+                    student=student,
+                    class_obj=class_obj,
+                    subject=subject,
+                    grade_type=grade_type,
+                    score=Decimal(rng.randrange(300, 1001)) / 100,
+                    created_by=class_obj.teacher,
+                ))
+    Grade.objects.bulk_create(grades, batch_size=BATCH_SIZE)
+
+    # bulk_create sends no signals
+    invalidate(Class)
+    invalidate(Subject)
+    return {
+        'teachers': len(teacher_objs),
+        'students': len(student_objs),
+        'subjects': len(subject_objs),
+        'classes': len(class_objs),
+        'enrollments': len(enrollments),
+        'sessions': len(session_objs),
+        'attendances': attendance_count,
+        'grades': len(grades),
+    }
@@ -0,0 +1,175 @@
+# Process-local psycopg2 connection pools with health checks and metrics
+import os
+import threading
+import time
+
+from psycopg2 import extensions, pool as pg_pool
+
+DEFAULT_POOL_OPTIONS = {
+    'MIN_SIZE': 1,
+    'MAX_SIZE': 10,
+    # Seconds to wait for a free connection before giving up
+    'TIMEOUT': 10,
+    # Connections older than this are closed instead of being returned
+    'MAX_LIFETIME': 1800,
+    # Connections idle longer than this are pinged before being handed out
+    'CHECK_IDLE': 30,
+}
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class _CountingPool(pg_pool.ThreadedConnectionPool):
+    def __init__(self, minconn, maxconn, *args, **kwargs):
+        self.connections_created = 0
+        super().__init__(minconn, maxconn, *args, **kwargs)
+
+    def _connect(self, key=None):
+        conn = super()._connect(key)
+        self.connections_created += 1
+        return conn
+
+
+class ConnectionPool:
+    """Bounded pool of raw psycopg2 connections for one database alias"""
+
+    def __init__(self, alias, conn_params, options):
+        self.alias = alias
+        self.options = {**DEFAULT_POOL_OPTIONS, **options}
+        self._pool = _CountingPool(self.options['MIN_SIZE'], self.options['MAX_SIZE'], **conn_params)
+        self._lock = threading.Lock()
+        # Signalled whenever a connection goes back to the pool (or is discarded,
+        # which frees a slot); waiting threads are woken in arrival order
+        self._available = threading.Condition()
+        self._born = {}
+        self._last_used = {}
+        self.checkouts = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.timeouts = 0
+        self.discarded = 0
+        self.health_check_failures = 0
+
+    def _checkout(self, deadline):
+        """A pooled connection, blocking until one is returned; (connection, waited)"""
+        waited = False
+        with self._available:
+            while True:
+                try:
+                    return self._pool.getconn(), waited
+                except pg_pool.PoolError:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        with self._lock:
+                            self.timeouts += 1
+                        raise
+                    waited = True
+                    self._available.wait(remaining)
+
+    def _release(self, conn, close=False):
+        with self._available:
+            self._pool.putconn(conn, close=close)
+            self._available.notify()
+
+    def getconn(self):
+        started = time.monotonic()
+        deadline = started + self.options['TIMEOUT']
+        waited = False
+        while True:
+            conn, blocked = self._checkout(deadline)
+            waited = waited or blocked
+            # Health checks may ping the server, so they run outside the condition
+            if self._is_healthy(conn):
+                break
+            self._discard(conn)
+
+        now = time.monotonic()
+        with self._lock:
+            self.checkouts += 1
+            self._born.setdefault(id(conn), now)
+            if waited:
+                self.waits += 1
+                self.wait_seconds += now - started
+        return conn
+
+    def putconn(self, conn):
+        now = time.monotonic()
+        expired = now - self._born.get(id(conn), now) > self.options['MAX_LIFETIME']
+        broken = conn.closed or conn.info.transaction_status == extensions.TRANSACTION_STATUS_UNKNOWN
+        if broken or expired:
+            self._discard(conn)
+            return
+        with self._lock:
+            self._last_used[id(conn)] = now
+        self._release(conn)
+
+    def _is_healthy(self, conn):
+        if conn.closed:
+            return False
+        if conn.info.transaction_status == extensions.TRANSACTION_STATUS_UNKNOWN:
+            return False
+
+        last_used = self._last_used.get(id(conn))
+        if last_used is None or time.monotonic() - last_used < self.options['CHECK_IDLE']:
+            return True
+
+        # Supabase and other proxies drop idle connections; ping before reuse
+        try:
+            autocommit = conn.autocommit
+            conn.autocommit = True
+            with conn.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            conn.autocommit = autocommit
+            return True
+        except Exception:
+            with self._lock:
+                self.health_check_failures += 1
+            return False
+
+    def _discard(self, conn):
+        with self._lock:
+            self.discarded += 1
+            self._born.pop(id(conn), None)
+            self._last_used.pop(id(conn), None)
+        self._release(conn, close=True)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'alias': self.alias,
+                'pid': os.getpid(),
+                'min_size': self.options['MIN_SIZE'],
+                'max_size': self.options['MAX_SIZE'],
+                'in_use': len(self._pool._used),
+                'idle': len(self._pool._pool),
+                'connections_created': self._pool.connections_created,
+                'checkouts': self.checkouts,
+                'waits': self.waits,
+                'wait_seconds': round(self.wait_seconds, 4),
+                'timeouts': self.timeouts,
+                'discarded': self.discarded,
+                'health_check_failures': self.health_check_failures,
+            }
+
+    def close(self):
+        self._pool.closeall()
+
+
+def get_pool(alias, conn_params, options):
+    # Keyed by pid so forked workers (gunicorn --preload) never share sockets
+    key = (os.getpid(), alias)
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                pool = ConnectionPool(alias, conn_params, options)
+                _pools[key] = pool
+    return pool
+
+
+def pool_stats():
+    """Stats for every pool owned by the current process"""
+    pid = os.getpid()
+    return [pool.stats() for (owner, _), pool in list(_pools.items()) if owner == pid]
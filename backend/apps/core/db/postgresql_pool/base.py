@@ -0,0 +1,52 @@
+"""
+PostgreSQL backend that borrows connections from a process-local pool.
+
+Configure with ENGINE 'apps.core.db.postgresql_pool' and an optional 'POOL'
+dict (MIN_SIZE, MAX_SIZE, TIMEOUT, MAX_LIFETIME, CHECK_IDLE) in the database
+settings. Keep CONN_MAX_AGE at 0: closing the Django connection at the end of
+each request returns the socket to the pool instead of tearing it down.
+"""
+import psycopg2.extras
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.postgresql import base
+from django.db.backends.postgresql.psycopg_any import IsolationLevel, is_psycopg3
+
+from apps.core.db.pool import get_pool
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if is_psycopg3:
+            raise ImproperlyConfigured('The pooled PostgreSQL backend requires psycopg2')
+        self.pool = None
+
+    def get_new_connection(self, conn_params):
+        # Same connection setup as the stock backend, minus the connect()
+        options = self.settings_dict['OPTIONS']
+        set_isolation_level = False
+        try:
+            isolation_level_value = options['isolation_level']
+        except KeyError:
+            self.isolation_level = IsolationLevel.READ_COMMITTED
+        else:
+            try:
+                self.isolation_level = IsolationLevel(isolation_level_value)
+                set_isolation_level = True
+            except ValueError:
+                raise ImproperlyConfigured(
+                    f"Invalid transaction isolation level {isolation_level_value} "
+                    f"specified. Use one of the psycopg.IsolationLevel values."
+                )
+
+        self.pool = get_pool(self.alias, conn_params, self.settings_dict.get('POOL', {}))
+        connection = self.pool.getconn()
+        if set_isolation_level:
+            connection.isolation_level = self.isolation_level
+        psycopg2.extras.register_default_jsonb(conn_or_curs=connection, loads=lambda x: x)
+        return connection
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                self.pool.putconn(self.connection)
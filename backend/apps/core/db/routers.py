@@ -0,0 +1,68 @@
+# Read-replica routing for views marked with @read_only
+import contextvars
+from functools import wraps
+from django.conf import settings
+from django.core.cache import cache
+
+REPLICA_ALIAS = 'replica'
+
+# Set while a @read_only view runs
+_read_only = contextvars.ContextVar('db_read_only', default=False)
+# Per-request state installed by ReplicaStickinessMiddleware
+_request_state = contextvars.ContextVar('db_request_state', default=None)
+
+
+def _sticky_key(user_id):
+    return f'db_sticky:{user_id}'
+
+
+def is_sticky(user):
+    """True if the user wrote recently and must keep reading from the primary"""
+    if not getattr(user, 'is_authenticated', False):
+        return False
+    return bool(cache.get(_sticky_key(user.pk)))
+
+
+def mark_sticky(user):
+    cache.set(_sticky_key(user.pk), True, getattr(settings, 'DB_REPLICA_STICKY_SECONDS', 10))
+
+
+def read_only(view_func):
+    """
+    Route the view's reads to the replica.
+
+    Place it below @api_view so request.user is the authenticated user.
+    Users who wrote within DB_REPLICA_STICKY_SECONDS keep reading from the
+    primary so they always see their own changes.
+    """
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        if REPLICA_ALIAS not in settings.DATABASES or is_sticky(request.user):
+            return view_func(request, *args, **kwargs)
+        token = _read_only.set(True)
+        try:
+            return view_func(request, *args, **kwargs)
+        finally:
+            _read_only.reset(token)
+    return wrapper
+
+
+class ReplicaRouter:
+    """Send reads from @read_only views to the replica and every write to the primary"""
+
+    def db_for_read(self, model, **hints):
+        if _read_only.get():
+            return REPLICA_ALIAS
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        state = _request_state.get()
+        if state is not None:
+            state['wrote'] = True
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
@@ -0,0 +1,119 @@
+# Avatar pipeline: normalized WebP uploads and cached fixed-size thumbnails
+import hashlib
+import re
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+THUMBNAIL_DIR = 'thumbnails'
+# Square crops, in pixels; small is sized for rosters and lists at 2x density
+THUMBNAIL_SIZES = {'small': 96, 'medium': 256}
+WEBP_QUALITY = 85
+# Content-hash names given by normalize_image; storages may append a suffix on collision
+NORMALIZED_NAME = re.compile(r'(^|/)[0-9a-f]{32}(_\w+)?\.webp$')
+
+
+def _open(source):
+    """Decoded image with its EXIF orientation applied, in a mode WebP can store"""
+    image = ImageOps.exif_transpose(Image.open(source))
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'transparency' in image.info or 'A' in image.getbands() else 'RGB')
+    return image
+
+
+def _webp(image):
+    buffer = BytesIO()
+    image.save(buffer, 'WEBP', quality=WEBP_QUALITY)
+    return buffer.getvalue()
+
+
+def _normalize(image, max_dimension=None):
+    max_dimension = max_dimension or getattr(settings, 'AVATAR_MAX_DIMENSION', 1024)
+    image.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+    data = _webp(image)
+    return image, ContentFile(data, name=f'{hashlib.sha256(data).hexdigest()[:32]}.webp')
+
+
+def normalize_image(source, max_dimension=None):
+    """EXIF-rotated WebP copy of an uploaded image, at most max_dimension pixels wide or high"""
+    return _normalize(_open(source), max_dimension)[1]
+
+
+def is_normalized(name):
+    """Whether a stored name comes from normalize_image, which is when its thumbnails exist"""
+    return bool(NORMALIZED_NAME.search(name or ''))
+
+
+def _store(field_file, source):
+    """Store the normalized copy of source in field_file and render its thumbnails"""
+    image, normalized = _normalize(_open(source))
+    name = field_file.field.generate_filename(field_file.instance, normalized.name)
+    if field_file.storage.exists(name):
+        field_file.name = name
+        field_file._committed = True
+    else:
+        field_file.save(normalized.name, normalized, save=False)
+    render_thumbnails(field_file, image)
+
+
+def normalize_avatar(field_file):
+    """
+    Replace a fresh upload of an ImageField with its normalized copy before
+    the model is saved, and render its thumbnails right away.
+
+    Files are named by content hash, so re-uploading the same picture
+    reuses the stored file. Files already in storage are left alone.
+    """
+    if not field_file or field_file._committed:
+        return
+    _store(field_file, field_file.file)
+
+
+def normalize_stored_avatar(field_file):
+    """
+    Normalize an avatar stored before uploads were normalized, for
+    backfill_thumbnails. Returns False when the file is missing or cannot
+    be decoded; the legacy file is kept either way.
+    """
+    try:
+        with field_file.storage.open(field_file.name, 'rb') as source:
+            _store(field_file, source)
+    except (OSError, ValueError):
+        return False
+    return True
+
+
+def thumbnail_name(name, size):
+    """
+    Storage name of a thumbnail. Sources are never overwritten in place
+    (new uploads get new names), so a name derived from the source name
+    identifies its content and can be cached forever.
+    """
+    digest = hashlib.sha256(f'{name}:{THUMBNAIL_SIZES[size]}'.encode()).hexdigest()[:32]
+    return f'{THUMBNAIL_DIR}/{size}/{digest}.webp'
+
+
+def render_thumbnails(field_file, image=None):
+    """Store the missing thumbnails of a normalized image field; image is its decoded picture when at hand"""
+    storage = field_file.storage
+    for size, pixels in THUMBNAIL_SIZES.items():
+        name = thumbnail_name(field_file.name, size)
+        if storage.exists(name):
+            continue
+        if image is None:
+            with storage.open(field_file.name, 'rb') as source:
+                image = _open(source)
+        storage.save(name, ContentFile(_webp(ImageOps.fit(image, (pixels, pixels), Image.LANCZOS))))
+
+
+def thumbnail_url(field_file, size='small'):
+    """
+    URL of a square thumbnail of an image field, without touching storage.
+    None for empty fields and for legacy files that backfill_thumbnails has
+    not normalized (or could not decode).
+    """
+    if not field_file or not is_normalized(field_file.name):
+        return None
+    return field_file.storage.url(thumbnail_name(field_file.name, size))
@@ -0,0 +1,129 @@
+"""
+Per-request performance instrumentation (see RequestTimingMiddleware).
+
+While a request is being measured, a RequestMetrics object lives in a context
+variable. Database time is collected with connection.execute_wrapper;
+serializer and render time by wrapping BaseSerializer.data and
+Response.rendered_content once at startup. The hooks are only installed when
+REQUEST_INSTRUMENTATION is on, so a disabled setup runs the stock code paths.
+"""
+import json
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from rest_framework.response import Response
+from rest_framework.serializers import BaseSerializer
+
+logger = logging.getLogger(__name__)
+
+_current = ContextVar('request_metrics', default=None)
+_installed = False
+
+
+class RequestMetrics:
+    """Timings collected for one request, in seconds"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.serializer_time = 0.0
+        self.render_time = 0.0
+        self.queries = []
+        self._depth = 0
+
+    @property
+    def total_time(self):
+        return time.perf_counter() - self.started
+
+    def execute_wrapper(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.sql_count += 1
+            self.sql_time += elapsed
+            self.queries.append((context['connection'].alias, sql, elapsed))
+
+    @contextmanager
+    def timing(self, attribute):
+        # Nested serializers (a SerializerMethodField building another
+        # serializer's .data) are already inside the outer measurement
+        if self._depth:
+            yield
+            return
+        self._depth += 1
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            setattr(self, attribute, getattr(self, attribute) + time.perf_counter() - started)
+
+
+def activate():
+    metrics = RequestMetrics()
+    return metrics, _current.set(metrics)
+
+
+def deactivate(token):
+    _current.reset(token)
+
+
+def _timed_property(prop, attribute):
+    def getter(self):
+        metrics = _current.get()
+        if metrics is None:
+            return prop.fget(self)
+        with metrics.timing(attribute):
+            return prop.fget(self)
+    return property(getter, prop.fset, prop.fdel, prop.__doc__)
+
+
+def install():
+    """Wrap serializer .data and response rendering; idempotent"""
+    global _installed
+    if _installed:
+        return
+    # Serializer.data and ListSerializer.data both end in BaseSerializer.data
+    BaseSerializer.data = _timed_property(BaseSerializer.data, 'serializer_time')
+    Response.rendered_content = _timed_property(Response.rendered_content, 'render_time')
+    _installed = True
+
+
+def server_timing(metrics, total):
+    """Server-Timing header value (durations in milliseconds)"""
+    return ', '.join([
+        f'total;dur={total * 1000:.1f}',
+        f'db;dur={metrics.sql_time * 1000:.1f};desc="{metrics.sql_count} queries"',
+        f'serialize;dur={metrics.serializer_time * 1000:.1f}',
+        f'render;dur={metrics.render_time * 1000:.1f}',
+    ])
+
+
+def log_request(request, response, metrics, total, slow_threshold):
+    """One JSON log line per request; slow requests also carry their SQL"""
+    user = getattr(request, 'user', None)
+    record = {
+        'method': request.method,
+        'path': request.path,
+        'status': response.status_code,
+        'user': user.pk if getattr(user, 'is_authenticated', False) else None,
+        'total_ms': round(total * 1000, 1),
+        'sql_count': metrics.sql_count,
+        'sql_ms': round(metrics.sql_time * 1000, 1),
+        'serializer_ms': round(metrics.serializer_time * 1000, 1),
+        'render_ms': round(metrics.render_time * 1000, 1),
+    }
+    if total < slow_threshold:
+        logger.info(json.dumps(record))
+        return
+    record['slow'] = True
+    record['queries'] = [
+        {'db': alias, 'ms': round(elapsed * 1000, 2), 'sql': sql}
+        for alias, sql, elapsed in metrics.queries
+    ]
+    logger.warning(json.dumps(record, default=str))
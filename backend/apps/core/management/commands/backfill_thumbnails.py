@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+from apps.accounts.models import User
+from apps.core.images import is_normalized, normalize_stored_avatar, render_thumbnails
+from apps.students.models import Student
+
+
+class Command(BaseCommand):
+    help = (
+        'Normalize avatars stored before uploads were normalized and render missing thumbnails, '
+        'so serializers can link thumbnails without touching storage'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Count legacy avatars without converting them'
+        )
+
+    def handle(self, *args, **options):
+        for model in (Student, User):
+            converted = rendered = failed = legacy = 0
+            rows = model.objects.exclude(Q(avatar='') | Q(avatar__isnull=True)).only('pk', 'avatar')
+            for obj in rows.iterator():
+                if not is_normalized(obj.avatar.name):
+                    legacy += 1
+                    if options['dry_run']:
+                        continue
+                    if normalize_stored_avatar(obj.avatar):
+                        # update() so the row's other fields and save() side effects are left alone;
+                        # updated_at moves so ETags of responses embedding the avatar change
+                        model.objects.filter(pk=obj.pk).update(avatar=obj.avatar.name, updated_at=timezone.now())
+                        converted += 1
+                    else:
+                        failed += 1
+                        self.stdout.write(self.style.WARNING(f'{model.__name__} {obj.pk}: cannot decode {obj.avatar.name}'))
+                elif not options['dry_run']:
+                    try:
+                        render_thumbnails(obj.avatar)
+                        rendered += 1
+                    except (OSError, ValueError):
+                        failed += 1
+                        self.stdout.write(self.style.WARNING(f'{model.__name__} {obj.pk}: cannot decode {obj.avatar.name}'))
+
+            if options['dry_run']:
+                self.stdout.write(f'{model.__name__}: {legacy} legacy avatars')
+            else:
+                self.stdout.write(self.style.SUCCESS(
+                    f'✅ {model.__name__}: {converted} avatars normalized, {rendered} checked, {failed} failed'
+                ))
@@ -0,0 +1,92 @@
+import time
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.db.utils import load_backend
+from apps.core.benchmarking import summarize, wsgi_environ
+from apps.core.db.pool import pool_stats
+
+POOL_ENGINE = 'apps.core.db.postgresql_pool'
+PLAIN_ENGINE = 'django.db.backends.postgresql'
+
+
+class Command(BaseCommand):
+    help = 'Benchmark request latency with per-request, persistent and pooled database connections'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Requests per mode')
+        parser.add_argument('--warmup', type=int, default=10, help='Untimed (but counted) requests per mode')
+        parser.add_argument(
+            '--path',
+            type=str,
+            default='/api/auth/health/',
+            help='URL to request (must touch the database)'
+        )
+
+    def handle(self, *args, **options):
+        base_settings = dict(connections['default'].settings_dict)
+        modes = []
+        if base_settings['ENGINE'] in (PLAIN_ENGINE, POOL_ENGINE):
+            modes.append(('per-request', PLAIN_ENGINE, 0))
+            modes.append(('persistent', PLAIN_ENGINE, 600))
+            modes.append(('pooled', POOL_ENGINE, 0))
+        else:
+            modes.append(('per-request', base_settings['ENGINE'], 0))
+            modes.append(('persistent', base_settings['ENGINE'], 600))
+
+        handler = WSGIHandler()
+        original = connections['default']
+        original.close()
+
+        self.stdout.write(f"{'mode':<12} {'connects':>8} {'mean':>9} {'p50':>9} {'p95':>9} {'p99':>9} {'req/s':>8}")
+        try:
+            for name, engine, max_age in modes:
+                wrapper = load_backend(engine).DatabaseWrapper(
+                    {**base_settings, 'ENGINE': engine, 'CONN_MAX_AGE': max_age}, 'default'
+                )
+                connections['default'] = wrapper
+                try:
+                    result = self._run(handler, options)
+                finally:
+                    wrapper.close()
+
+                if engine == POOL_ENGINE:
+                    stats = next(s for s in pool_stats() if s['alias'] == 'default')
+                    result['connects'] = stats['connections_created']
+
+                self.stdout.write(
+                    f"{name:<12} {result['connects']:>8} {result['mean_ms']:>7.2f}ms "
+                    f"{result['p50_ms']:>7.2f}ms {result['p95_ms']:>7.2f}ms "
+                    f"{result['p99_ms']:>7.2f}ms {result['throughput_rps']:>8}"
+                )
+        finally:
+            connections['default'] = original
+
+    def _run(self, handler, options):
+        connects = []
+
+        def on_connect(sender, connection, **kwargs):
+            connects.append(connection.alias)
+
+        def request():
+            response = handler(wsgi_environ(options['path']), lambda status, headers: None)
+            # Closing the response fires request_finished, which is where
+            # Django closes or recycles the connection
+            response.close()
+            if response.status_code >= 400:
+                raise RuntimeError(f"{options['path']} returned {response.status_code}")
+
+        connection_created.connect(on_connect)
+        timings = []
+        try:
+            for _ in range(options['warmup']):
+                request()
+            for _ in range(options['requests']):
+                started = time.perf_counter()
+                request()
+                timings.append(time.perf_counter() - started)
+        finally:
+            connection_created.disconnect(on_connect)
+
+        return {**summarize(timings), 'connects': len(connects)}
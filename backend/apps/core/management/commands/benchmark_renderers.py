@@ -0,0 +1,95 @@
+import io
+import json
+import math
+import time
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from apps.attendance.summaries import compute_attendance_stats
+from apps.classes.models import ClassStudent
+from apps.classes.serializers import ClassStudentSerializer
+from apps.core.benchmarking import summarize
+from apps.core.parsers import MessagePackParser, ORJSONParser
+from apps.core.renderers import MessagePackRenderer, ORJSONRenderer
+from apps.grades.models import Grade
+from apps.grades.serializers import GradeSerializer
+from apps.students.models import Student
+from apps.students.serializers import StudentSerializer
+
+RENDERERS = [
+    ('drf-json', JSONRenderer(), JSONParser()),
+    ('orjson', ORJSONRenderer(), ORJSONParser()),
+    ('msgpack', MessagePackRenderer(), MessagePackParser()),
+]
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the JSON and MessagePack renderers/parsers on representative API payloads'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000, help='Items per payload')
+        parser.add_argument('--iterations', type=int, default=50, help='Timed renders per renderer')
+
+    def handle(self, *args, **options):
+        payloads = self._build_payloads(options['rows'])
+        if not payloads:
+            raise CommandError('No data to serialize; run generate_dataset or import some records first')
+
+        self.stdout.write(
+            f"{'payload':<12} {'renderer':<9} {'size':>9} {'render p50':>11} {'render p95':>11} "
+            f"{'parse p50':>10} {'speedup':>8}"
+        )
+        for payload_name, data in payloads:
+            baseline = None
+            expected = json.loads(JSONRenderer().render(data))
+            for renderer_name, renderer, parser in RENDERERS:
+                render = self._time(lambda: renderer.render(data), options['iterations'])
+                body = renderer.render(data)
+                parse = self._time(lambda: parser.parse(io.BytesIO(body)), options['iterations'])
+
+                if renderer.format == 'json' and parser.parse(io.BytesIO(body)) != expected:
+                    self.stdout.write(self.style.WARNING(f'{renderer_name} output differs from drf-json for {payload_name}'))
+
+                baseline = baseline or render['p50_ms']
+                speedup = baseline / render['p50_ms'] if render['p50_ms'] else 0
+                self.stdout.write(
+                    f"{payload_name:<12} {renderer_name:<9} {len(body) / 1024:>7.1f}KB "
+                    f"{render['p50_ms']:>9.3f}ms {render['p95_ms']:>9.3f}ms "
+                    f"{parse['p50_ms']:>8.3f}ms {speedup:>7.1f}x"
+                )
+
+    def _build_payloads(self, rows):
+        sources = [
+            ('students', lambda: StudentSerializer(Student.objects.all()[:rows], many=True).data),
+            ('roster', lambda: ClassStudentSerializer(
+                ClassStudent.objects.select_related('student')[:rows], many=True
+            ).data),
+            ('grades', lambda: GradeSerializer(
+                Grade.objects.select_related('student', 'class_obj__teacher', 'subject', 'created_by')[:rows],
+                many=True
+            ).data),
+            # Raw Decimal values, as returned by the summary endpoints
+            ('attendance', lambda: [
+                {'student': student_id, 'class': class_id, **values}
+                for (student_id, class_id), values in list(compute_attendance_stats().items())[:rows]
+            ]),
+        ]
+
+        payloads = []
+        for name, build in sources:
+            data = list(build())
+            if not data:
+                continue
+            # Repeat small tables so every payload has the requested size
+            data = (data * math.ceil(rows / len(data)))[:rows]
+            payloads.append((name, data))
+        return payloads
+
+    def _time(self, func, iterations):
+        func()
+        timings = []
+        for _ in range(iterations):
+            started = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - started)
+        return summarize(timings)
@@ -0,0 +1,191 @@
+import json
+import random
+import time
+from datetime import time as clock
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from apps.accounts.models import User
+from apps.attendance.models import AttendanceSession
+from apps.classes.models import ClassStudent
+from apps.core.benchmarking import summarize, xlsx
+from apps.core.dataset import FAMILY_NAMES, GIVEN_NAMES, dataset_classes, dataset_exists, dataset_students
+
+# Relative frequency of each request in the mix: mostly reads, check-in
+# bursts at the start of sessions, occasional statistics, imports and exports
+WORKLOAD = {
+    'students:list': 20,
+    'students:search': 15,
+    'classes:list': 8,
+    'classes:roster': 10,
+    'grades:class-summary': 5,
+    'grades:student-summary': 5,
+    'attendance:check-in': 20,
+    'attendance:list': 5,
+    'statistics:students': 3,
+    'statistics:grades': 3,
+    'statistics:attendance': 3,
+    'students:import': 2,
+    'students:export': 1,
+}
+IMPORT_ROWS = 20
+OPEN_SESSIONS = 20
+
+
+class Command(BaseCommand):
+    help = (
+        'Replay a mixed workload (lists, search, check-in, statistics, import, export) against '
+        'a generated dataset through the Django test client and report latency per endpoint. '
+        'Everything runs in a transaction that is rolled back at the end.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--prefix', type=str, default='DS', help='Prefix given to generate_dataset')
+        parser.add_argument('--requests', type=int, default=1000, help='Timed requests in total')
+        parser.add_argument('--warmup', type=int, default=20, help='Untimed requests before measuring')
+        parser.add_argument('--seed', type=int, default=7, help='Seed for the request sequence')
+        parser.add_argument('--json', type=str, help='Also write the results to this file')
+
+    def handle(self, *args, **options):
+        prefix = options['prefix']
+        if not dataset_exists(prefix):
+            raise CommandError(f'No dataset with prefix {prefix}; run generate_dataset --prefix {prefix} first')
+
+        rng = random.Random(options['seed'])
+        names = list(WORKLOAD)
+        weights = list(WORKLOAD.values())
+
+        with transaction.atomic():
+            self._prepare(prefix, rng)
+            client = APIClient(HTTP_HOST='localhost')
+            # Report crashing views as HTTP 500 instead of aborting the run
+            client.raise_request_exception = False
+            client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.access_token}')
+
+            for _ in range(options['warmup']):
+                self._request(client, rng.choices(names, weights)[0], rng)
+
+            timings = {name: [] for name in names}
+            errors = {name: 0 for name in names}
+            started = time.perf_counter()
+            for _ in range(options['requests']):
+                name = rng.choices(names, weights)[0]
+                elapsed, status_code = self._request(client, name, rng)
+                timings[name].append(elapsed)
+                if status_code >= 400:
+                    errors[name] += 1
+            wall = time.perf_counter() - started
+
+            transaction.set_rollback(True)
+
+        results = {
+            name: {**summarize(timings[name]), 'errors': errors[name]}
+            for name in names if timings[name]
+        }
+        results['total'] = {
+            **summarize([value for values in timings.values() for value in values]),
+            'errors': sum(errors.values()),
+            # Requests are sequential, so this is the single-worker ceiling
+            'throughput_rps': round(options['requests'] / wall, 1) if wall else 0.0,
+        }
+        self._report(results)
+
+        if options['json']:
+            with open(options['json'], 'w', encoding='utf-8') as output:
+                json.dump(results, output, indent=2)
+
+    def _prepare(self, prefix, rng):
+        """Benchmark admin, open sessions for check-in and the ids the requests pick from"""
+        admin = User.objects.create_user(
+            email=f'benchmark.admin@{prefix.lower()}.dataset.edu.vn', password=None,
+            first_name='Quản', last_name='Trị', role=User.Role.ADMIN,
+            account_status=User.AccountStatus.ACTIVE,
+        )
+        self.access_token = str(RefreshToken.for_user(admin).access_token)
+
+        classes = list(dataset_classes(prefix).values_list('pk', flat=True))
+        self.class_pks = classes
+        self.student_codes = list(
+            dataset_students(prefix).values_list('student_id', flat=True)
+        )
+        self.student_pages = max(1, len(self.student_codes) // 20)
+
+        # Sessions open all day so every check-in falls inside the time window
+        self.check_ins = []
+        for class_pk in rng.sample(classes, min(OPEN_SESSIONS, len(classes))):
+            session = AttendanceSession.objects.create(
+                class_obj_id=class_pk, session_name='Buổi đo tải', session_date=timezone.localdate(),
+                start_time=clock(0, 0), end_time=clock(23, 59, 59), qr_code=f'{prefix}-BENCH-{class_pk}',
+                created_by=admin,
+            )
+            roster = ClassStudent.objects.filter(class_obj_id=class_pk, is_active=True).values_list(
+                'student__student_id', flat=True
+            )
+            self.check_ins.extend((session.qr_code, code) for code in roster)
+        rng.shuffle(self.check_ins)
+        self.imported = 0
+
+    def _request(self, client, name, rng):
+        method, path, data, format = self._build(name, rng)
+        started = time.perf_counter()
+        if data is None:
+            response = getattr(client, method)(path)
+        else:
+            response = getattr(client, method)(path, data, format=format)
+        elapsed = time.perf_counter() - started
+        return elapsed, response.status_code
+
+    def _build(self, name, rng):
+        """(method, path, data, format) for one request of the given kind"""
+        if name == 'students:list':
+            return 'get', f'/api/students/?page={rng.randint(1, self.student_pages)}', None, None
+        if name == 'students:search':
+            term = rng.choice([rng.choice(FAMILY_NAMES), rng.choice(GIVEN_NAMES), rng.choice(self.student_codes)[-5:]])
+            return 'get', f'/api/students/?search={term}', None, None
+        if name == 'classes:list':
+            return 'get', '/api/classes/', None, None
+        if name == 'classes:roster':
+            return 'get', f'/api/classes/{rng.choice(self.class_pks)}/students/', None, None
+        if name == 'grades:class-summary':
+            return 'get', f'/api/grades/class/{rng.choice(self.class_pks)}/summary/', None, None
+        if name == 'grades:student-summary':
+            return 'get', f'/api/grades/student/{rng.choice(self.student_codes)}/summary/', None, None
+        if name == 'attendance:check-in':
+            # Each student checks in once; once all are used the repeats fail with 400
+            qr_code, student_code = self.check_ins.pop() if self.check_ins else ('', '')
+            return 'post', '/api/attendance/check-in-qr/', {'qr_code': qr_code, 'student_id': student_code}, 'json'
+        if name == 'attendance:list':
+            return 'get', f'/api/attendance/?page={rng.randint(1, 50)}', None, None
+        if name == 'statistics:students':
+            return 'get', '/api/students/statistics/', None, None
+        if name == 'statistics:grades':
+            return 'get', '/api/grades/statistics/', None, None
+        if name == 'statistics:attendance':
+            return 'get', '/api/attendance/statistics/', None, None
+        if name == 'students:import':
+            start = self.imported
+            self.imported += IMPORT_ROWS
+            rows = [
+                [f'BENCH{index:06d}', rng.choice(FAMILY_NAMES), rng.choice(GIVEN_NAMES),
+                 f'bench{index:06d}@benchmark.edu.vn', rng.choice(['Nam', 'Nữ']), '2004-09-01']
+                for index in range(start, self.imported)
+            ]
+            file = xlsx([['Danh sách sinh viên'], ['mssv', 'họ_đệm', 'tên', 'email', 'giới_tính', 'ngày_sinh']] + rows)
+            return 'post', '/api/students/import-excel/', {'file': file}, 'multipart'
+        if name == 'students:export':
+            return 'get', '/api/students/export-excel/', None, None
+        raise CommandError(f'Unknown workload entry {name}')
+
+    def _report(self, results):
+        self.stdout.write(
+            f"{'endpoint':<24} {'count':>6} {'errors':>6} {'mean':>9} {'p50':>9} {'p95':>9} {'p99':>9} {'req/s':>8}"
+        )
+        for name, result in results.items():
+            line = (
+                f"{name:<24} {result['count']:>6} {result['errors']:>6} {result['mean_ms']:>7.2f}ms "
+                f"{result['p50_ms']:>7.2f}ms {result['p95_ms']:>7.2f}ms {result['p99_ms']:>7.2f}ms "
+                f"{result['throughput_rps']:>8}"
+            )
+            self.stdout.write(self.style.ERROR(line) if result['errors'] else line)
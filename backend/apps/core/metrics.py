@@ -0,0 +1,168 @@
+"""
+Prometheus metrics, exposed at /api/system/metrics/.
+
+Under gunicorn, point PROMETHEUS_MULTIPROC_DIR at an empty directory before
+the workers start. prometheus_client then keeps every counter and histogram
+in per-process files there, and the endpoint aggregates all of them, so a
+scrape sees the same totals whichever worker answers it. gunicorn.conf.py
+clears the directory on startup and drops the files of exited workers.
+
+Check-ins per active session are read from the database at scrape time
+instead of being counted in-process, which keeps them exact across workers
+and limits the series to sessions that are open today.
+"""
+import os
+import time
+from functools import wraps
+
+from django.contrib.auth.signals import user_login_failed
+from django.dispatch import receiver
+from django.utils import timezone
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest, multiprocess,
+)
+from prometheus_client.core import CounterMetricFamily
+
+REQUEST_LATENCY = Histogram(
+    'qlsv_http_request_duration_seconds',
+    'Request latency by URL name',
+    ['view', 'method', 'status'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+DB_QUERIES = Counter('qlsv_db_queries_total', 'SQL queries executed', ['database'])
+DB_QUERY_SECONDS = Counter('qlsv_db_query_seconds_total', 'Time spent in SQL queries', ['database'])
+CACHE_REQUESTS = Counter('qlsv_cache_requests_total', 'Cache lookups by result (hit/miss)', ['cache', 'result'])
+IMPORT_ROWS = Counter('qlsv_import_rows_total', 'Rows processed by import jobs', ['kind', 'result'])
+IMPORT_DURATION = Histogram(
+    'qlsv_import_duration_seconds',
+    'Duration of import jobs',
+    ['kind'],
+    buckets=(0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300),
+)
+CHECKINS = Counter('qlsv_attendance_checkins_total', 'QR check-ins by result', ['result'])
+AUTH_FAILURES = Counter('qlsv_auth_failures_total', 'Authentication and authorization failures', ['reason'])
+
+
+class QueryCounter:
+    """execute_wrapper that counts queries and their time per database alias"""
+
+    def __init__(self):
+        self.usage = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            count, seconds = self.usage.get(context['connection'].alias, (0, 0.0))
+            self.usage[context['connection'].alias] = (count + 1, seconds + time.perf_counter() - started)
+
+
+def view_label(request):
+    """Namespaced URL name of the matched view ('students:import_excel'), bounded for 404s"""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unmatched'
+    if match.namespace or not match.url_name:
+        return match.view_name
+    # Only accounts declares app_name; prefix the others with their app
+    module = match.func.__module__.split('.')
+    app = module[1] if module[0] == 'apps' and len(module) > 1 else module[0]
+    return f'{app}:{match.url_name}'
+
+
+def observe_request(request, response, duration, query_counter):
+    REQUEST_LATENCY.labels(
+        view=view_label(request), method=request.method, status=f'{response.status_code // 100}xx'
+    ).observe(duration)
+    for alias, (count, seconds) in query_counter.usage.items():
+        DB_QUERIES.labels(database=alias).inc(count)
+        DB_QUERY_SECONDS.labels(database=alias).inc(seconds)
+    if response.status_code == 401:
+        AUTH_FAILURES.labels(reason='unauthenticated').inc()
+    elif response.status_code == 403:
+        AUTH_FAILURES.labels(reason='forbidden').inc()
+
+
+@receiver(user_login_failed)
+def count_login_failure(sender, credentials, **kwargs):
+    AUTH_FAILURES.labels(reason='invalid_credentials').inc()
+
+
+def record_cache(cache, hit):
+    CACHE_REQUESTS.labels(cache=cache, result='hit' if hit else 'miss').inc()
+
+
+def track_import(kind):
+    """Count created/updated/skipped/failed rows and the duration of an import view"""
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            response = view_func(*args, **kwargs)
+            data = getattr(response, 'data', None)
+            if response.status_code < 400 and isinstance(data, dict) and not data.get('dry_run'):
+                details = data.get('details', {})
+                created = data.get('created_count', details.get('successful_imports', 0))
+                failed = details.get('failed_imports', details.get('failed_rows', len(data.get('errors', []))))
+                IMPORT_ROWS.labels(kind=kind, result='created').inc(created)
+                IMPORT_ROWS.labels(kind=kind, result='updated').inc(data.get('updated_count', 0))
+                IMPORT_ROWS.labels(kind=kind, result='skipped').inc(data.get('skipped_count', 0))
+                IMPORT_ROWS.labels(kind=kind, result='failed').inc(failed)
+                IMPORT_DURATION.labels(kind=kind).observe(time.perf_counter() - started)
+            return response
+        return wrapper
+    return decorator
+
+
+def track_checkin(view_func):
+    """Count check-ins as success (2xx), rejected (4xx) or error (5xx)"""
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        response = view_func(request, *args, **kwargs)
+        if response.status_code < 400:
+            result = 'success'
+        elif response.status_code < 500:
+            result = 'rejected'
+        else:
+            result = 'error'
+        CHECKINS.labels(result=result).inc()
+        return response
+    return wrapper
+
+
+class ActiveSessionCollector:
+    """Check-ins so far in every session open today, read at scrape time"""
+
+    def collect(self):
+        from apps.attendance.models import AttendanceSession
+        from django.db.models import Count, Q
+
+        family = CounterMetricFamily(
+            'qlsv_attendance_session_checkins',
+            'Check-ins recorded in attendance sessions open today',
+            labels=['session', 'class_id'],
+        )
+        sessions = (
+            AttendanceSession.objects
+            .filter(is_active=True, session_date=timezone.localdate())
+            .annotate(checkins=Count('attendances', filter=Q(attendances__check_in_time__isnull=False)))
+            .values_list('pk', 'class_obj__class_id', 'checkins')
+        )
+        for pk, class_id, checkins in sessions:
+            family.add_metric([str(pk), class_id], checkins)
+        yield family
+
+
+_session_registry = CollectorRegistry(auto_describe=False)
+_session_registry.register(ActiveSessionCollector())
+
+
+def render_metrics():
+    """(body, content type) of the Prometheus text exposition"""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry) + generate_latest(_session_registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,75 @@
+import time
+from contextlib import ExitStack
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from . import instrumentation, metrics
+from .db.routers import REPLICA_ALIAS, _request_state, mark_sticky
+
+
+class ReplicaStickinessMiddleware:
+    """Pin a user to the primary database for a short window after they write"""
+
+    def __init__(self, get_response):
+        if REPLICA_ALIAS not in settings.DATABASES:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        state = {'wrote': False}
+        token = _request_state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_state.reset(token)
+
+        # DRF copies the token-authenticated user back onto the Django request
+        user = getattr(request, 'user', None)
+        if state['wrote'] and getattr(user, 'is_authenticated', False):
+            mark_sticky(user)
+        return response
+
+
+class RequestTimingMiddleware:
+    """Server-Timing header and a structured log line with SQL, serializer and render time"""
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_INSTRUMENTATION:
+            raise MiddlewareNotUsed
+        instrumentation.install()
+        self.get_response = get_response
+        self.slow_threshold = settings.SLOW_REQUEST_THRESHOLD_MS / 1000
+
+    def __call__(self, request):
+        metrics, token = instrumentation.activate()
+        try:
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(connections[alias].execute_wrapper(metrics.execute_wrapper))
+                response = self.get_response(request)
+        finally:
+            instrumentation.deactivate(token)
+
+        total = metrics.total_time
+        response['Server-Timing'] = instrumentation.server_timing(metrics, total)
+        instrumentation.log_request(request, response, metrics, total, self.slow_threshold)
+        return response
+
+
+class PrometheusMetricsMiddleware:
+    """Request latency per URL name, SQL query counters and auth failures"""
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        query_counter = metrics.QueryCounter()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(query_counter))
+            response = self.get_response(request)
+        metrics.observe_request(request, response, time.perf_counter() - started, query_counter)
+        return response
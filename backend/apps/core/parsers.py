@@ -0,0 +1,26 @@
+import msgpack
+import orjson
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+
+class ORJSONParser(BaseParser):
+    """Drop-in replacement for rest_framework.parsers.JSONParser"""
+    media_type = 'application/json'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f'JSON parse error - {str(exc)}')
+
+
+class MessagePackParser(BaseParser):
+    """Parse 'Content-Type: application/msgpack' request bodies"""
+    media_type = 'application/msgpack'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack.unpackb(stream.read(), raw=False, strict_map_key=False)
+        except (msgpack.UnpackException, ValueError, TypeError) as exc:
+            raise ParseError(f'MessagePack parse error - {str(exc)}')
@@ -0,0 +1,199 @@
+"""
+Query budgets for every API endpoint, checked by apps.core.tests.test_query_budgets.
+
+Keys are URL routes as registered in the urlconf. Each entry gives the URL to
+request ({placeholders} are filled from the seeded dataset), the method and
+body for write endpoints, and the maximum number of queries the request may
+run. The test seeds N and 10xN rows and also requires the count to be the
+same at both sizes, so a per-row query inside a serializer fails even when it
+fits the budget.
+"""
+from apps.core.benchmarking import xlsx
+
+
+QUERY_BUDGETS = {
+    # Accounts
+    'api/auth/register/': {
+        'method': 'post',
+        'data': lambda ctx: {
+            'email': 'budget.register@example.com', 'password': 'Budget@12345',
+            'password_confirm': 'Budget@12345', 'first_name': 'Nguyễn', 'last_name': 'Văn Kiểm',
+            'role': 'student', 'student_id': 'BUDGETREG1',
+        },
+        'anonymous': True,
+        'budget': 5,
+    },
+    'api/auth/login/': {
+        'method': 'post',
+        'data': lambda ctx: {'email': ctx['admin_email'], 'password': ctx['admin_password']},
+        'anonymous': True,
+        'budget': 2,
+    },
+    'api/auth/logout/': {
+        'method': 'post',
+        'data': lambda ctx: {'refresh': ctx['refresh']},
+        'budget': 1,
+    },
+    'api/auth/token/refresh/': {
+        'method': 'post',
+        'data': lambda ctx: {'refresh': ctx['refresh']},
+        'anonymous': True,
+        'budget': 1,
+    },
+    'api/auth/profile/': {'budget': 0},
+    'api/auth/change-password/': {
+        'method': 'post',
+        'data': lambda ctx: {
+            'old_password': ctx['admin_password'], 'new_password': 'Budget@67890',
+            'new_password_confirm': 'Budget@67890',
+        },
+        'budget': 1,
+    },
+    'api/auth/provision/': {
+        'method': 'post',
+        'data': lambda ctx: {
+            'users': [
+                {
+                    'email': f'budget.provision{index}@example.com', 'first_name': 'Trần',
+                    'last_name': f'Thị {index}', 'role': 'teacher', 'department': 'Công nghệ thông tin',
+                }
+                for index in range(5)
+            ],
+            'default_password': 'Budget@12345',
+        },
+        'budget': 5,
+    },
+    'api/auth/health/': {'budget': 1},
+
+    # System
+    'api/system/database/': {'budget': 1},
+    'api/system/metrics/': {'budget': 1},
+
+    # Classes
+    'api/classes/': {'budget': 4},
+    'api/classes/<int:id>/': {'url': '/api/classes/{class_pk}/', 'budget': 3},
+    'api/classes/<int:class_id>/students/': {'url': '/api/classes/{class_pk}/students/', 'budget': 4},
+    'api/classes/<int:class_id>/students/bulk-enroll/': {
+        'url': '/api/classes/{class_pk}/students/bulk-enroll/',
+        'method': 'post',
+        'data': lambda ctx: {'filters': {'source_class_id': ctx['other_class_pk']}},
+        'budget': 9,
+    },
+    'api/classes/<int:class_id>/students/<str:student_id>/remove/': {
+        'url': '/api/classes/{class_pk}/students/{student_code}/remove/',
+        'method': 'delete',
+        'budget': 6,
+    },
+    'api/classes/<int:class_id>/available-students/': {
+        'url': '/api/classes/{class_pk}/available-students/',
+        'budget': 2,
+    },
+    'api/classes/statistics/': {'budget': 7},
+    'api/classes/autocomplete/': {'url': '/api/classes/autocomplete/?q={class_code}', 'budget': 2},
+
+    # Students
+    'api/students/': {'budget': 3},
+    'api/students/<int:pk>/': {'url': '/api/students/{student_pk}/', 'budget': 1},
+    'api/students/<int:pk>/profile/': {'url': '/api/students/{student_pk}/profile/', 'budget': 8},
+    'api/students/bulk-create/': {
+        'method': 'post',
+        'data': lambda ctx: {'students': [
+            {
+                'student_id': f'BUDGET{index}', 'first_name': 'Lê', 'last_name': f'Văn {index}',
+                'email': f'budget.student{index}@example.com', 'gender': 'male',
+                'date_of_birth': '2003-05-01',
+            }
+            for index in range(5)
+        ]},
+        'budget': 25,
+    },
+    'api/students/import-excel/': {
+        'method': 'post',
+        'format': 'multipart',
+        'data': lambda ctx: {'file': xlsx(
+            [['Danh sách sinh viên'], ['mssv', 'họ_đệm', 'tên', 'email', 'giới_tính', 'ngày_sinh']]
+            + [[f'BUDGETX{index}', 'Phạm', f'Thị {index}', f'budget.import{index}@example.com', 'Nữ', '2003-05-01']
+               for index in range(5)]
+        )},
+        'budget': 30,
+    },
+    'api/students/export-excel/': {'budget': 1},
+    'api/students/statistics/': {'budget': 12},
+    'api/students/autocomplete/': {'url': '/api/students/autocomplete/?q=sv', 'budget': 1},
+
+    # Grades
+    'api/grades/': {'budget': 5},
+    'api/grades/<int:pk>/': {'url': '/api/grades/{grade_pk}/', 'budget': 4},
+    'api/grades/statistics/': {'budget': 6},
+    'api/grades/student/<str:student_id>/summary/': {
+        'url': '/api/grades/student/{student_code}/summary/',
+        'budget': 9,
+    },
+    'api/grades/class/<int:class_id>/summary/': {
+        'url': '/api/grades/class/{class_pk}/summary/',
+        'budget': 8,
+    },
+    'api/grades/subjects/autocomplete/': {
+        'url': '/api/grades/subjects/autocomplete/?q={subject_code}',
+        'budget': 2,
+    },
+    'api/grades/gradebook/': {
+        'method': 'put',
+        'data': lambda ctx: {
+            'class_id': ctx['class_pk'], 'subject_id': ctx['subject_pk'],
+            'grades': [
+                {'student_id': code, 'scores': {'midterm': 7.5, 'final': 8}}
+                for code in ctx['class_student_codes']
+            ],
+        },
+        'budget': 7,
+    },
+    'api/grades/import-excel/': {
+        'method': 'post',
+        'format': 'multipart',
+        'data': lambda ctx: {'file': xlsx(
+            [['student_id', 'class_id', 'subject', 'score', 'exam_type']]
+            + [[ctx['student_code'], ctx['class_code'], ctx['subject_code'], 8.5, 'quiz']]
+        )},
+        'budget': 7,
+    },
+
+    # Attendance
+    'api/attendance/sessions/': {'budget': 5},
+    'api/attendance/sessions/<int:pk>/': {'url': '/api/attendance/sessions/{session_pk}/', 'budget': 4},
+    'api/attendance/sessions/<int:session_id>/generate-qr/': {
+        'url': '/api/attendance/sessions/{session_pk}/generate-qr/',
+        'method': 'post',
+        'budget': 3,
+    },
+    'api/attendance/sessions/<int:session_id>/analytics/': {
+        'url': '/api/attendance/sessions/{session_pk}/analytics/',
+        'budget': 4,
+    },
+    'api/attendance/check-in-qr/': {
+        'method': 'post',
+        'data': lambda ctx: {'qr_code': ctx['qr_code'], 'student_id': ctx['open_session_student_code']},
+        'budget': 12,
+    },
+    'api/attendance/': {'budget': 6},
+    'api/attendance/<int:pk>/': {'url': '/api/attendance/{attendance_pk}/', 'budget': 4},
+    'api/attendance/bulk-mark/': {
+        'method': 'post',
+        'data': lambda ctx: {
+            'session_id': ctx['session_pk'],
+            'attendances': [{'student_id': code, 'status': 'late'} for code in ctx['class_student_codes'][:5]],
+            'default_status': 'absent',
+        },
+        'budget': 4,
+    },
+    'api/attendance/statistics/': {'budget': 3},
+    'api/attendance/import-excel/': {
+        'method': 'post',
+        'format': 'multipart',
+        'data': lambda ctx: {'file': xlsx(
+            [['student_id', 'session_id', 'status']]
+            + [[ctx['open_session_student_code'], ctx['open_session_pk'], 'present']]
+        )},
+        'budget': 7,
+    },
+}
@@ -0,0 +1,46 @@
+# Fast DRF renderers: orjson for JSON and MessagePack for the mobile client
+import msgpack
+import orjson
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils import encoders
+
+# Types orjson/msgpack cannot encode (Decimal, lazy strings, querysets,
+# timedelta, ...) fall back to the same conversions as DRF's JSONRenderer
+_encoder = encoders.JSONEncoder()
+
+# Datetimes are passed through to DRF's encoder as well, so raw datetimes keep
+# the exact format (microseconds, 'Z' suffix for UTC) the frontend already parses
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+
+def encode_default(obj):
+    return _encoder.default(obj)
+
+
+class ORJSONRenderer(BaseRenderer):
+    """Drop-in replacement for rest_framework.renderers.JSONRenderer"""
+    media_type = 'application/json'
+    format = 'json'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        options = ORJSON_OPTIONS
+        # Honour 'Accept: application/json; indent=N' like the stock renderer
+        if accepted_media_type and 'indent=' in accepted_media_type:
+            options |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, default=encode_default, option=options)
+
+
+class MessagePackRenderer(BaseRenderer):
+    """Render responses as MessagePack for 'Accept: application/msgpack'"""
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=encode_default, use_bin_type=True, datetime=False)
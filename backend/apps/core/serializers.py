@@ -0,0 +1,138 @@
+"""
+Sparse fieldsets and expansion control for read serializers.
+
+?fields=id,score,student.student_id keeps only the listed fields (dotted
+paths reach into nested objects). ?expand=student,class_obj.teacher keeps
+the listed nested objects and renders every other nested relation as its
+primary key, read from the foreign key column. Without the parameters the
+full representation is returned, so existing clients are unaffected.
+
+Dropped nested serializers are never instantiated or run, and views use
+rendered_relations() to join only the relations that will be rendered.
+"""
+from rest_framework import serializers
+
+from .images import thumbnail_url
+
+
+def parse_field_paths(value):
+    """'id,student.student_id' -> {'id': {}, 'student': {'student_id': {}}}; None when the parameter is absent"""
+    if value is None:
+        return None
+    tree = {}
+    for path in value.split(','):
+        node = tree
+        for part in path.strip().split('.'):
+            if part:
+                node = node.setdefault(part, {})
+    return tree
+
+
+def _request_trees(request):
+    if request is None or request.method not in ('GET', 'HEAD'):
+        return None, None
+    # An empty ?fields= means all fields; an empty ?expand= collapses every relation
+    return (
+        parse_field_paths(request.query_params.get('fields')) or None,
+        parse_field_paths(request.query_params.get('expand')),
+    )
+
+
+def rendered_relations(request, relations):
+    """
+    The relations (select_related paths such as 'class_obj__teacher') the
+    response will render nested, so the view can skip joining the others.
+    Serializer field names match the relation names.
+    """
+    fields, expand = _request_trees(request)
+    rendered = []
+    for relation in relations:
+        field_node, expand_node = fields, expand
+        for part in relation.split('__'):
+            if (field_node is not None and part not in field_node) or (expand_node is not None and part not in expand_node):
+                break
+            field_node = field_node[part] or None if field_node is not None else None
+            expand_node = expand_node[part] if expand_node is not None else None
+        else:
+            rendered.append(relation)
+    return rendered
+
+
+class ThumbnailField(serializers.ReadOnlyField):
+    """
+    Absolute URL of a square thumbnail of an image field (see
+    apps.core.images); null for legacy files until backfill_thumbnails runs.
+    """
+
+    def __init__(self, size='small', **kwargs):
+        self.size = size
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        url = thumbnail_url(value, self.size)
+        request = self.context.get('request')
+        if url and request is not None:
+            return request.build_absolute_uri(url)
+        return url
+
+
+def select_rendered(queryset, request, relations, prefix=''):
+    """
+    select_related only the relations the response renders nested. prefix
+    locates the queryset within the response, e.g. 'class_obj__' for the
+    classes prefetched by a grade list.
+    """
+    relations = [
+        relation[len(prefix):] for relation in rendered_relations(request, [prefix + relation for relation in relations])
+    ]
+    return queryset.select_related(*relations) if relations else queryset
+
+
+class DynamicFieldsMixin:
+    """
+    Applies ?fields= and ?expand= to a ModelSerializer. The top-level
+    serializer reads them from the request; nested serializers receive
+    their subtree from their parent.
+    """
+    field_tree = None
+    expand_tree = None
+    embedded = False
+
+    def _is_root(self):
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        return parent is None and not self.embedded
+
+    def embed(self, name, serializer_class, instance, **kwargs):
+        """
+        serializer_class data for a SerializerMethodField called name, with
+        this serializer's context and the name subtree of ?fields= / ?expand=.
+        """
+        serializer = serializer_class(instance, context=self.context, **kwargs)
+        nested = serializer.child if isinstance(serializer, serializers.ListSerializer) else serializer
+        nested.embedded = True
+        nested.field_tree = (self.field_tree or {}).get(name) or None
+        nested.expand_tree = self.expand_tree.get(name) if self.expand_tree is not None else None
+        return serializer.data
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if self._is_root():
+            self.field_tree, self.expand_tree = _request_trees(self.context.get('request'))
+
+        if self.field_tree is not None:
+            fields = {name: field for name, field in fields.items() if name in self.field_tree}
+
+        for name, field in list(fields.items()):
+            many = isinstance(field, serializers.ListSerializer)
+            nested = field.child if many else field
+            if not isinstance(nested, serializers.BaseSerializer):
+                continue
+            if self.expand_tree is not None and name not in self.expand_tree:
+                fields[name] = serializers.PrimaryKeyRelatedField(read_only=True, many=many, source=field.source)
+                continue
+            if isinstance(nested, DynamicFieldsMixin):
+                nested.field_tree = (self.field_tree or {}).get(name) or None
+                nested.expand_tree = self.expand_tree.get(name) if self.expand_tree is not None else None
+        return fields
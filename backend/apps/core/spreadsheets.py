@@ -0,0 +1,51 @@
+# Fast .xlsx reading for the import endpoints
+import io
+
+from openpyxl import load_workbook
+
+
+def normalize_header(value):
+    return str(value).strip().lower().replace(' ', '_') if value is not None else ''
+
+
+def read_sheet(content, column_aliases):
+    """
+    Read the first worksheet into a list of (row number, row dict) pairs.
+
+    The first row holds the headers; column_aliases maps each field to the
+    header names accepted for it. Cells are returned as strings, empty rows
+    are skipped. Uses openpyxl's read-only streaming mode, which keeps large
+    sheets fast and memory-flat.
+    """
+    workbook = load_workbook(io.BytesIO(content), read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        headers = [normalize_header(value) for value in next(rows, ())]
+
+        columns = {}
+        for field, aliases in column_aliases.items():
+            for index, header in enumerate(headers):
+                if header in aliases:
+                    columns[field] = index
+                    break
+
+        parsed = []
+        for row_number, values in enumerate(rows, start=2):
+            if not any(value not in (None, '') for value in values):
+                continue
+            parsed.append((row_number, {
+                field: _cell(values[index]) if index < len(values) else ''
+                for field, index in columns.items()
+            }))
+        return parsed
+    finally:
+        workbook.close()
+
+
+def _cell(value):
+    if value is None:
+        return ''
+    # Whole numbers typed into Excel come back as floats (8.0, 1001.0)
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
@@ -0,0 +1,70 @@
+from django.contrib.auth.models import update_last_login
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.accounts.models import User
+from apps.core.dataset import generate_dataset
+from apps.grades.models import Grade
+from apps.students.models import Student
+
+
+class ScopedEtagTests(TestCase):
+    """ETags of list views only change with the rows the response renders"""
+
+    @classmethod
+    def setUpTestData(cls):
+        generate_dataset(students=40, teachers=2, classes=4, class_size=10, subjects=2, sessions_per_class=1)
+        cls.admin = User.objects.create_user(
+            email='admin@test.edu.vn', username='admin', password='Admin@12345', role='admin'
+        )
+        cls.grade = Grade.objects.select_related('class_obj').first()
+
+    def setUp(self):
+        self.client = APIClient(HTTP_HOST='localhost')
+        self.client.force_authenticate(self.admin)
+        self.url = f'/api/grades/?class_id={self.grade.class_obj_id}'
+
+    def etag(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return response['ETag']
+
+    def test_unchanged_rows_answer_304(self):
+        etag = self.etag()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_writes_outside_the_response_keep_the_etag(self):
+        etag = self.etag()
+        rendered = Grade.objects.filter(class_obj_id=self.grade.class_obj_id).values('student_id')
+        Student.objects.exclude(pk__in=rendered).first().save()
+        teacher = self.grade.class_obj.teacher
+        teacher.last_login_at = timezone.now()
+        teacher.save(update_fields=['last_login_at'])
+        self.assertEqual(self.etag(), etag)
+
+    def test_write_to_a_rendered_relation_changes_the_etag(self):
+        etag = self.etag()
+        self.grade.student.save()
+        self.assertNotEqual(self.etag(), etag)
+
+    def test_teacher_rename_changes_the_etag(self):
+        for self.url in (self.url, '/api/classes/', f'/api/classes/{self.grade.class_obj_id}/'):
+            with self.subTest(url=self.url):
+                etag = self.etag()
+                teacher = User.objects.get(pk=self.grade.class_obj.teacher_id)
+                teacher.last_name = f'{teacher.last_name} Mới'
+                teacher.save()
+                response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200)
+                self.assertIn(teacher.last_name, response.content.decode())
+
+    def test_teacher_login_keeps_the_etag(self):
+        self.url = '/api/classes/'
+        etag = self.etag()
+        teacher = self.grade.class_obj.teacher
+        update_last_login(None, teacher)
+        teacher.last_login_at = timezone.now()
+        teacher.save(update_fields=['last_login_at'])
+        self.assertEqual(self.etag(), etag)
@@ -0,0 +1,52 @@
+from datetime import date
+from io import StringIO
+from decimal import Decimal
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from apps.accounts.models import User
+from apps.classes.models import Class, ClassStudent
+from apps.core.dataset import dataset_exists
+from apps.grades.models import Grade, Subject
+from apps.students.models import Student
+
+DATASET = dict(students=10, teachers=2, classes=2, class_size=5, subjects=2, sessions_per_class=1)
+
+
+class DatasetTests(TestCase):
+    """Generated datasets are removed without touching real rows whose codes share the prefix"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.teacher = User.objects.create_user(
+            email='gv@test.edu.vn', username='gv', password='Teacher@12345', role='teacher'
+        )
+        cls.class_obj = Class.objects.create(class_id='DSA101', class_name='Cấu trúc dữ liệu', teacher=cls.teacher)
+        # Matches the generated subject code pattern, but is graded outside the dataset
+        cls.subject = Subject.objects.create(subject_id='DSM101', subject_name='Khoa học dữ liệu', credits=3)
+        cls.student = Student.objects.create(
+            student_id='DSV0001', first_name='Nguyễn', last_name='Văn An', email='an@test.edu.vn',
+            gender='male', date_of_birth=date(2003, 1, 1),
+        )
+        ClassStudent.objects.create(class_obj=cls.class_obj, student=cls.student)
+        Grade.objects.create(
+            student=cls.student, class_obj=cls.class_obj, subject=cls.subject, grade_type='final',
+            score=Decimal('8.5'), max_score=Decimal('10'), created_by=cls.teacher,
+        )
+
+    def test_real_codes_with_the_prefix_do_not_count_as_a_dataset(self):
+        self.assertFalse(dataset_exists('DS'))
+        call_command('generate_dataset', prefix='DS', **DATASET, stdout=StringIO())
+        self.assertTrue(dataset_exists('DS'))
+
+    def test_delete_keeps_real_rows(self):
+        call_command('generate_dataset', prefix='DS', **DATASET, stdout=StringIO())
+        call_command('generate_dataset', prefix='DS', delete=True, stdout=StringIO())
+
+        self.assertFalse(dataset_exists('DS'))
+        self.assertEqual(list(Class.objects.values_list('class_id', flat=True)), ['DSA101'])
+        self.assertEqual(list(Subject.objects.values_list('subject_id', flat=True)), ['DSM101'])
+        self.assertEqual(list(Student.objects.values_list('student_id', flat=True)), ['DSV0001'])
+        self.assertEqual(Grade.objects.count(), 1)
+        self.assertTrue(ClassStudent.objects.filter(class_obj=self.class_obj).exists())
@@ -0,0 +1,69 @@
+import shutil
+import tempfile
+from datetime import date
+from io import BytesIO, StringIO
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from apps.core.images import THUMBNAIL_SIZES, thumbnail_name, thumbnail_url
+from apps.students.models import Student
+
+
+def png(size=(400, 300)):
+    buffer = BytesIO()
+    Image.new('RGB', size, 'red').save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+class AvatarThumbnailTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def student(self, **kwargs):
+        return Student.objects.create(
+            student_id='SV001', first_name='Nguyễn', last_name='Văn An', email='sv1@test.edu.vn',
+            gender='male', date_of_birth=date(2003, 1, 1), **kwargs
+        )
+
+    def assert_thumbnails(self, field_file):
+        for size in THUMBNAIL_SIZES:
+            self.assertTrue(default_storage.exists(thumbnail_name(field_file.name, size)))
+
+    def test_uploads_are_normalized_with_thumbnails(self):
+        student = self.student(avatar=SimpleUploadedFile('an.png', png(), content_type='image/png'))
+        self.assertTrue(student.avatar.name.endswith('.webp'))
+        self.assert_thumbnails(student.avatar)
+
+        # Serializers only build the URL, without touching storage
+        with mock.patch.object(FileSystemStorage, 'exists', side_effect=AssertionError):
+            self.assertEqual(thumbnail_url(student.avatar), '/media/' + thumbnail_name(student.avatar.name, 'small'))
+
+    def test_legacy_avatars_are_backfilled(self):
+        legacy = default_storage.save('student_avatars/an.png', ContentFile(png()))
+        broken = default_storage.save('student_avatars/broken.png', ContentFile(b'not an image'))
+        student = self.student(avatar=legacy)
+        other = Student.objects.create(
+            student_id='SV002', first_name='Trần', last_name='Thị Mai', email='sv2@test.edu.vn',
+            gender='female', date_of_birth=date(2003, 1, 1), avatar=broken,
+        )
+        self.assertIsNone(thumbnail_url(student.avatar))
+
+        call_command('backfill_thumbnails', stdout=StringIO())
+
+        student.refresh_from_db()
+        self.assertTrue(student.avatar.name.endswith('.webp'))
+        self.assert_thumbnails(student.avatar)
+        self.assertIsNotNone(thumbnail_url(student.avatar))
+        other.refresh_from_db()
+        self.assertEqual(other.avatar.name, broken)
+        self.assertIsNone(thumbnail_url(other.avatar))
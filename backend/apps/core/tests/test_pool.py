@@ -0,0 +1,94 @@
+import threading
+import time
+import unittest
+from itertools import count
+
+from django.db import connection
+from django.db.utils import load_backend
+from django.test import TransactionTestCase
+from psycopg2 import pool as pg_pool
+
+_aliases = count()
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', 'The pooled engine needs PostgreSQL')
+class PooledEngineTests(TransactionTestCase):
+    """apps.core.db.postgresql_pool against the test database"""
+
+    def make_connection(self, **pool_options):
+        settings_dict = {
+            **connection.settings_dict,
+            'ENGINE': 'apps.core.db.postgresql_pool',
+            'CONN_MAX_AGE': 0,
+            'POOL': {'MIN_SIZE': 1, 'MAX_SIZE': 2, 'TIMEOUT': 1, **pool_options},
+        }
+        wrapper = load_backend(settings_dict['ENGINE']).DatabaseWrapper(settings_dict, f'pool_test_{next(_aliases)}')
+        self.addCleanup(lambda: wrapper.pool and wrapper.pool.close())
+        return wrapper
+
+    def query(self, wrapper):
+        with wrapper.cursor() as cursor:
+            cursor.execute('SELECT pg_backend_pid()')
+            return cursor.fetchone()[0]
+
+    def test_connection_is_returned_and_reused(self):
+        wrapper = self.make_connection()
+        first = self.query(wrapper)
+        wrapper.close()
+        second = self.query(wrapper)
+        wrapper.close()
+
+        self.assertEqual(first, second)
+        stats = wrapper.pool.stats()
+        self.assertEqual(stats['connections_created'], 1)
+        self.assertEqual(stats['checkouts'], 2)
+        self.assertEqual(stats['in_use'], 0)
+
+    def test_transactions_work_on_pooled_connections(self):
+        wrapper = self.make_connection()
+        with wrapper.cursor() as cursor:
+            cursor.execute('CREATE TEMPORARY TABLE pool_probe (value integer)')
+        wrapper.set_autocommit(False)
+        with wrapper.cursor() as cursor:
+            cursor.execute('INSERT INTO pool_probe VALUES (1)')
+        wrapper.rollback()
+        wrapper.set_autocommit(True)
+        with wrapper.cursor() as cursor:
+            cursor.execute('SELECT COUNT(*) FROM pool_probe')
+            self.assertEqual(cursor.fetchone()[0], 0)
+        wrapper.close()
+
+    def test_exhausted_pool_times_out(self):
+        holders = [self.make_connection(MAX_SIZE=1, TIMEOUT=0.2)]
+        self.query(holders[0])
+        pool = holders[0].pool
+
+        started = time.monotonic()
+        with self.assertRaises(pg_pool.PoolError):
+            pool.getconn()
+        self.assertGreaterEqual(time.monotonic() - started, 0.2)
+        self.assertEqual(pool.stats()['timeouts'], 1)
+        holders[0].close()
+
+    def test_waiter_is_woken_when_a_connection_is_returned(self):
+        wrapper = self.make_connection(MAX_SIZE=1, TIMEOUT=5)
+        self.query(wrapper)
+        pool = wrapper.pool
+        result = {}
+
+        def borrow():
+            conn = pool.getconn()
+            result['conn'] = conn
+            pool.putconn(conn)
+
+        waiter = threading.Thread(target=borrow)
+        waiter.start()
+        time.sleep(0.1)
+        self.assertNotIn('conn', result)
+        released = time.monotonic()
+        wrapper.close()
+        waiter.join(5)
+
+        self.assertIn('conn', result)
+        self.assertLess(time.monotonic() - released, 1)
+        self.assertEqual(pool.stats()['waits'], 1)
@@ -0,0 +1,142 @@
+from datetime import time
+
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, get_resolver
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.accounts.models import User
+from apps.attendance.closeout import close_ended_sessions
+from apps.attendance.models import Attendance, AttendanceSession
+from apps.classes.models import Class
+from apps.core.dataset import generate_dataset
+from apps.core.query_budgets import QUERY_BUDGETS
+from apps.grades.models import Grade
+
+# N students at the small size; the large size is 10xN
+STUDENTS = 20
+ADMIN_PASSWORD = 'Budget@Admin1'
+
+
+def iter_routes(patterns, prefix=''):
+    """Yield the full route string of every URL pattern"""
+    for pattern in patterns:
+        route = prefix + str(pattern.pattern)
+        if isinstance(pattern, URLResolver):
+            yield from iter_routes(pattern.url_patterns, route)
+        elif isinstance(pattern, URLPattern):
+            yield route
+
+
+def api_routes():
+    return [route for route in iter_routes(get_resolver().url_patterns) if route.startswith('api/')]
+
+
+def seed(students):
+    """Seed the dataset and return the values the budget URLs and bodies are built from"""
+    generate_dataset(
+        students=students, teachers=max(2, students // 20), classes=max(2, students // 5),
+        class_size=10, subjects=5, sessions_per_class=4, prefix='BUDGET',
+    )
+    admin = User.objects.create_user(
+        email='budget.admin@example.com', password=ADMIN_PASSWORD, first_name='Quản',
+        last_name='Trị', role=User.Role.ADMIN, account_status=User.AccountStatus.ACTIVE,
+    )
+    class_obj, other_class = Class.objects.filter(class_id__startswith='BUDGET').order_by('pk')[:2]
+    enrollments = list(class_obj.class_students.select_related('student').order_by('pk'))
+    session = AttendanceSession.objects.filter(class_obj=class_obj).order_by('pk').first()
+
+    # Past sessions are closed as the scheduler would have done, so reads measure the steady state
+    close_ended_sessions(class_ids=Class.objects.filter(class_id__startswith='BUDGET').values('pk'))
+
+    # A session still open today, for QR check-in and attendance import
+    open_session = AttendanceSession.objects.create(
+        class_obj=class_obj, session_name='Buổi kiểm tra', session_date=timezone.localdate(),
+        start_time=time(0, 0), end_time=time(23, 59, 59), qr_code='BUDGET-QR',
+        created_by=class_obj.teacher,
+    )
+    grade = Grade.objects.filter(class_obj=class_obj).select_related('subject').first()
+    return {
+        'admin': admin,
+        'admin_email': admin.email,
+        'admin_password': ADMIN_PASSWORD,
+        'refresh': str(RefreshToken.for_user(admin)),
+        'class_pk': class_obj.pk,
+        'class_code': class_obj.class_id,
+        'other_class_pk': other_class.pk,
+        'student_pk': enrollments[0].student.pk,
+        'student_code': enrollments[0].student.student_id,
+        'session_pk': session.pk,
+        'attendance_pk': Attendance.objects.filter(session=session).first().pk,
+        'grade_pk': grade.pk,
+        'subject_pk': grade.subject.pk,
+        'subject_code': grade.subject.subject_id,
+        'class_student_codes': [enrollment.student.student_id for enrollment in enrollments],
+        'qr_code': open_session.qr_code,
+        'open_session_pk': open_session.pk,
+        'open_session_student_code': enrollments[1].student.student_id,
+    }
+
+
+class QueryBudgetTests(TestCase):
+    """
+    Every API endpoint stays within its budget (apps/core/query_budgets.py)
+    with N seeded students and runs exactly as many queries with 10xN, so a
+    per-row query fails even when it fits the budget.
+    """
+
+    def test_every_route_has_a_budget(self):
+        routes = api_routes()
+        self.assertEqual([route for route in routes if route not in QUERY_BUDGETS], [])
+        self.assertEqual([route for route in QUERY_BUDGETS if route not in routes], [])
+
+    def client_for(self, route, context):
+        client = APIClient(HTTP_HOST='localhost')
+        if not QUERY_BUDGETS[route].get('anonymous'):
+            # Fresh instance: views such as change-password mutate request.user
+            client.force_authenticate(user=User.objects.get(pk=context['admin'].pk))
+        return client
+
+    def request(self, client, route, context):
+        spec = QUERY_BUDGETS[route]
+        url = spec.get('url', '/' + route).format(**context)
+        method = getattr(client, spec.get('method', 'get'))
+        if 'data' in spec:
+            return method(url, spec['data'](context), format=spec.get('format', 'json'))
+        return method(url)
+
+    def check_routes(self, context, expected=None):
+        """Run every route once to warm per-process caches, then measure it; returns the counts"""
+        counts = {}
+        for route in QUERY_BUDGETS:
+            with self.subTest(route=route, students=STUDENTS * (10 if expected else 1)):
+                with transaction.atomic():
+                    self.request(self.client_for(route, context), route, context)
+                    transaction.set_rollback(True)
+                # Response caches (the student profile) start cold for the measured request
+                cache.clear()
+                with transaction.atomic():
+                    client = self.client_for(route, context)
+                    if expected:
+                        with self.assertNumQueries(expected[route]):
+                            response = self.request(client, route, context)
+                    else:
+                        with CaptureQueriesContext(connection) as captured:
+                            response = self.request(client, route, context)
+                        counts[route] = len(captured.captured_queries)
+                        self.assertLessEqual(counts[route], QUERY_BUDGETS[route]['budget'])
+                    transaction.set_rollback(True)
+                self.assertLess(response.status_code, 400)
+        return counts
+
+    def test_query_counts_stay_within_budget_as_rows_grow(self):
+        with transaction.atomic():
+            counts = self.check_routes(seed(STUDENTS))
+            transaction.set_rollback(True)
+        with transaction.atomic():
+            self.check_routes(seed(STUDENTS * 10), expected=counts)
+            transaction.set_rollback(True)
@@ -0,0 +1,130 @@
+import re
+import unittest
+
+from django.apps import apps
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.accounts.models import User
+from apps.attendance.models import AttendanceSession
+from apps.classes.models import Class
+from apps.core.dataset import generate_dataset
+
+# Tables at least this big after seeding count as large. Smaller ones (the
+# few thousand seeded sessions) are cheaper to hash in full than to probe
+# row by row, and the planner rightly scans them.
+MIN_ROWS = 5000
+LARGE_TABLE_CANDIDATES = ['students', 'class_students', 'attendance_sessions', 'attendances', 'grades']
+
+# Main list/detail reads of each view; {placeholders} are filled from the seeded data
+ENDPOINTS = [
+    '/api/students/',
+    '/api/students/{student_pk}/',
+    '/api/classes/',
+    '/api/classes/{class_pk}/students/',
+    '/api/grades/?student_id={student_pk}',
+    '/api/grades/class/{class_pk}/summary/',
+    '/api/grades/student/{student_code}/summary/',
+    '/api/attendance/',
+    '/api/attendance/?session_id={session_pk}',
+    '/api/attendance/?student_id={student_pk}',
+    '/api/attendance/sessions/{session_pk}/analytics/',
+]
+
+ALIAS_RE = re.compile(r'"(\w+)" ([A-Z]\d+)\b')
+
+
+def sequential_scans(sql):
+    """Tables the plan of sql reads with a full scan"""
+    aliases = dict((alias, table) for table, alias in ALIAS_RE.findall(sql))
+    scans = []
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('EXPLAIN ' + sql)
+            for (line,) in cursor.fetchall():
+                found = re.search(r'Seq Scan on (\w+)', line)
+                if found:
+                    scans.append(found.group(1))
+        else:
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+            for row in cursor.fetchall():
+                found = re.fullmatch(r'SCAN (\w+)(?: AS (\w+))?', row[-1])
+                if found:
+                    scans.append(found.group(1))
+    return [aliases.get(name.upper(), name) for name in scans]
+
+
+class QueryPlanTests(TestCase):
+    """The main view queries use indexes once the tables are large"""
+
+    @classmethod
+    def setUpTestData(cls):
+        generate_dataset(students=20000, classes=200, prefix='EXPLAIN')
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+            cls.large_tables = set()
+            for table in LARGE_TABLE_CANDIDATES:
+                cursor.execute(f'SELECT COUNT(*) FROM {connection.ops.quote_name(table)}')
+                if cursor.fetchone()[0] >= MIN_ROWS:
+                    cls.large_tables.add(table)
+
+        class_obj = Class.objects.order_by('pk')[1]
+        student = class_obj.class_students.select_related('student').first().student
+        cls.context = {
+            'class_pk': class_obj.pk,
+            'student_pk': student.pk,
+            'student_code': student.student_id,
+            'session_pk': AttendanceSession.objects.filter(class_obj=class_obj).order_by('pk').first().pk,
+        }
+        cls.admin = User.objects.create(
+            email='explain-admin@explain.dataset.edu.vn', username='explain-admin',
+            role=User.Role.ADMIN, account_status=User.AccountStatus.ACTIVE,
+        )
+
+    def run_view(self, path):
+        request = APIRequestFactory().get(path, HTTP_HOST='localhost')
+        force_authenticate(request, user=self.admin)
+        match = resolve(path.split('?')[0])
+        with CaptureQueriesContext(connection) as captured:
+            response = match.func(request, *match.args, **match.kwargs)
+            if hasattr(response, 'render'):
+                response.render()
+        return response.status_code, captured.captured_queries
+
+    def test_large_tables_are_seeded(self):
+        self.assertEqual(self.large_tables, {'students', 'class_students', 'attendances', 'grades'})
+
+    def test_filtered_queries_do_not_scan_large_tables(self):
+        for template in ENDPOINTS:
+            path = template.format(**self.context)
+            with self.subTest(path=path):
+                status_code, queries = self.run_view(path)
+                self.assertLess(status_code, 400)
+                for sql in dict.fromkeys(query['sql'] for query in queries):
+                    if ' WHERE ' not in sql and ' ORDER BY ' not in sql:
+                        continue
+                    scanned = self.large_tables.intersection(sequential_scans(sql))
+                    self.assertFalse(scanned, f'Sequential scan on {", ".join(sorted(scanned))}: {sql[:300]}')
+
+    @unittest.skipUnless(connection.vendor == 'postgresql', 'Partial indexes and opclasses are Postgres features')
+    def test_postgres_index_features(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT indexname, indexdef FROM pg_indexes WHERE schemaname = current_schema()")
+            definitions = dict(cursor.fetchall())
+
+        checked = 0
+        for model in apps.get_models():
+            for index in model._meta.indexes:
+                if index.condition is None and not index.opclasses:
+                    continue
+                checked += 1
+                with self.subTest(index=index.name):
+                    self.assertIn(index.name, definitions)
+                    if index.condition is not None:
+                        self.assertIn(' WHERE ', definitions[index.name])
+                    for opclass in index.opclasses:
+                        self.assertIn(opclass, definitions[index.name])
+        self.assertTrue(checked)
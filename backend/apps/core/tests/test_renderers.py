@@ -0,0 +1,83 @@
+import io
+import json
+import uuid
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+import msgpack
+from django.test import SimpleTestCase, TestCase
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from apps.accounts.models import User
+from apps.core.dataset import generate_dataset
+from apps.core.parsers import MessagePackParser, ORJSONParser
+from apps.core.renderers import MessagePackRenderer, ORJSONRenderer
+
+PAYLOAD = {
+    'score': Decimal('8.25'),
+    'scores': [Decimal('10'), Decimal('0.10'), None],
+    'checked_in': datetime(2026, 10, 19, 7, 5, 3, 123456, tzinfo=dt_timezone.utc),
+    'naive': datetime(2026, 10, 19, 7, 5, 3),
+    'session_date': date(2026, 10, 19),
+    'start_time': time(7, 30),
+    'duration': timedelta(hours=1, minutes=30),
+    'id': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+    'label': gettext_lazy('Vắng mặt'),
+    'nested': [{'name': 'Nguyễn Văn An', 'active': True, 'rate': 87.5, 'count': 3}],
+}
+
+
+def stock_json(data):
+    """What DRF's own JSONRenderer would have sent, parsed"""
+    return json.loads(JSONRenderer().render(data))
+
+
+class RendererTests(SimpleTestCase):
+    """The orjson and MessagePack renderers encode like DRF's JSONRenderer"""
+
+    def test_orjson_matches_the_stock_renderer(self):
+        rendered = ORJSONRenderer().render(PAYLOAD)
+        self.assertEqual(json.loads(rendered), stock_json(PAYLOAD))
+        # Datetimes go through DRF's encoder: microseconds and a 'Z' suffix for UTC
+        self.assertIn(b'"2026-10-19T07:05:03.123456Z"', rendered)
+
+    def test_msgpack_matches_the_stock_renderer(self):
+        rendered = MessagePackRenderer().render(PAYLOAD)
+        self.assertEqual(msgpack.unpackb(rendered, raw=False), stock_json(PAYLOAD))
+
+    def test_parsers_round_trip(self):
+        expected = stock_json(PAYLOAD)
+        self.assertEqual(ORJSONParser().parse(io.BytesIO(ORJSONRenderer().render(PAYLOAD))), expected)
+        self.assertEqual(MessagePackParser().parse(io.BytesIO(MessagePackRenderer().render(PAYLOAD))), expected)
+
+    def test_indent_and_empty_bodies(self):
+        indented = ORJSONRenderer().render({'a': 1}, 'application/json; indent=4')
+        self.assertIn(b'\n', indented)
+        self.assertEqual(ORJSONRenderer().render(None), b'')
+        self.assertEqual(MessagePackRenderer().render(None), b'')
+
+
+class NegotiationTests(TestCase):
+    """An API response decodes to the same data in every format"""
+
+    @classmethod
+    def setUpTestData(cls):
+        generate_dataset(students=10, teachers=2, classes=2, class_size=5, subjects=2, sessions_per_class=1)
+        cls.admin = User.objects.create_user(
+            email='admin@test.edu.vn', username='admin', password='Admin@12345', role='admin'
+        )
+
+    def test_json_and_msgpack_responses_agree(self):
+        client = APIClient(HTTP_HOST='localhost')
+        client.force_authenticate(self.admin)
+        for url in ('/api/grades/', '/api/attendance/sessions/'):
+            with self.subTest(url=url):
+                as_json = client.get(url, HTTP_ACCEPT='application/json')
+                as_msgpack = client.get(url, HTTP_ACCEPT='application/msgpack')
+                self.assertEqual(as_msgpack['Content-Type'], 'application/msgpack')
+                data = json.loads(as_json.content)
+                self.assertTrue(data['results'])
+                self.assertEqual(msgpack.unpackb(as_msgpack.content, raw=False), data)
+                self.assertEqual(data, stock_json(as_json.data))
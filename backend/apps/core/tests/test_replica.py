@@ -0,0 +1,92 @@
+from datetime import date
+
+from django.core.cache import cache
+from django.db import connections
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from apps.accounts.models import User
+from apps.core.db.routers import REPLICA_ALIAS
+from apps.students.models import Student
+
+
+@override_settings(DATABASE_ROUTERS=['apps.core.db.routers.ReplicaRouter'], DB_REPLICA_STICKY_SECONDS=60)
+class ReplicaRoutingTests(TransactionTestCase):
+    """
+    @read_only views read from the replica, writes go to the primary and
+    users who just wrote keep reading from the primary.
+
+    The replica is a second connection to the test database, added here
+    rather than in settings so the rest of the suite runs without a router.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Added after the test case blocked unlisted aliases. connections.settings
+        # is settings.DATABASES, which @read_only and the middleware check.
+        connections.settings[REPLICA_ALIAS] = {
+            **connections['default'].settings_dict, 'TEST': {'MIRROR': 'default'}
+        }
+
+    @classmethod
+    def tearDownClass(cls):
+        connections[REPLICA_ALIAS].close()
+        del connections[REPLICA_ALIAS]
+        del connections.settings[REPLICA_ALIAS]
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user(
+            email='admin@test.edu.vn', username='admin', password='Admin@12345', role='admin'
+        )
+        Student.objects.create(
+            student_id='SV001', first_name='Lý', last_name='Gia Bảo', email='sv1@test.edu.vn',
+            gender='male', date_of_birth=date(2003, 1, 1),
+        )
+        self.client = APIClient(HTTP_HOST='localhost')
+        self.client.force_authenticate(self.admin)
+
+    def request(self, method, url, data=None):
+        """Response and the number of queries run on (primary, replica)"""
+        with CaptureQueriesContext(connections['default']) as primary, \
+                CaptureQueriesContext(connections[REPLICA_ALIAS]) as replica:
+            response = getattr(self.client, method)(url, data, format='json')
+        return response, len(primary), len(replica)
+
+    def test_read_only_views_read_from_the_replica(self):
+        response, primary, replica = self.request('get', '/api/students/statistics/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['total_students'], 1)
+        self.assertEqual(primary, 0)
+        self.assertGreater(replica, 0)
+
+        # Views without @read_only stay on the primary
+        response, primary, replica = self.request('get', '/api/students/')
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(primary, 0)
+        self.assertEqual(replica, 0)
+
+    def test_reads_stick_to_the_primary_after_a_write(self):
+        response, primary, replica = self.request('post', '/api/students/', {
+            'student_id': 'SV002', 'first_name': 'Lý', 'last_name': 'Thu Hà', 'email': 'sv2@test.edu.vn',
+            'gender': 'female', 'date_of_birth': '2003-02-02',
+        })
+        self.assertEqual(response.status_code, 201)
+        self.assertGreater(primary, 0)
+        self.assertEqual(replica, 0)
+
+        response, primary, replica = self.request('get', '/api/students/statistics/')
+        self.assertEqual(response.data['total_students'], 2)
+        self.assertGreater(primary, 0)
+        self.assertEqual(replica, 0)
+
+        # Other users are not pinned
+        self.client.force_authenticate(User.objects.create_user(
+            email='gv@test.edu.vn', username='gv', password='Teacher@12345', role='admin'
+        ))
+        response, primary, replica = self.request('get', '/api/students/statistics/')
+        self.assertEqual(primary, 0)
+        self.assertGreater(replica, 0)
@@ -0,0 +1,110 @@
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from apps.accounts.models import User
+from apps.core.dataset import generate_dataset
+from apps.core.serializers import parse_field_paths, rendered_relations
+from apps.grades.models import Grade
+
+RELATIONS = ['student', 'subject', 'created_by', 'class_obj', 'class_obj__teacher']
+
+
+def rendered(query):
+    return rendered_relations(Request(APIRequestFactory().get('/', query)), RELATIONS)
+
+
+class FieldPathTests(SimpleTestCase):
+    def test_parse_field_paths(self):
+        self.assertIsNone(parse_field_paths(None))
+        self.assertEqual(parse_field_paths(''), {})
+        self.assertEqual(
+            parse_field_paths('id, student.student_id,student.email,class_obj.teacher.id'),
+            {'id': {}, 'student': {'student_id': {}, 'email': {}}, 'class_obj': {'teacher': {'id': {}}}},
+        )
+
+    def test_rendered_relations(self):
+        self.assertEqual(rendered({}), RELATIONS)
+        # An empty ?fields= means every field
+        self.assertEqual(rendered({'fields': ''}), RELATIONS)
+        self.assertEqual(rendered({'fields': 'id,score'}), [])
+        # A relation listed without subfields is rendered whole
+        self.assertEqual(rendered({'fields': 'id,class_obj'}), ['class_obj', 'class_obj__teacher'])
+        self.assertEqual(rendered({'fields': 'class_obj.class_id'}), ['class_obj'])
+        self.assertEqual(rendered({'expand': 'student,class_obj.teacher'}), ['student', 'class_obj', 'class_obj__teacher'])
+        self.assertEqual(rendered({'expand': 'class_obj'}), ['class_obj'])
+        self.assertEqual(rendered({'expand': ''}), [])
+        self.assertEqual(rendered({'fields': 'student.student_id', 'expand': 'subject'}), [])
+
+
+class DynamicFieldsTests(TestCase):
+    """?fields= and ?expand= on a list endpoint"""
+
+    @classmethod
+    def setUpTestData(cls):
+        generate_dataset(students=10, teachers=2, classes=2, class_size=5, subjects=2, sessions_per_class=1)
+        cls.admin = User.objects.create_user(
+            email='admin@test.edu.vn', username='admin', password='Admin@12345', role='admin'
+        )
+        cls.grade = Grade.objects.select_related('student', 'class_obj', 'subject').order_by('-created_at').first()
+
+    def setUp(self):
+        self.client = APIClient(HTTP_HOST='localhost')
+        self.client.force_authenticate(self.admin)
+
+    def first(self, query=''):
+        response = self.client.get(f'/api/grades/?page_size=5{query}')
+        self.assertEqual(response.status_code, 200)
+        return response.data['results'][0]
+
+    def test_full_representation_by_default(self):
+        grade = self.first()
+        self.assertEqual(grade['student']['student_id'], self.grade.student.student_id)
+        self.assertEqual(grade['class_obj']['teacher']['id'], self.grade.class_obj.teacher_id)
+
+    def test_dotted_fields(self):
+        grade = self.first('&fields=id,score,student.student_id,class_obj.teacher.email')
+        self.assertEqual(set(grade), {'id', 'score', 'student', 'class_obj'})
+        self.assertEqual(grade['student'], {'student_id': self.grade.student.student_id})
+        self.assertEqual(grade['class_obj'], {'teacher': {'email': self.grade.class_obj.teacher.email}})
+
+    def test_unexpanded_relations_collapse_to_their_pk(self):
+        grade = self.first('&expand=student,class_obj')
+        self.assertEqual(grade['student']['student_id'], self.grade.student.student_id)
+        self.assertEqual(grade['subject'], self.grade.subject_id)
+        self.assertEqual(grade['created_by'], self.grade.created_by_id)
+        self.assertEqual(grade['class_obj']['teacher'], self.grade.class_obj.teacher_id)
+
+    def test_empty_expand_collapses_every_relation(self):
+        grade = self.first('&expand=')
+        self.assertEqual(
+            {name: grade[name] for name in ('student', 'class_obj', 'subject', 'created_by')},
+            {
+                'student': self.grade.student_id, 'class_obj': self.grade.class_obj_id,
+                'subject': self.grade.subject_id, 'created_by': self.grade.created_by_id,
+            },
+        )
+
+    def test_only_rendered_relations_are_loaded(self):
+        def queries(query):
+            with CaptureQueriesContext(connection) as captured:
+                self.first(query)
+            grades = [item['sql'] for item in captured.captured_queries if 'FROM "grades"' in item['sql']]
+            return len(captured.captured_queries), grades[-1]
+
+        # ETag validator, count, page, classes prefetch
+        count, sql = queries('')
+        self.assertEqual(count, 4)
+        self.assertIn('"students"', sql)
+
+        count, sql = queries('&expand=')
+        self.assertEqual(count, 3)
+        for table in ('"students"', '"subjects"', '"users"'):
+            self.assertNotIn(table, sql)
+
+        count, sql = queries('&fields=id,student.student_id')
+        self.assertEqual(count, 3)
+        self.assertIn('"students"', sql)
+        self.assertNotIn('"subjects"', sql)
@@ -0,0 +1,7 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('database/', views.database_status, name='database_status'),
+    path('metrics/', views.prometheus_metrics, name='prometheus_metrics'),
+]
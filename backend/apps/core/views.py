@@ -0,0 +1,67 @@
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.db import connections
+from django.http import HttpResponse
+from django.utils.crypto import constant_time_compare
+from rest_framework import status, permissions
+from rest_framework.authentication import BaseAuthentication
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
+from rest_framework.response import Response
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from .db.pool import pool_stats
+from .metrics import render_metrics
+
+METRICS_SCRAPER = 'metrics-token'
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def database_status(request):
+    """Connection persistence and pool metrics for this worker process"""
+    if request.user.role != 'admin':
+        return Response(
+            {'error': 'Bạn không có quyền xem thông tin hệ thống'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+    
+    databases = []
+    for alias in connections:
+        settings_dict = connections[alias].settings_dict
+        databases.append({
+            'alias': alias,
+            'engine': settings_dict['ENGINE'],
+            'conn_max_age': settings_dict['CONN_MAX_AGE'],
+            'conn_health_checks': settings_dict['CONN_HEALTH_CHECKS'],
+            'pooled': 'POOL' in settings_dict and settings_dict['ENGINE'].endswith('postgresql_pool'),
+        })
+    
+    return Response({
+        'databases': databases,
+        'pools': pool_stats()
+    })
+
+
+class MetricsTokenAuthentication(BaseAuthentication):
+    """'Authorization: Bearer <METRICS_TOKEN>' for the Prometheus scraper"""
+    
+    def authenticate(self, request):
+        token = settings.METRICS_TOKEN
+        if token and constant_time_compare(request.META.get('HTTP_AUTHORIZATION', ''), f'Bearer {token}'):
+            return AnonymousUser(), METRICS_SCRAPER
+        return None
+
+
+@api_view(['GET'])
+@authentication_classes([MetricsTokenAuthentication, JWTAuthentication])
+@permission_classes([permissions.AllowAny])
+def prometheus_metrics(request):
+    """Prometheus text exposition for admins and the scraper token"""
+    if request.auth != METRICS_SCRAPER and getattr(request.user, 'role', None) != 'admin':
+        return Response(
+            {'error': 'Bạn không có quyền xem thông tin hệ thống'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+    
+    body, content_type = render_metrics()
+    return HttpResponse(body, content_type=content_type)
+
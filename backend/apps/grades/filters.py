@@ -0,0 +1,20 @@
+import django_filters
+
+from .models import Grade
+
+
+class GradeFilter(django_filters.FilterSet):
+    """
+    Filters backed by the foreign key and created_at indexes:
+    ?student_id=, ?class_id=, ?subject_id=, ?teacher_id=, ?grade_type=,
+    ?created_at_after=/?created_at_before= (YYYY-MM-DD).
+    """
+    student_id = django_filters.NumberFilter(field_name='student_id')
+    class_id = django_filters.NumberFilter(field_name='class_obj_id')
+    subject_id = django_filters.NumberFilter(field_name='subject_id')
+    teacher_id = django_filters.NumberFilter(field_name='class_obj__teacher_id')
+    created_at = django_filters.DateFromToRangeFilter()
+
+    class Meta:
+        model = Grade
+        fields = ['student_id', 'class_id', 'subject_id', 'teacher_id', 'grade_type', 'created_at']
@@ -0,0 +1,139 @@
+# Gradebook: the student x grade-type matrix of one class and subject
+from django.db import transaction
+
+from apps.classes.models import ClassStudent
+from apps.core.bulk_import import UPSERT, write_rows
+from .ingest import MAX_SCORE, UNIQUE_FIELDS, UPDATE_FIELDS
+from .models import Grade
+
+
+def _roster(class_obj):
+    """(student pk, student code, full name) of the active enrollments"""
+    return [
+        (pk, code, f'{first_name} {last_name}')
+        for pk, code, first_name, last_name in ClassStudent.objects.filter(
+            class_obj=class_obj, is_active=True
+        ).values_list(
+            'student_id', 'student__student_id', 'student__first_name', 'student__last_name'
+        ).order_by('student__student_id')
+    ]
+
+
+def _grades(class_obj, subject):
+    """Stored grades of the class and subject keyed by (student pk, grade type)"""
+    return {
+        (grade.student_id, grade.grade_type): grade
+        for grade in Grade.objects.filter(class_obj=class_obj, subject=subject).only(
+            'id', 'student_id', 'grade_type', 'score', 'max_score', 'comment'
+        )
+    }
+
+
+def _matrix(class_obj, subject, roster, grades):
+    """Gradebook payload with per-student and class averages, built in memory"""
+    by_student = {}
+    for (student_pk, grade_type), grade in grades.items():
+        by_student.setdefault(student_pk, {})[grade_type] = float(grade.score)
+
+    rows = []
+    scores = []
+    for pk, code, full_name in roster:
+        cells = by_student.get(pk, {})
+        scores.extend(cells.values())
+        rows.append({
+            'student_id': code,
+            'full_name': full_name,
+            'scores': cells,
+            'average_score': round(sum(cells.values()) / len(cells), 2) if cells else None,
+        })
+    return {
+        'class_id': class_obj.pk,
+        'class_code': class_obj.class_id,
+        'subject_id': subject.pk,
+        'subject_code': subject.subject_id,
+        'grade_types': [code for code, _ in Grade.GRADE_TYPE_CHOICES],
+        'students': rows,
+        'summary': {
+            'total_students': len(roster),
+            'graded_cells': len(scores),
+            'average_score': round(sum(scores) / len(scores), 2) if scores else 0,
+        },
+    }
+
+
+def load_gradebook(class_obj, subject):
+    """The gradebook of a class and subject, in two queries"""
+    return _matrix(class_obj, subject, _roster(class_obj), _grades(class_obj, subject))
+
+
+def save_gradebook(class_obj, subject, cells, user):
+    """
+    Apply (student code, grade type, score, comment) cells to the gradebook.
+
+    The roster and the stored grades are read once and diffed in memory;
+    only cells whose score or comment changed are written, with one upsert
+    per batch, and cleared cells are removed with a single DELETE. Nothing
+    is written when any cell is invalid.
+    """
+    roster = _roster(class_obj)
+    grades = _grades(class_obj, subject)
+    students = {code: pk for pk, code, _ in roster}
+
+    errors = []
+    changed = []
+    removed = []
+    unchanged = 0
+    for code, grade_type, score, comment in cells:
+        student_pk = students.get(code)
+        if student_pk is None:
+            errors.append({'student_id': code, 'grade_type': grade_type, 'error': f'Sinh viên {code} không thuộc lớp này'})
+            continue
+        current = grades.get((student_pk, grade_type))
+        if score is None:
+            if current is not None:
+                removed.append(current)
+            continue
+        max_score = current.max_score if current is not None else MAX_SCORE
+        if score > max_score:
+            errors.append({'student_id': code, 'grade_type': grade_type, 'error': f'Điểm phải trong khoảng 0 - {max_score}'})
+            continue
+        if comment is None and current is not None:
+            comment = current.comment
+        if current is not None and current.score == score and current.comment == comment:
+            unchanged += 1
+            continue
+        changed.append(Grade(
+            student_id=student_pk,
+            class_obj_id=class_obj.pk,
+            subject_id=subject.pk,
+            grade_type=grade_type,
+            score=score,
+            max_score=max_score,
+            comment=comment,
+            created_by=user,
+        ))
+
+    if errors:
+        return {'errors': errors}
+
+    with transaction.atomic():
+        if removed:
+            Grade.objects.filter(pk__in=[grade.pk for grade in removed]).delete()
+        write_rows(Grade, changed, UPSERT, UNIQUE_FIELDS, UPDATE_FIELDS)
+
+    # Reflect the writes in the in-memory copy instead of reading the gradebook again
+    for grade in removed:
+        del grades[(grade.student_id, grade.grade_type)]
+    created = 0
+    for grade in changed:
+        created += (grade.student_id, grade.grade_type) not in grades
+        grades[(grade.student_id, grade.grade_type)] = grade
+
+    return {
+        'errors': [],
+        'created': created,
+        'updated': len(changed) - created,
+        'deleted': len(removed),
+        'unchanged': unchanged,
+        'gradebook': _matrix(class_obj, subject, roster, grades),
+    }
@@ -0,0 +1,179 @@
+# Grade import pipeline: resolve a chunk of rows in bulk, validate in memory, write in batches
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from django.db.models import Q
+
+from apps.classes.models import Class
+from apps.core.bulk_import import INSERT, UPSERT, existing_keys, row_key, split_existing, write_rows
+from apps.students.models import Student
+from .models import Grade, Subject
+
+COLUMN_ALIASES = {
+    'student_id': ['student_id', 'mssv', 'ma_sinh_vien', 'id'],
+    'class_id': ['class_id', 'lop', 'ma_lop', 'class'],
+    'subject': ['subject', 'subject_id', 'mon_hoc', 'ma_mon', 'course'],
+    'score': ['score', 'diem', 'grade', 'mark'],
+    'grade_type': ['grade_type', 'exam_type', 'loai_diem', 'loai_kiem_tra', 'type'],
+    'max_score': ['max_score', 'diem_toi_da'],
+    'comment': ['comment', 'ghi_chu', 'note', 'notes'],
+}
+
+# Codes and their Vietnamese labels ('Giữa kỳ', 'Cuối kỳ', ...) are both accepted
+GRADE_TYPES = {
+    **{code: code for code, _ in Grade.GRADE_TYPE_CHOICES},
+    **{label.lower(): code for code, label in Grade.GRADE_TYPE_CHOICES},
+}
+DEFAULT_GRADE_TYPE = 'midterm'
+MAX_SCORE = Decimal('10')
+
+# Natural key (Grade.Meta.unique_together) and what an upsert overwrites
+KEY_FIELDS = ['student_id', 'class_obj_id', 'subject_id', 'grade_type']
+UNIQUE_FIELDS = ['student', 'class_obj', 'subject', 'grade_type']
+UPDATE_FIELDS = ['score', 'max_score', 'comment', 'updated_at']
+
+CHUNK_SIZE = 2000
+
+
+def _decimal(value):
+    # Vietnamese spreadsheets often use a decimal comma
+    return Decimal(value.replace(',', '.')).quantize(Decimal('0.01'))
+
+
+def _resolve(rows):
+    """Students, classes and subjects referenced by a chunk, in three queries"""
+    student_codes = {row['student_id'] for _, row in rows if row['student_id']}
+    class_values = {row['class_id'] for _, row in rows if row['class_id']}
+    subject_values = {row['subject'] for _, row in rows if row['subject']}
+
+    students = dict(
+        Student.objects.filter(student_id__in=student_codes).values_list('student_id', 'pk')
+    )
+
+    # The class column may hold the class code or its numeric id
+    class_pks = {int(value) for value in class_values if value.isdigit()}
+    classes = {}
+    for pk, code, teacher_id in Class.objects.filter(
+        Q(class_id__in=class_values) | Q(pk__in=class_pks)
+    ).values_list('pk', 'class_id', 'teacher_id'):
+        classes.setdefault(str(pk), (pk, teacher_id))
+        classes[code] = (pk, teacher_id)
+
+    # Subject codes win over names; a name shared by several subjects is ambiguous
+    subjects = {}
+    by_name = {}
+    for pk, code, name in Subject.objects.filter(
+        Q(subject_id__in=subject_values) | Q(subject_name__in=subject_values)
+    ).values_list('pk', 'subject_id', 'subject_name'):
+        subjects[code] = pk
+        by_name.setdefault(name, []).append(pk)
+    for name, pks in by_name.items():
+        if name not in subjects:
+            subjects[name] = pks[0] if len(pks) == 1 else None
+
+    return students, classes, subjects
+
+
+def _validate(row, students, classes, subjects, user):
+    """Build an unsaved Grade from a normalized row, or return an error message"""
+    if not row['student_id'] or not row['class_id'] or not row['subject'] or not row['score']:
+        return None, 'Thiếu thông tin bắt buộc: mã sinh viên, lớp, môn học và điểm'
+
+    student_pk = students.get(row['student_id'])
+    if student_pk is None:
+        return None, f'Không tìm thấy sinh viên {row["student_id"]}'
+
+    class_info = classes.get(row['class_id'])
+    if class_info is None:
+        return None, f'Không tìm thấy lớp {row["class_id"]}'
+    class_pk, teacher_id = class_info
+    if user.role != 'admin' and teacher_id != user.pk:
+        return None, f'Bạn không có quyền nhập điểm cho lớp {row["class_id"]}'
+
+    if row['subject'] not in subjects:
+        return None, f'Không tìm thấy môn học {row["subject"]}'
+    subject_pk = subjects[row['subject']]
+    if subject_pk is None:
+        return None, f'Có nhiều môn học tên "{row["subject"]}", hãy dùng mã môn học'
+
+    grade_type = GRADE_TYPES.get((row['grade_type'] or DEFAULT_GRADE_TYPE).lower())
+    if grade_type is None:
+        return None, f'Loại điểm không hợp lệ: {row["grade_type"]}'
+
+    try:
+        score = _decimal(row['score'])
+        max_score = _decimal(row['max_score']) if row['max_score'] else MAX_SCORE
+    except InvalidOperation:
+        return None, f'Điểm không hợp lệ: {row["score"]}'
+    if not Decimal('0') < max_score <= MAX_SCORE:
+        return None, f'Điểm tối đa phải trong khoảng 0 - {MAX_SCORE}'
+    if not Decimal('0') <= score <= max_score:
+        return None, f'Điểm phải trong khoảng 0 - {max_score}'
+
+    return Grade(
+        student_id=student_pk,
+        class_obj_id=class_pk,
+        subject_id=subject_pk,
+        grade_type=grade_type,
+        score=score,
+        max_score=max_score,
+        comment=row['comment'] or None,
+        created_by=user,
+    ), None
+
+
+def ingest_grades(rows, user, mode=INSERT, dry_run=False, chunk_size=CHUNK_SIZE):
+    """
+    Import grade rows given as (row number, dict) pairs.
+
+    Each chunk costs three lookup queries (students, classes, subjects) plus
+    one query for grades that already exist; rows are then validated in
+    memory and written with bulk_create, all in one transaction. Grades
+    that already exist are reported as errors (insert), overwritten
+    (upsert) or left alone (skip-existing). Rows that fail are reported
+    and do not stop the import.
+    """
+    errors = []
+    created = []
+    updated = []
+    skipped = []
+    seen = set()
+
+    with transaction.atomic():
+        for start in range(0, len(rows), chunk_size):
+            chunk = [
+                (number, {field: (raw.get(field) or '').strip() for field in COLUMN_ALIASES})
+                for number, raw in rows[start:start + chunk_size]
+            ]
+            students, classes, subjects = _resolve(chunk)
+
+            candidates = []
+            row_numbers = {}
+            for number, row in chunk:
+                grade, error = _validate(row, students, classes, subjects, user)
+                if not error and row_key(grade, KEY_FIELDS) in seen:
+                    error = 'Điểm bị trùng trong tệp'
+                if error:
+                    errors.append({'row': number, 'error': error, 'data': row})
+                    continue
+                seen.add(row_key(grade, KEY_FIELDS))
+                candidates.append(grade)
+                row_numbers[id(grade)] = (number, row)
+
+            existing = existing_keys(Grade, KEY_FIELDS, candidates)
+            to_write, found = split_existing(candidates, existing, KEY_FIELDS, mode)
+            if mode == INSERT:
+                for grade in found:
+                    number, row = row_numbers[id(grade)]
+                    errors.append({'row': number, 'error': 'Điểm này đã tồn tại', 'data': row})
+            elif mode == UPSERT:
+                updated.extend(found)
+            else:
+                skipped.extend(found)
+
+            if not dry_run:
+                write_rows(Grade, to_write, mode, UNIQUE_FIELDS, UPDATE_FIELDS)
+            created.extend(grade for grade in to_write if row_key(grade, KEY_FIELDS) not in existing)
+
+    errors.sort(key=lambda error: error['row'])
+    return {'created': created, 'updated': updated, 'skipped': skipped, 'errors': errors}
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-19 17:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('grades', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='grade',
+            index=models.Index(fields=['class_obj', 'subject'], name='grades_class_o_6b0d92_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='grade',
+            index=models.Index(fields=['student', '-created_at'], name='grades_student_911693_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='grade',
+            index=models.Index(fields=['-created_at'], name='grades_created_5042e1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='grade',
+            index=models.Index(fields=['updated_at'], name='grades_updated_a2c8e4_idx'),
+        ),
+    ]
@@ -61,6 +61,12 @@ class Grade(models.Model):
         verbose_name_plural = 'Điểm số'
         unique_together = ['student', 'class_obj', 'subject', 'grade_type']
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['class_obj', 'subject']),
+            models.Index(fields=['student', '-created_at']),
+            models.Index(fields=['-created_at']),
+            models.Index(fields=['updated_at']),
+        ]
     
     def __str__(self):
         return f"{self.student.student_id} - {self.subject.subject_name} - {self.get_grade_type_display()}: {self.score}"
@@ -2,10 +2,11 @@ from rest_framework import serializers
 from apps.accounts.serializers import UserSerializer
 from apps.students.serializers import StudentSerializer
 from apps.classes.serializers import ClassSerializer
+from apps.core.serializers import DynamicFieldsMixin
 from .models import Subject, Grade, GradeSummary
 
 
-class SubjectSerializer(serializers.ModelSerializer):
+class SubjectSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer for Subject model"""
     
     class Meta:
@@ -30,7 +31,7 @@ class SubjectCreateSerializer(serializers.ModelSerializer):
         return value
 
 
-class GradeSerializer(serializers.ModelSerializer):
+class GradeSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer for Grade model"""
     student = StudentSerializer(read_only=True)
     class_obj = ClassSerializer(read_only=True)
@@ -85,7 +86,7 @@ class GradeCreateSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
-class GradeSummarySerializer(serializers.ModelSerializer):
+class GradeSummarySerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer for GradeSummary model"""
     student = StudentSerializer(read_only=True)
     class_obj = ClassSerializer(read_only=True)
@@ -103,10 +104,16 @@ class GradeSummarySerializer(serializers.ModelSerializer):
 
 
 class GradeBulkCreateSerializer(serializers.Serializer):
-    """Serializer for bulk creating grades"""
+    """
+    Serializer for bulk saving grades (the gradebook of a class and subject).
+
+    Each item of grades is either {student_id, score[, comment]} for the
+    request's grade_type, or a matrix row {student_id, scores: {grade_type:
+    score}}. A null score clears the cell.
+    """
     class_id = serializers.IntegerField()
     subject_id = serializers.IntegerField()
-    grade_type = serializers.CharField()
+    grade_type = serializers.ChoiceField(choices=Grade.GRADE_TYPE_CHOICES, required=False)
     grades = serializers.ListField(
         child=serializers.DictField()
     )
@@ -116,6 +123,46 @@ class GradeBulkCreateSerializer(serializers.Serializer):
         for grade_data in value:
             if 'student_id' not in grade_data:
                 raise serializers.ValidationError("Thiếu student_id trong dữ liệu điểm")
-            if 'score' not in grade_data:
+            if 'score' not in grade_data and 'scores' not in grade_data:
                 raise serializers.ValidationError("Thiếu score trong dữ liệu điểm")
+            if 'scores' in grade_data and not isinstance(grade_data['scores'], dict):
+                raise serializers.ValidationError("scores phải là một đối tượng {loại điểm: điểm}")
         return value
+    
+    def validate(self, attrs):
+        """Flatten the rows into (student_id, grade_type, score, comment) cells"""
+        grade_types = dict(Grade.GRADE_TYPE_CHOICES)
+        score_field = serializers.DecimalField(
+            max_digits=5, decimal_places=2, min_value=0, max_value=10, allow_null=True
+        )
+        cells = {}
+        errors = []
+        for grade_data in attrs['grades']:
+            student_id = str(grade_data['student_id']).strip()
+            if 'scores' in grade_data:
+                items = [(grade_type, score, None) for grade_type, score in grade_data['scores'].items()]
+            elif attrs.get('grade_type'):
+                items = [(attrs['grade_type'], grade_data['score'], grade_data.get('comment'))]
+            else:
+                errors.append(f'{student_id}: thiếu loại điểm (grade_type)')
+                continue
+            for grade_type, score, comment in items:
+                if grade_type not in grade_types:
+                    errors.append(f'{student_id}: loại điểm không hợp lệ "{grade_type}"')
+                    continue
+                try:
+                    score = score_field.run_validation(score)
+                except serializers.ValidationError as e:
+                    errors.append(f'{student_id} - {grade_type}: {e.detail[0]}')
+                    continue
+                if (student_id, grade_type) in cells:
+                    errors.append(f'{student_id} - {grade_type}: ô điểm bị trùng')
+                    continue
+                cells[(student_id, grade_type)] = (score, comment)
+        if errors:
+            raise serializers.ValidationError({'grades': errors})
+        attrs['cells'] = [
+            (student_id, grade_type, score, comment)
+            for (student_id, grade_type), (score, comment) in cells.items()
+        ]
+        return attrs
@@ -0,0 +1,98 @@
+from datetime import date
+from decimal import Decimal
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.accounts.models import User
+from apps.classes.models import Class, ClassStudent
+from apps.grades.models import Grade, Subject
+from apps.students.models import Student
+
+
+class GradebookTests(TestCase):
+    """Saving the gradebook writes only changed cells, and nothing when a cell is invalid"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.teacher = User.objects.create_user(
+            email='gv@test.edu.vn', username='gv', password='Teacher@12345', role='teacher'
+        )
+        cls.class_obj = Class.objects.create(class_id='LOP01', class_name='Toán rời rạc', teacher=cls.teacher)
+        cls.subject = Subject.objects.create(subject_id='MH01', subject_name='Toán rời rạc', credits=3)
+        students = Student.objects.bulk_create([
+            Student(
+                student_id=f'SV{index:03d}', first_name='Phạm', last_name=f'Minh {index}',
+                email=f'sv{index}@test.edu.vn', gender='male', date_of_birth=date(2003, 1, 1),
+            )
+            for index in range(3)
+        ])
+        ClassStudent.objects.bulk_create([ClassStudent(class_obj=cls.class_obj, student=student) for student in students])
+        grade = dict(class_obj=cls.class_obj, subject=cls.subject, created_by=cls.teacher)
+        Grade.objects.create(student=students[0], grade_type='midterm', score=Decimal('6'), comment='Cần cố gắng', **grade)
+        Grade.objects.create(student=students[0], grade_type='final', score=Decimal('7'), **grade)
+        Grade.objects.create(
+            student=students[1], grade_type='quiz', score=Decimal('4'), max_score=Decimal('5'), **grade
+        )
+
+    def setUp(self):
+        self.client = APIClient(HTTP_HOST='localhost')
+        self.client.force_authenticate(self.teacher)
+
+    def save(self, grades, **extra):
+        return self.client.put('/api/grades/gradebook/', {
+            'class_id': self.class_obj.pk, 'subject_id': self.subject.pk, 'grades': grades, **extra,
+        }, format='json')
+
+    def cells(self):
+        return {
+            (student, grade_type): (str(score), comment)
+            for student, grade_type, score, comment in Grade.objects.values_list(
+                'student__student_id', 'grade_type', 'score', 'comment'
+            )
+        }
+
+    def test_counts_and_cleared_cells(self):
+        response = self.save([
+            # updated, unchanged, cleared
+            {'student_id': 'SV000', 'scores': {'midterm': 8, 'final': 7, 'quiz': None}},
+            # created; clearing an empty cell is a no-op
+            {'student_id': 'SV002', 'scores': {'midterm': 9.5, 'final': None}},
+            {'student_id': 'SV001', 'scores': {'quiz': None}},
+        ])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            (response.data['created_count'], response.data['updated_count'],
+             response.data['deleted_count'], response.data['unchanged_count']),
+            (1, 1, 1, 1),
+        )
+        self.assertEqual(self.cells(), {
+            ('SV000', 'midterm'): ('8.00', 'Cần cố gắng'),
+            ('SV000', 'final'): ('7.00', None),
+            ('SV002', 'midterm'): ('9.50', None),
+        })
+        rows = {row['student_id']: row for row in response.data['gradebook']['students']}
+        self.assertEqual(rows['SV000']['scores'], {'midterm': 8.0, 'final': 7.0})
+        self.assertEqual(rows['SV001']['scores'], {})
+        self.assertEqual(response.data['gradebook']['summary']['graded_cells'], 3)
+
+    def test_comment_is_kept_unless_given(self):
+        self.save([{'student_id': 'SV000', 'score': 6.5}], grade_type='midterm')
+        self.assertEqual(self.cells()[('SV000', 'midterm')], ('6.50', 'Cần cố gắng'))
+
+        self.save([{'student_id': 'SV000', 'score': 6.5, 'comment': 'Tiến bộ'}], grade_type='midterm')
+        self.assertEqual(self.cells()[('SV000', 'midterm')], ('6.50', 'Tiến bộ'))
+
+    def test_an_invalid_cell_saves_nothing(self):
+        before = self.cells()
+        for grades in (
+            [{'student_id': 'SV002', 'scores': {'final': 8}}, {'student_id': 'SV999', 'scores': {'final': 8}}],
+            # Above the max_score of the stored cell
+            [{'student_id': 'SV002', 'scores': {'final': 8}}, {'student_id': 'SV001', 'scores': {'quiz': 6}}],
+            [{'student_id': 'SV002', 'scores': {'final': 11}}],
+            [{'student_id': 'SV002', 'scores': {'exam': 8}}],
+        ):
+            with self.subTest(grades=grades):
+                response = self.save(grades)
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(self.cells(), before)
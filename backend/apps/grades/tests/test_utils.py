@@ -0,0 +1,20 @@
+from decimal import Decimal
+from types import SimpleNamespace
+
+from django.test import SimpleTestCase
+
+from apps.grades.utils import calculate_gpa, score_to_gpa_points
+
+
+class GpaTests(SimpleTestCase):
+    def grade(self, score, credits):
+        return SimpleNamespace(score=Decimal(score), subject=SimpleNamespace(credits=credits))
+
+    def test_score_bands(self):
+        self.assertEqual(score_to_gpa_points(Decimal('9.0')), 4.0)
+        self.assertEqual(score_to_gpa_points(Decimal('8.4')), 3.3)
+        self.assertEqual(score_to_gpa_points(Decimal('4.4')), 0.0)
+
+    def test_gpa_is_weighted_by_credits(self):
+        self.assertEqual(calculate_gpa([self.grade('9.5', 3), self.grade('6.0', 1)]), 3.5)
+        self.assertEqual(calculate_gpa([]), 0.0)
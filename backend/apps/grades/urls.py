@@ -10,6 +10,8 @@ urlpatterns = [
     path('statistics/', views.grade_statistics, name='grade_statistics'),
     path('student/<str:student_id>/summary/', views.student_grade_summary, name='student_grade_summary'),
     path('class/<int:class_id>/summary/', views.class_grade_summary, name='class_grade_summary'),
+    path('gradebook/', views.gradebook, name='gradebook'),
+    path('subjects/autocomplete/', views.autocomplete_subjects, name='autocomplete_subjects'),
     
     # Import/Export
     path('import-excel/', views.import_excel, name='import_excel'),
@@ -0,0 +1,43 @@
+# GPA helpers shared by the grade summaries and the student profile
+
+
+def score_to_gpa_points(score):
+    """Convert score to GPA points"""
+    if score >= 9.0:
+        return 4.0
+    elif score >= 8.5:
+        return 3.7
+    elif score >= 8.0:
+        return 3.3
+    elif score >= 7.5:
+        return 3.0
+    elif score >= 7.0:
+        return 2.7
+    elif score >= 6.5:
+        return 2.3
+    elif score >= 6.0:
+        return 2.0
+    elif score >= 5.5:
+        return 1.7
+    elif score >= 5.0:
+        return 1.3
+    elif score >= 4.5:
+        return 1.0
+    else:
+        return 0.0
+
+
+def calculate_gpa(grades):
+    """Credit-weighted GPA of grades (with their subjects loaded); 0.0 without grades"""
+    total_points = 0
+    total_credits = 0
+    
+    for grade in grades:
+        # Convert score to GPA points
+        gpa_points = score_to_gpa_points(grade.score)
+        credits = grade.subject.credits if hasattr(grade.subject, 'credits') else 3
+        
+        total_points += gpa_points * credits
+        total_credits += credits
+    
+    return round(total_points / total_credits, 2) if total_credits > 0 else 0.0
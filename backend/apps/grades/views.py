@@ -1,16 +1,37 @@
 from rest_framework import generics, status, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
-from django.db.models import Q, Avg, Count
+from django.db.models import Q, Avg, Count, Max, Min, Prefetch
 from django.http import HttpResponse, JsonResponse
-from .models import Grade
-from .serializers import GradeSerializer, GradeCreateSerializer
+from apps.classes.models import Class, ClassStudent
+from apps.core.autocomplete import PrefixIndex, parse_limit
+from apps.core.conditional import ConditionalGetMixin, conditional_get
+from apps.core.serializers import rendered_relations, select_rendered
+from apps.core.db.routers import read_only
+from apps.core.metrics import track_import
+from apps.core.bulk_import import parse_import_mode
+from apps.core.spreadsheets import read_sheet
+from apps.students.models import Student
+from .filters import GradeFilter
+from .gradebook import load_gradebook, save_gradebook
+from .ingest import COLUMN_ALIASES, ingest_grades
+from .models import Grade, Subject
+from .serializers import GradeSerializer, GradeCreateSerializer, GradeBulkCreateSerializer
+from .utils import calculate_gpa
 
+# Small table: subject pickers are served from memory
+SUBJECT_INDEX = PrefixIndex(
+    Subject.objects.filter(is_active=True), 'subject_id', 'subject_name', depends_on=['is_active']
+)
 
-class GradeListCreateView(generics.ListCreateAPIView):
+
+class GradeListCreateView(ConditionalGetMixin, generics.ListCreateAPIView):
     """List and create grades"""
     queryset = Grade.objects.all()
     permission_classes = [permissions.IsAuthenticated]
+    etag_relations = ('student', 'class_obj', 'class_obj__teacher', 'subject', 'created_by')
+    filterset_class = GradeFilter
+    ordering_fields = ['created_at', 'updated_at']
     
     def get_serializer_class(self):
         if self.request.method == 'POST':
@@ -18,27 +39,31 @@ class GradeListCreateView(generics.ListCreateAPIView):
         return GradeSerializer
     
     def get_queryset(self):
-        queryset = Grade.objects.all()
-        student_id = self.request.query_params.get('student_id', None)
-        class_id = self.request.query_params.get('class_id', None)
-        
-        if student_id is not None:
-            queryset = queryset.filter(student_id=student_id)
-        if class_id is not None:
-            queryset = queryset.filter(class_instance_id=class_id)
-            
+        # Only the relations rendered for ?fields= / ?expand= are joined
+        queryset = select_rendered(Grade.objects.all(), self.request, ['student', 'subject', 'created_by'])
+        if rendered_relations(self.request, ['class_obj']):
+            queryset = queryset.prefetch_related(Prefetch(
+                'class_obj', queryset=select_rendered(Class.objects.all(), self.request, ['teacher'], 'class_obj__')
+            ))
         return queryset.order_by('-created_at')
 
 
-class GradeDetailView(generics.RetrieveUpdateDestroyAPIView):
+class GradeDetailView(ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update or delete a grade"""
-    queryset = Grade.objects.all()
     serializer_class = GradeSerializer
     permission_classes = [permissions.IsAuthenticated]
+    etag_relations = ('student', 'class_obj', 'class_obj__teacher', 'subject', 'created_by')
+    
+    def get_queryset(self):
+        return select_rendered(
+            Grade.objects.all(), self.request, ['student', 'subject', 'created_by', 'class_obj', 'class_obj__teacher']
+        )
 
 
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
+@read_only
+@conditional_get(Grade, Subject, Student, Class)
 def grade_statistics(request):
     """Get comprehensive grade statistics"""
     try:
@@ -46,10 +71,13 @@ def grade_statistics(request):
         from datetime import date, timedelta
         
         # Basic statistics
-        total_grades = Grade.objects.count()
-        avg_score = Grade.objects.aggregate(avg_score=Avg('score'))['avg_score']
-        min_score = Grade.objects.aggregate(min_score=Min('score'))['min_score']
-        max_score = Grade.objects.aggregate(max_score=Max('score'))['max_score']
+        overall = Grade.objects.aggregate(
+            total=Count('id'), avg_score=Avg('score'), min_score=Min('score'), max_score=Max('score')
+        )
+        total_grades = overall['total']
+        avg_score = overall['avg_score']
+        min_score = overall['min_score']
+        max_score = overall['max_score']
         
         # Grade distribution by type
         grade_by_type = Grade.objects.values('grade_type').annotate(
@@ -58,15 +86,7 @@ def grade_statistics(request):
         ).order_by('-count')
         
         # Grade distribution by letter grade
-        letter_grades = ['A+', 'A', 'A-', 'B+', 'B', 'B-', 'C+', 'C', 'C-', 'D+', 'D', 'D-', 'F']
-        grade_distribution = {}
-        
-        for letter in letter_grades:
-            count = Grade.objects.filter(
-                score__gte=_get_min_score_for_letter(letter),
-                score__lt=_get_max_score_for_letter(letter)
-            ).count()
-            grade_distribution[letter] = count
+        grade_distribution = _grade_distribution(Grade.objects.all())
         
         # Recent activity
         thirty_days_ago = date.today() - timedelta(days=30)
@@ -102,6 +122,21 @@ def grade_statistics(request):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+LETTER_GRADES = ['A+', 'A', 'A-', 'B+', 'B', 'B-', 'C+', 'C', 'C-', 'D+', 'D', 'D-', 'F']
+
+
+def _grade_distribution(grades):
+    """Count grades per letter with a single aggregate query"""
+    counts = grades.aggregate(**{
+        f'letter_{index}': Count('id', filter=Q(
+            score__gte=_get_min_score_for_letter(letter),
+            score__lt=_get_max_score_for_letter(letter)
+        ))
+        for index, letter in enumerate(LETTER_GRADES)
+    })
+    return {letter: counts[f'letter_{index}'] for index, letter in enumerate(LETTER_GRADES)}
+
+
 def _get_min_score_for_letter(letter):
     """Get minimum score for letter grade"""
     grade_ranges = {
@@ -123,6 +158,8 @@ def _get_max_score_for_letter(letter):
 
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
+@read_only
+@conditional_get(Grade, Subject, Student, Class)
 def student_grade_summary(request, student_id):
     """Get comprehensive grade summary for a student"""
     try:
@@ -149,10 +186,10 @@ def student_grade_summary(request, student_id):
         ).order_by('-avg_score')
         
         # Recent grades
-        recent_grades = grades.order_by('-created_at')[:10]
+        recent_grades = grades.select_related('subject').order_by('-created_at')[:10]
         
         # GPA calculation (simplified)
-        gpa = _calculate_gpa(grades)
+        gpa = calculate_gpa(grades.select_related('subject'))
         
         return Response({
             'student_info': {
@@ -188,12 +225,14 @@ def student_grade_summary(request, student_id):
 
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
+@read_only
+@conditional_get(Grade, Subject, Student, Class, ClassStudent)
 def class_grade_summary(request, class_id):
     """Get grade summary for all students in a class"""
     try:
         from apps.classes.models import Class
         
-        class_obj = Class.objects.get(id=class_id)
+        class_obj = Class.objects.select_related('teacher').get(id=class_id)
         
         # Check permission
         if request.user.role != 'admin' and class_obj.teacher != request.user:
@@ -230,13 +269,7 @@ def class_grade_summary(request, class_id):
         ).order_by('-avg_score')
         
         # Grade distribution
-        grade_distribution = {}
-        for letter in ['A+', 'A', 'A-', 'B+', 'B', 'B-', 'C+', 'C', 'C-', 'D+', 'D', 'D-', 'F']:
-            count = grades.filter(
-                score__gte=_get_min_score_for_letter(letter),
-                score__lt=_get_max_score_for_letter(letter)
-            ).count()
-            grade_distribution[letter] = count
+        grade_distribution = _grade_distribution(grades)
         
         return Response({
             'class_info': {
@@ -260,53 +293,69 @@ def class_grade_summary(request, class_id):
         return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-def _calculate_gpa(grades):
-    """Calculate GPA based on grades"""
-    if not grades.exists():
-        return 0.0
-    
-    total_points = 0
-    total_credits = 0
-    
-    for grade in grades:
-        # Convert score to GPA points
-        gpa_points = _score_to_gpa_points(grade.score)
-        credits = grade.subject.credits if hasattr(grade.subject, 'credits') else 3
+@api_view(['GET', 'PUT'])
+@permission_classes([permissions.IsAuthenticated])
+@conditional_get(Grade, Student, ClassStudent)
+def gradebook(request):
+    """Get or save the student x grade-type gradebook of a class and subject"""
+    try:
+        if request.method == 'GET':
+            class_id = request.query_params.get('class_id')
+            subject_id = request.query_params.get('subject_id')
+            if not str(class_id).isdigit() or not str(subject_id).isdigit():
+                return Response(
+                    {'error': 'Cần class_id và subject_id'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        else:
+            serializer = GradeBulkCreateSerializer(data=request.data)
+            if not serializer.is_valid():
+                return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+            class_id = serializer.validated_data['class_id']
+            subject_id = serializer.validated_data['subject_id']
         
-        total_points += gpa_points * credits
-        total_credits += credits
-    
-    return round(total_points / total_credits, 2) if total_credits > 0 else 0.0
-
-
-def _score_to_gpa_points(score):
-    """Convert score to GPA points"""
-    if score >= 9.0:
-        return 4.0
-    elif score >= 8.5:
-        return 3.7
-    elif score >= 8.0:
-        return 3.3
-    elif score >= 7.5:
-        return 3.0
-    elif score >= 7.0:
-        return 2.7
-    elif score >= 6.5:
-        return 2.3
-    elif score >= 6.0:
-        return 2.0
-    elif score >= 5.5:
-        return 1.7
-    elif score >= 5.0:
-        return 1.3
-    elif score >= 4.5:
-        return 1.0
-    else:
-        return 0.0
+        class_obj = Class.objects.get(id=class_id)
+        subject = Subject.objects.get(id=subject_id)
+        
+        # Check permission
+        if request.user.role != 'admin' and class_obj.teacher_id != request.user.id:
+            return Response(
+                {'error': 'Bạn không có quyền quản lý điểm của lớp này'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        if request.method == 'GET':
+            return Response(load_gradebook(class_obj, subject))
+        
+        result = save_gradebook(class_obj, subject, serializer.validated_data['cells'], request.user)
+        if result['errors']:
+            return Response({
+                'success': False,
+                'message': 'Bảng điểm chưa được lưu do có ô điểm không hợp lệ',
+                'errors': result['errors']
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response({
+            'success': True,
+            'message': 'Đã lưu bảng điểm',
+            'created_count': result['created'],
+            'updated_count': result['updated'],
+            'deleted_count': result['deleted'],
+            'unchanged_count': result['unchanged'],
+            'gradebook': result['gradebook']
+        })
+        
+    except Class.DoesNotExist:
+        return Response({'error': 'Không tìm thấy lớp học'}, status=status.HTTP_404_NOT_FOUND)
+    except Subject.DoesNotExist:
+        return Response({'error': 'Không tìm thấy môn học'}, status=status.HTTP_404_NOT_FOUND)
+    except Exception as e:
+        return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
+@track_import('grades')
 def import_excel(request):
     """Import grades from Excel file"""
     try:
@@ -318,113 +367,55 @@ def import_excel(request):
         
         excel_file = request.FILES['file']
         
-        # Check file extension
-        if not excel_file.name.lower().endswith(('.xlsx', '.xls')):
+        # Check file extension (read-only streaming needs the .xlsx format)
+        if not excel_file.name.lower().endswith('.xlsx'):
+            return Response({
+                'success': False,
+                'message': 'Only Excel files (.xlsx) are supported'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            mode = parse_import_mode(request.data.get('mode'))
+        except ValueError as e:
             return Response({
                 'success': False,
-                'message': 'Only Excel files (.xlsx, .xls) are supported'
+                'message': str(e)
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        # Parse Excel file with openpyxl
-        from openpyxl import load_workbook
-        import io
-        
-        # Load workbook from uploaded file
-        workbook = load_workbook(io.BytesIO(excel_file.read()))
-        worksheet = workbook.active
-        
-        # Get headers from first row
-        headers = []
-        for cell in worksheet[1]:
-            headers.append(cell.value.lower().replace(' ', '_') if cell.value else '')
-        
-        # Expected columns mapping
-        column_mapping = {
-            'student_id': ['student_id', 'mssv', 'id'],
-            'class_id': ['class_id', 'lop', 'class'],
-            'subject': ['subject', 'mon_hoc', 'course'],
-            'score': ['score', 'diem', 'grade', 'mark'],
-            'exam_type': ['exam_type', 'loai_kiem_tra', 'type'],
-            'semester': ['semester', 'hoc_ky', 'term'],
-            'academic_year': ['academic_year', 'nam_hoc', 'year']
-        }
-        
-        # Map headers to expected fields
-        field_mapping = {}
-        for field, possible_names in column_mapping.items():
-            for header in headers:
-                if header in possible_names:
-                    field_mapping[field] = headers.index(header)
-                    break
-        
-        created_grades = []
-        errors = []
-        
-        # Process each row
-        for row_num in range(2, worksheet.max_row + 1):
-            try:
-                row_data = {}
-                for field, col_index in field_mapping.items():
-                    cell_value = worksheet.cell(row=row_num, column=col_index + 1).value
-                    row_data[field] = str(cell_value).strip() if cell_value else ''
-                
-                # Set defaults for missing fields
-                if not row_data.get('exam_type'):
-                    row_data['exam_type'] = 'midterm'
-                if not row_data.get('semester'):
-                    row_data['semester'] = '1'
-                if not row_data.get('academic_year'):
-                    row_data['academic_year'] = '2024-2025'
-                
-                # Validate required fields
-                if not row_data.get('student_id') or not row_data.get('score'):
-                    errors.append({
-                        'row': row_num,
-                        'error': 'Missing required fields: student_id and score',
-                        'data': row_data
-                    })
-                    continue
-                
-                # Convert score to float
-                try:
-                    row_data['score'] = float(row_data['score'])
-                except ValueError:
-                    errors.append({
-                        'row': row_num,
-                        'error': f'Invalid score format: {row_data["score"]}',
-                        'data': row_data
-                    })
-                    continue
-                
-                # Create grade
-                serializer = GradeCreateSerializer(data=row_data)
-                if serializer.is_valid():
-                    grade = serializer.save()
-                    created_grades.append(GradeSerializer(grade).data)
-                else:
-                    errors.append({
-                        'row': row_num,
-                        'errors': serializer.errors,
-                        'data': row_data
-                    })
-                    
-            except Exception as e:
-                errors.append({
-                    'row': row_num,
-                    'error': str(e),
-                    'data': f'Row {row_num} processing failed'
-                })
+        rows = read_sheet(excel_file.read(), COLUMN_ALIASES)
+        dry_run = str(request.data.get('dry_run', '')).lower() in ('1', 'true', 'yes')
+        result = ingest_grades(rows, request.user, mode=mode, dry_run=dry_run)
+        created = result['created']
         
         return Response({
             'success': True,
-            'message': f'Successfully imported {len(created_grades)} grades from Excel file',
-            'created_count': len(created_grades),
-            'created_grades': created_grades,
-            'errors': errors,
+            'message': f'Successfully imported {len(created)} grades from Excel file',
+            'dry_run': dry_run,
+            'mode': mode,
+            'created_count': len(created),
+            'updated_count': len(result['updated']),
+            'skipped_count': len(result['skipped']),
+            # Flat rows: the full nested GradeSerializer is too heavy for whole gradebooks.
+            # id is null for rows written by an upsert or skip-existing import.
+            'created_grades': [
+                {
+                    'id': grade.pk,
+                    'student_id': grade.student_id,
+                    'class_id': grade.class_obj_id,
+                    'subject_id': grade.subject_id,
+                    'grade_type': grade.grade_type,
+                    'score': grade.score,
+                    'max_score': grade.max_score,
+                }
+                for grade in created
+            ],
+            'errors': result['errors'],
             'details': {
-                'total_rows_processed': worksheet.max_row - 1,
-                'successful_imports': len(created_grades),
-                'failed_imports': len(errors)
+                'total_rows_processed': len(rows),
+                'successful_imports': len(created),
+                'updated_records': len(result['updated']),
+                'skipped_records': len(result['skipped']),
+                'failed_imports': len(result['errors'])
             }
         })
         
@@ -432,4 +423,20 @@ def import_excel(request):
         return Response({
             'success': False,
             'error': str(e)
-        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def autocomplete_subjects(request):
+    """(id, subject code, subject name) of the active subjects matching ?q= by prefix"""
+    try:
+        limit = parse_limit(request.query_params.get('limit'))
+    except ValueError:
+        return Response({'error': 'limit phải là số nguyên'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        results = SUBJECT_INDEX.search(request.query_params.get('q', ''), limit)
+        return Response({'results': results})
+    except Exception as e:
+        return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -53,7 +53,6 @@ def bulk_create_students(request):
                 if serializer.is_valid():
                     student = serializer.save()
                     created_students.append(student)
-                    print(f"DEBUG: Bulk create row {i+1} success: {student.student_id}")
                 else:
                     errors.append({
                         'row': i + 1,
@@ -0,0 +1,12 @@
+import django_filters
+
+from .models import Student
+
+
+class StudentFilter(django_filters.FilterSet):
+    """?is_active=, ?created_at_after=/?created_at_before= (YYYY-MM-DD)"""
+    created_at = django_filters.DateFromToRangeFilter()
+
+    class Meta:
+        model = Student
+        fields = ['is_active', 'created_at']
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-19 18:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0002_student_students_created_48b853_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['first_name'], name='students_first_prefix_idx', opclasses=['varchar_pattern_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['last_name'], name='students_last_prefix_idx', opclasses=['varchar_pattern_ops']),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 4.2.7 on 2026-10-19 19:10
+
+from django.db import migrations, models
+
+
+def _normalize(value):
+    # Same as apps.core.autocomplete.normalize at the time of writing
+    return ' '.join(value.split()).casefold()
+
+
+def backfill_name_keys(apps, schema_editor):
+    Student = apps.get_model('students', 'Student')
+    students = list(Student.objects.only('pk', 'first_name', 'last_name'))
+    for student in students:
+        student.name_key = _normalize(f'{student.first_name} {student.last_name}')
+        student.last_name_key = _normalize(student.last_name)
+    Student.objects.bulk_update(students, ['name_key', 'last_name_key'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0003_student_name_prefix_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='student',
+            name='students_first_prefix_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='student',
+            name='students_last_prefix_idx',
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='last_name_key',
+            field=models.CharField(default='', editable=False, max_length=150),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='name_key',
+            field=models.CharField(default='', editable=False, max_length=150),
+        ),
+        migrations.RunPython(backfill_name_keys, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['name_key'], name='students_name_key_idx', opclasses=['varchar_pattern_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['last_name_key'], name='students_last_key_idx', opclasses=['varchar_pattern_ops']),
+        ),
+    ]
@@ -1,5 +1,7 @@
 from django.db import models
 from django.core.validators import RegexValidator
+from apps.core.autocomplete import normalize
+from apps.core.images import normalize_avatar
 
 
 class Student(models.Model):
@@ -20,6 +22,10 @@ class Student(models.Model):
     )
     first_name = models.CharField(max_length=50)
     last_name = models.CharField(max_length=50)
+    # Casefolded "first_name last_name" and last_name for autocomplete
+    # prefix matches; kept in step by save() and set_name_keys()
+    name_key = models.CharField(max_length=150, default='', editable=False)
+    last_name_key = models.CharField(max_length=150, default='', editable=False)
     email = models.EmailField(unique=True)
     phone = models.CharField(max_length=15, blank=True, null=True)
     gender = models.CharField(max_length=10, choices=GENDER_CHOICES)
@@ -35,10 +41,40 @@ class Student(models.Model):
         verbose_name = 'Sinh viên'
         verbose_name_plural = 'Sinh viên'
         ordering = ['student_id']
+        indexes = [
+            # Student list (newest first) and ETag validators
+            models.Index(fields=['-created_at']),
+            models.Index(fields=['updated_at']),
+            models.Index(fields=['first_name', 'last_name']),
+            # Autocomplete prefix matches (LIKE 'x%') on the name keys; the
+            # unique student_id already gets a pattern index on PostgreSQL
+            models.Index(fields=['name_key'], name='students_name_key_idx', opclasses=['varchar_pattern_ops']),
+            models.Index(fields=['last_name_key'], name='students_last_key_idx', opclasses=['varchar_pattern_ops']),
+            # available_students and other active-only lookups
+            models.Index(
+                fields=['student_id'],
+                condition=models.Q(is_active=True),
+                name='students_active_sid_idx',
+            ),
+        ]
     
     def __str__(self):
         return f"{self.student_id} - {self.full_name}"
     
+    def save(self, *args, **kwargs):
+        # Store new avatar uploads as downscaled WebP with thumbnails
+        normalize_avatar(self.avatar)
+        self.set_name_keys()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'first_name', 'last_name'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'name_key', 'last_name_key'}
+        super().save(*args, **kwargs)
+    
+    def set_name_keys(self):
+        """Fill name_key and last_name_key; call before bulk_create, which skips save()"""
+        self.name_key = normalize(f'{self.first_name} {self.last_name}')
+        self.last_name_key = normalize(self.last_name)
+    
     @property
     def full_name(self):
         return f"{self.first_name} {self.last_name}".strip()
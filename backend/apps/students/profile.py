@@ -0,0 +1,151 @@
+# Student profile: enrollments, attendance, grades and recent activity of one student
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from apps.attendance.models import Attendance
+from apps.attendance.summaries import compute_attendance_stats
+from apps.classes.models import ClassStudent
+from apps.core.conditional import row_validators
+from apps.core.metrics import record_cache
+from apps.grades.models import Grade
+from apps.grades.utils import calculate_gpa
+
+RECENT_ACTIVITY = 10
+
+
+def _enrollments(student, stats):
+    enrollments = ClassStudent.objects.filter(student=student).select_related(
+        'class_obj__teacher'
+    ).order_by('-is_active', '-enrolled_at')
+    return [
+        {
+            'class_id': enrollment.class_obj_id,
+            'class_code': enrollment.class_obj.class_id,
+            'class_name': enrollment.class_obj.class_name,
+            'teacher': enrollment.class_obj.teacher.get_full_name(),
+            'enrolled_at': enrollment.enrolled_at,
+            'is_active': enrollment.is_active,
+            # Only active enrollments are counted by the attendance stats
+            'attendance': stats.get((student.pk, enrollment.class_obj_id)),
+        }
+        for enrollment in enrollments
+    ]
+
+
+def _grades(student):
+    """Per-subject averages, GPA and the latest grades from one query"""
+    grades = list(
+        Grade.objects.filter(student=student).select_related('subject').order_by('-created_at')
+    )
+
+    subjects = {}
+    for grade in grades:
+        subject = subjects.setdefault(grade.subject_id, {
+            'subject_code': grade.subject.subject_id,
+            'subject_name': grade.subject.subject_name,
+            'credits': grade.subject.credits,
+            'count': 0,
+            'total': 0,
+        })
+        subject['count'] += 1
+        subject['total'] += float(grade.score)
+
+    by_subject = []
+    for subject in subjects.values():
+        total = subject.pop('total')
+        subject['avg_score'] = round(total / subject['count'], 2)
+        by_subject.append(subject)
+    by_subject.sort(key=lambda subject: -subject['avg_score'])
+
+    scores = [float(grade.score) for grade in grades]
+    return grades[:RECENT_ACTIVITY], {
+        'total_grades': len(grades),
+        'average_score': round(sum(scores) / len(scores), 2) if scores else 0,
+        # Same credit-weighted formula as the grade summary endpoint
+        'gpa': calculate_gpa(grades),
+        'by_subject': by_subject,
+    }
+
+
+def _recent_activity(student, recent_grades):
+    """Latest grades and attendance records, newest first"""
+    attendances = Attendance.objects.filter(student=student).select_related(
+        'session__class_obj'
+    ).order_by('-created_at')[:RECENT_ACTIVITY]
+
+    activity = [
+        {
+            'type': 'grade',
+            'timestamp': grade.created_at,
+            'subject': grade.subject.subject_name,
+            'grade_type': grade.get_grade_type_display(),
+            'score': float(grade.score),
+            'max_score': float(grade.max_score),
+            'letter_grade': grade.letter_grade,
+        }
+        for grade in recent_grades
+    ] + [
+        {
+            'type': 'attendance',
+            'timestamp': attendance.created_at,
+            'class_code': attendance.session.class_obj.class_id,
+            'session_name': attendance.session.session_name,
+            'session_date': attendance.session.session_date,
+            'status': attendance.status,
+        }
+        for attendance in attendances
+    ]
+    activity.sort(key=lambda item: item['timestamp'], reverse=True)
+    return activity[:RECENT_ACTIVITY]
+
+
+def build_profile(student):
+    """
+    The profile payload in a fixed number of queries, whatever the number
+    of classes and grades: enrollments (1), attendance stats (3), grades (1)
+    and recent attendance (1).
+    """
+    stats = compute_attendance_stats(student_ids=[student.pk])
+    for values in stats.values():
+        values['attendance_rate'] = float(values['attendance_rate'])
+    recent_grades, grades = _grades(student)
+    return {
+        'student_info': {
+            'id': student.pk,
+            'student_id': student.student_id,
+            'full_name': student.full_name,
+            'email': student.email,
+            'is_active': student.is_active,
+        },
+        'enrollments': _enrollments(student, stats),
+        'grades': grades,
+        'recent_activity': _recent_activity(student, recent_grades),
+    }
+
+
+def get_profile(student):
+    """
+    Cached build_profile.
+
+    The cache key carries the validators of the student's own rows (grades,
+    attendances, enrollments), read in one query, plus the student's
+    updated_at and the date, so any write to those rows moves the profile
+    to a new key. Changes elsewhere (a new session, a renamed subject) show
+    up once STUDENT_PROFILE_CACHE_SECONDS has elapsed.
+    """
+    validators = row_validators([
+        (Grade, 'student', student.pk),
+        (Attendance, 'student', student.pk),
+        (ClassStudent, 'student', student.pk),
+    ]) + [student.updated_at.isoformat(), timezone.localdate().isoformat()]
+    key = f"student_profile:{student.pk}:{hashlib.md5('|'.join(validators).encode()).hexdigest()}"
+
+    profile = cache.get(key)
+    record_cache('student_profile', profile is not None)
+    if profile is None:
+        profile = build_profile(student)
+        cache.set(key, profile, getattr(settings, 'STUDENT_PROFILE_CACHE_SECONDS', 300))
+    return profile
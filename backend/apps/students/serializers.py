@@ -1,18 +1,20 @@
 from rest_framework import serializers
+from apps.core.serializers import DynamicFieldsMixin, ThumbnailField
 from .models import Student
 
 
-class StudentSerializer(serializers.ModelSerializer):
+class StudentSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer for Student model"""
     full_name = serializers.ReadOnlyField()
     age = serializers.ReadOnlyField()
+    avatar_thumbnail = ThumbnailField(source='avatar')
     
     class Meta:
         model = Student
         fields = [
             'id', 'student_id', 'first_name', 'last_name', 'full_name',
             'email', 'phone', 'gender', 'date_of_birth', 'age',
-            'address', 'avatar', 'is_active', 'created_at', 'updated_at'
+            'address', 'avatar', 'avatar_thumbnail', 'is_active', 'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
 
@@ -0,0 +1,49 @@
+from datetime import date
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.accounts.models import User
+from apps.students.models import Student
+
+
+class StudentAutocompleteTests(TestCase):
+    """Prefix matches on the code, the full name and the last name, in any casing"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(
+            email='admin@test.edu.vn', username='admin', password='Admin@12345', role='admin'
+        )
+        for code, first_name, last_name in [
+            ('SV001', 'Nguyễn', 'Văn An'),
+            ('SV002', 'Trần', 'thị Mai'),
+            ('SV003', 'de la Cruz', 'Maria'),
+        ]:
+            Student.objects.create(
+                student_id=code, first_name=first_name, last_name=last_name,
+                email=f'{code.lower()}@test.edu.vn', gender='female', date_of_birth=date(2003, 1, 1),
+            )
+
+    def setUp(self):
+        self.client = APIClient(HTTP_HOST='localhost')
+        self.client.force_authenticate(self.admin)
+
+    def search(self, term):
+        response = self.client.get('/api/students/autocomplete/', {'q': term})
+        self.assertEqual(response.status_code, 200)
+        return [code for _, code, _ in response.data['results']]
+
+    def test_any_casing_matches(self):
+        self.assertEqual(self.search('sv00'), ['SV001', 'SV002', 'SV003'])
+        self.assertEqual(self.search('NGUYỄN  văn'), ['SV001'])
+        self.assertEqual(self.search('Thị'), ['SV002'])
+        self.assertEqual(self.search('DE LA'), ['SV003'])
+        self.assertEqual(self.search('mar'), ['SV003'])
+
+    def test_renames_update_the_keys(self):
+        student = Student.objects.get(student_id='SV001')
+        student.last_name = 'Văn Bình'
+        student.save(update_fields=['last_name'])
+        self.assertEqual(self.search('bình'), [])
+        self.assertEqual(self.search('văn b'), ['SV001'])
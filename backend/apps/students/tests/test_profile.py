@@ -0,0 +1,85 @@
+from django.core.cache import cache
+from django.db.models import Count
+from django.test import TestCase
+
+from apps.attendance.models import Attendance
+from apps.classes.models import ClassStudent
+from apps.core.dataset import generate_dataset
+from apps.grades.models import Grade
+from apps.students.models import Student
+from apps.students.profile import build_profile, get_profile
+
+# Validators (1) on a hit; validators plus build_profile (6) on a miss
+HIT_QUERIES = 1
+MISS_QUERIES = 7
+
+
+class StudentProfileTests(TestCase):
+    """The profile is built in a fixed number of queries and cached until the student's rows change"""
+
+    @classmethod
+    def setUpTestData(cls):
+        generate_dataset(students=12, teachers=2, classes=6, class_size=6, subjects=3, sessions_per_class=3)
+        students = Student.objects.annotate(classes=Count('class_students')).filter(classes__gt=0).order_by('classes')
+        cls.few, cls.many = students.first(), students.last()
+
+    def setUp(self):
+        cache.clear()
+        self.student = Student.objects.get(pk=self.many.pk)
+
+    def test_query_count_does_not_grow_with_the_student_rows(self):
+        self.assertGreater(self.many.class_students.count(), self.few.class_students.count())
+        for student in (self.few, self.many):
+            with self.subTest(student=student.student_id), self.assertNumQueries(MISS_QUERIES - HIT_QUERIES):
+                build_profile(student)
+
+    def test_cached_until_a_write(self):
+        with self.assertNumQueries(MISS_QUERIES):
+            get_profile(self.student)
+        with self.assertNumQueries(HIT_QUERIES):
+            get_profile(self.student)
+
+    def test_writes_to_the_student_rows_move_the_key(self):
+        grade = Grade.objects.filter(student=self.student).first()
+        attendance = Attendance.objects.filter(student=self.student).first()
+        enrollment = ClassStudent.objects.filter(student=self.student).first()
+
+        def set_score():
+            grade.score = 2
+            grade.save()
+
+        def mark_late():
+            attendance.status = 'late'
+            attendance.save()
+
+        def leave_class():
+            enrollment.is_active = False
+            enrollment.save()
+
+        def rename():
+            self.student.last_name = 'Thu Trang'
+            self.student.save()
+
+        writes = {
+            'grade': set_score,
+            'attendance': mark_late,
+            'enrollment': leave_class,
+            'grade deleted': lambda: Grade.objects.filter(student=self.student).last().delete(),
+            'student': rename,
+        }
+        for name, write in writes.items():
+            with self.subTest(write=name):
+                before = get_profile(self.student)
+                write()
+                self.student.refresh_from_db()
+                with self.assertNumQueries(MISS_QUERIES):
+                    after = get_profile(self.student)
+                self.assertNotEqual(after, before)
+
+    def test_writes_to_other_students_keep_the_key(self):
+        get_profile(self.student)
+        other = Grade.objects.exclude(student=self.student).first()
+        other.score = 2
+        other.save()
+        with self.assertNumQueries(HIT_QUERIES):
+            get_profile(self.student)
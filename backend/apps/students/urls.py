@@ -4,8 +4,10 @@ from . import views
 urlpatterns = [
     path('', views.StudentListCreateView.as_view(), name='student_list_create'),
     path('<int:pk>/', views.StudentDetailView.as_view(), name='student_detail'),
+    path('<int:pk>/profile/', views.student_profile, name='student_profile'),
     path('bulk-create/', views.bulk_create_students, name='bulk_create_students'),
     path('import-excel/', views.import_excel, name='import_excel'),
     path('export-excel/', views.export_excel, name='export_excel'),
     path('statistics/', views.student_statistics, name='student_statistics'),
+    path('autocomplete/', views.autocomplete_students, name='autocomplete_students'),
 ]
@@ -1,18 +1,30 @@
+import logging
 from rest_framework import generics, status, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser
 from django.http import HttpResponse, JsonResponse
 from django.db.models import Q
+from apps.core.autocomplete import normalize, parse_limit
+from apps.core.conditional import ConditionalGetMixin, conditional_get
+from apps.core.db.routers import read_only
+from apps.core.metrics import track_import
+from .filters import StudentFilter
 from .models import Student
+from .profile import get_profile
 from .serializers import StudentSerializer, StudentCreateSerializer
 from .bulk_views import bulk_create_students
 
+logger = logging.getLogger(__name__)
 
-class StudentListCreateView(generics.ListCreateAPIView):
+
+class StudentListCreateView(ConditionalGetMixin, generics.ListCreateAPIView):
     """List and create students with pagination"""
     queryset = Student.objects.all()
     permission_classes = [permissions.IsAuthenticated]
+    filterset_class = StudentFilter
+    search_fields = ['first_name', 'last_name', 'student_id', 'email']
+    ordering_fields = ['student_id', 'first_name', 'created_at']
     
     def get_serializer_class(self):
         if self.request.method == 'POST':
@@ -20,19 +32,10 @@ class StudentListCreateView(generics.ListCreateAPIView):
         return StudentSerializer
     
     def get_queryset(self):
-        queryset = Student.objects.all()
-        search = self.request.query_params.get('search', None)
-        if search is not None:
-            queryset = queryset.filter(
-                Q(first_name__icontains=search) |
-                Q(last_name__icontains=search) |
-                Q(student_id__icontains=search) |
-                Q(email__icontains=search)
-            )
-        return queryset.order_by('-created_at')
+        return Student.objects.order_by('-created_at')
 
 
-class StudentDetailView(generics.RetrieveUpdateDestroyAPIView):
+class StudentDetailView(ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update or delete a student"""
     queryset = Student.objects.all()
     serializer_class = StudentSerializer
@@ -46,6 +49,7 @@ class StudentDetailView(generics.RetrieveUpdateDestroyAPIView):
 
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
+@track_import('students')
 def bulk_create_students(request):
     """Bulk create students (simplified version without Excel import)"""
     try:
@@ -76,6 +80,7 @@ def bulk_create_students(request):
 
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
+@track_import('students')
 def import_excel(request):
     """Import students from Excel file"""
     try:
@@ -127,9 +132,7 @@ def import_excel(request):
                     field_mapping[field] = headers.index(header)
                     break
         
-        # Debug: Print headers and field mapping
-        print(f"DEBUG: Headers found: {headers}")
-        print(f"DEBUG: Field mapping: {field_mapping}")
+        logger.debug(f"Student import headers: {headers}, field mapping: {field_mapping}")
         
         created_students = []
         errors = []
@@ -146,10 +149,6 @@ def import_excel(request):
                     else:
                         row_data[field] = str(cell_value).strip()
                 
-                # Debug: Print first few rows
-                if row_num <= 5:
-                    print(f"DEBUG: Row {row_num} data: {row_data}")
-                
                 # Set defaults for missing fields
                 if not row_data.get('gender'):
                     row_data['gender'] = 'male'
@@ -188,7 +187,6 @@ def import_excel(request):
                 # Validate required fields
                 if not row_data.get('student_id') or not row_data.get('first_name'):
                     error_msg = f'Missing required fields: student_id={row_data.get("student_id")}, first_name={row_data.get("first_name")}'
-                    print(f"DEBUG: Row {row_num} validation failed: {error_msg}")
                     errors.append({
                         'row': row_num,
                         'error': error_msg,
@@ -210,9 +208,7 @@ def import_excel(request):
                 if serializer.is_valid():
                     student = serializer.save()
                     created_students.append(StudentSerializer(student).data)
-                    print(f"DEBUG: Row {row_num} created successfully: {student.student_id}")
                 else:
-                    print(f"DEBUG: Row {row_num} serializer failed: {serializer.errors}")
                     errors.append({
                         'row': row_num,
                         'error': f'Validation failed: {serializer.errors}',
@@ -251,6 +247,7 @@ def import_excel(request):
 
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
+@read_only
 def export_excel(request):
     """Export students to Excel/CSV file"""
     try:
@@ -301,6 +298,8 @@ def export_excel(request):
 
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
+@read_only
+@conditional_get(Student)
 def student_statistics(request):
     """Get comprehensive student statistics"""
     try:
@@ -367,3 +366,47 @@ def student_statistics(request):
             'success': False,
             'error': str(e)
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+@read_only
+def student_profile(request, pk):
+    """Enrollments, attendance, grades and recent activity of one student"""
+    try:
+        student = Student.objects.get(pk=pk)
+        return Response(get_profile(student))
+    except Student.DoesNotExist:
+        return Response({'error': 'Không tìm thấy sinh viên'}, status=status.HTTP_404_NOT_FOUND)
+    except Exception as e:
+        return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+@read_only
+def autocomplete_students(request):
+    """(id, student code, full name) of the active students matching ?q= by prefix"""
+    try:
+        limit = parse_limit(request.query_params.get('limit'))
+    except ValueError:
+        return Response({'error': 'limit phải là số nguyên'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    term = normalize(request.query_params.get('q', ''))
+    if not term:
+        return Response({'results': []})
+    
+    try:
+        # Plain (case-sensitive) prefixes so the pattern indexes apply: codes
+        # only hold upper case letters and digits, and the name keys are
+        # stored casefolded
+        students = Student.objects.filter(is_active=True).filter(
+            Q(student_id__startswith=term.upper()) |
+            Q(name_key__startswith=term) |
+            Q(last_name_key__startswith=term)
+        ).order_by('student_id').values_list('pk', 'student_id', 'first_name', 'last_name')[:limit]
+        return Response({'results': [
+            [pk, student_id, f'{first_name} {last_name}'] for pk, student_id, first_name, last_name in students
+        ]})
+    except Exception as e:
+        return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
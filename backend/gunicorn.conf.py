@@ -0,0 +1,19 @@
+# gunicorn reads this file from the working directory (backend/)
+import os
+import shutil
+
+wsgi_app = 'student_management.wsgi:application'
+
+
+def on_starting(server):
+    # Metric files of a previous run would be summed into the new totals
+    path = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if path:
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path, exist_ok=True)
+
+
+def child_exit(server, worker):
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
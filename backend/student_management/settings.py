@@ -40,17 +40,22 @@ LOCAL_APPS = [
     'apps.classes',
     'apps.grades',
     'apps.attendance',
+    'apps.core',
 ]
 
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 
 MIDDLEWARE = [
+    # First, so its total covers every other middleware
+    'apps.core.middleware.RequestTimingMiddleware',
+    'apps.core.middleware.PrometheusMetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'apps.core.middleware.ReplicaStickinessMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -79,16 +84,30 @@ WSGI_APPLICATION = 'student_management.wsgi.application'
 # Check if PostgreSQL/Supabase settings are provided
 if config('DB_NAME', default=None) and config('DB_USER', default=None):
     # Use PostgreSQL/Supabase
+    # DB_POOL=True borrows connections from a process-local psycopg2 pool and
+    # returns them at the end of each request; otherwise connections persist
+    # for DB_CONN_MAX_AGE seconds. Both are health-checked before reuse.
+    DB_POOL = config('DB_POOL', default=False, cast=bool)
     DATABASES = {
         'default': {
-            'ENGINE': 'django.db.backends.postgresql',
+            'ENGINE': 'apps.core.db.postgresql_pool' if DB_POOL else 'django.db.backends.postgresql',
             'NAME': config('DB_NAME'),
             'USER': config('DB_USER'),
             'PASSWORD': config('DB_PASSWORD', default=''),
             'HOST': config('DB_HOST', default='localhost'),
             'PORT': config('DB_PORT', default='5432'),
+            'CONN_MAX_AGE': 0 if DB_POOL else config('DB_CONN_MAX_AGE', default=60, cast=int),
+            'CONN_HEALTH_CHECKS': True,
             'OPTIONS': {
-                'sslmode': 'require',
+                'sslmode': config('DB_SSLMODE', default='require'),
+                'connect_timeout': config('DB_CONNECT_TIMEOUT', default=10, cast=int),
+            },
+            'POOL': {
+                'MIN_SIZE': config('DB_POOL_MIN_SIZE', default=1, cast=int),
+                'MAX_SIZE': config('DB_POOL_MAX_SIZE', default=10, cast=int),
+                'TIMEOUT': config('DB_POOL_TIMEOUT', default=10, cast=float),
+                'MAX_LIFETIME': config('DB_POOL_MAX_LIFETIME', default=1800, cast=int),
+                'CHECK_IDLE': config('DB_POOL_CHECK_IDLE', default=30, cast=int),
             },
         }
     }
@@ -101,6 +120,43 @@ else:
         }
     }
 
+# Optional read replica for heavy read-only endpoints (@read_only views).
+# DB_REPLICA_HOST points a Postgres replica; DB_REPLICA_NAME alone is enough
+# to use a second local SQLite/Postgres database.
+DB_REPLICA_HOST = config('DB_REPLICA_HOST', default='')
+DB_REPLICA_NAME = config('DB_REPLICA_NAME', default='')
+if DB_REPLICA_HOST or DB_REPLICA_NAME:
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'HOST': DB_REPLICA_HOST or DATABASES['default'].get('HOST', ''),
+        'PORT': config('DB_REPLICA_PORT', default=DATABASES['default'].get('PORT', '')),
+        'NAME': DB_REPLICA_NAME or DATABASES['default']['NAME'],
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_ROUTERS = ['apps.core.db.routers.ReplicaRouter']
+
+# Seconds a user keeps reading from the primary after a write
+DB_REPLICA_STICKY_SECONDS = config('DB_REPLICA_STICKY_SECONDS', default=10, cast=int)
+
+# Cache (shared Redis in production so per-user state works across workers)
+REDIS_CACHE_URL = config('REDIS_CACHE_URL', default='')
+if REDIS_CACHE_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_CACHE_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Cached student profiles; writes to the student's rows invalidate them earlier
+STUDENT_PROFILE_CACHE_SECONDS = config('STUDENT_PROFILE_CACHE_SECONDS', default=300, cast=int)
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -130,6 +186,9 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Avatar uploads are stored as WebP no larger than this (see apps/core/images.py)
+AVATAR_MAX_DIMENSION = config('AVATAR_MAX_DIMENSION', default=1024, cast=int)
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -144,6 +203,17 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'apps.core.renderers.ORJSONRenderer',
+        'apps.core.renderers.MessagePackRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'apps.core.parsers.ORJSONParser',
+        'apps.core.parsers.MessagePackParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
     'DEFAULT_FILTER_BACKENDS': [
@@ -180,6 +250,39 @@ SIMPLE_JWT = {
     'SLIDING_TOKEN_REFRESH_LIFETIME': timedelta(days=1),
 }
 
+# Request instrumentation: Server-Timing header and one JSON log line per request
+REQUEST_INSTRUMENTATION = config('REQUEST_INSTRUMENTATION', default=False, cast=bool)
+# Requests slower than this are logged at WARNING level with their full SQL list
+SLOW_REQUEST_THRESHOLD_MS = config('SLOW_REQUEST_THRESHOLD_MS', default=500, cast=int)
+
+# Prometheus metrics at /api/system/metrics/ (admin JWT or 'Bearer <METRICS_TOKEN>').
+# Under gunicorn also set PROMETHEUS_MULTIPROC_DIR, see apps/core/metrics.py
+METRICS_ENABLED = config('METRICS_ENABLED', default=True, cast=bool)
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'apps.core.instrumentation': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
+
+# provision_accounts command (0 = one password hashing process per CPU); the API hashes serially
+ACCOUNT_PROVISIONING_HASH_WORKERS = config('ACCOUNT_PROVISIONING_HASH_WORKERS', default=0, cast=int)
+# Individually hashed passwords one API request may create (about 0.3 s each with PBKDF2);
+# a shared default password is hashed once and does not count
+ACCOUNT_PROVISIONING_API_MAX_HASHES = config('ACCOUNT_PROVISIONING_API_MAX_HASHES', default=20, cast=int)
+
 # CORS settings
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",
@@ -197,12 +300,27 @@ CORS_ALLOW_CREDENTIALS = True
 CORS_ALLOW_ALL_ORIGINS = True
 
 # Email settings
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+# Use django.core.mail.backends.filebased.EmailBackend or .locmem.EmailBackend
+# to stand in for SMTP during development and tests
+EMAIL_BACKEND = config('EMAIL_BACKEND', default='django.core.mail.backends.smtp.EmailBackend')
+EMAIL_FILE_PATH = config('EMAIL_FILE_PATH', default=str(BASE_DIR / 'sent_emails'))
 EMAIL_HOST = config('EMAIL_HOST', default='smtp.gmail.com')
 EMAIL_PORT = config('EMAIL_PORT', default=587, cast=int)
 EMAIL_USE_TLS = config('EMAIL_USE_TLS', default=True, cast=bool)
 EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='')
 EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
+EMAIL_TIMEOUT = config('EMAIL_TIMEOUT', default=30, cast=int)
+DEFAULT_FROM_EMAIL = f"EduAttend <{EMAIL_HOST_USER or 'noreply@eduattend.com'}>"
+
+# Outbound mail queue (see apps.accounts.mail_queue)
+EMAIL_QUEUE_BATCH_SIZE = config('EMAIL_QUEUE_BATCH_SIZE', default=100, cast=int)
+EMAIL_QUEUE_MAX_ATTEMPTS = config('EMAIL_QUEUE_MAX_ATTEMPTS', default=5, cast=int)
+EMAIL_QUEUE_RETRY_BASE_SECONDS = config('EMAIL_QUEUE_RETRY_BASE_SECONDS', default=60, cast=int)
+EMAIL_QUEUE_RETRY_MAX_SECONDS = config('EMAIL_QUEUE_RETRY_MAX_SECONDS', default=3600, cast=int)
+
+# Nightly absence digest (manage.py send_absence_digest)
+ABSENCE_ALERT_THRESHOLD = config('ABSENCE_ALERT_THRESHOLD', default=80, cast=float)
+ABSENCE_ALERT_MIN_SESSIONS = config('ABSENCE_ALERT_MIN_SESSIONS', default=3, cast=int)
 
 # Celery settings
 CELERY_BROKER_URL = config('CELERY_BROKER_URL', default='redis://localhost:6379/0')
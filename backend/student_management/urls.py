@@ -13,8 +13,11 @@ urlpatterns = [
     path('api/students/', include('apps.students.urls')),
     path('api/grades/', include('apps.grades.urls')),
     path('api/attendance/', include('apps.attendance.urls')),
+    path('api/system/', include('apps.core.urls')),
 ]
 
+# Outside DEBUG the web server or the storage backend serves MEDIA_URL; files
+# under thumbnails/ are named after their content and can be cached forever
 if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)